@@ -1,8 +1,8 @@
 from travel_app.utils import logger
-from travel_app.db_api.db_operations import execute_query
+from travel_app.db_api.db_operations import fetch_all, transaction
 
 
-def create_continents_table():
+def create_continents_table(cursor):
     """
     Create the continents table in the database.
     """
@@ -13,7 +13,7 @@ def create_continents_table():
         name VARCHAR(100) NOT NULL UNIQUE
     );
     """
-    execute_query(create_continent_query)
+    cursor.execute(create_continent_query)
 
     # Query 2: Insert data into the continents table
     insert_continent_data_query = """
@@ -27,16 +27,16 @@ def create_continents_table():
     ('South America')
     ON CONFLICT (name) DO NOTHING;  -- Ensures no duplicates if already inserted
     """
-    execute_query(insert_continent_data_query)
+    cursor.execute(insert_continent_data_query)
 
     # Query 3: Select and fetch the inserted data from the continents table
     select_continent_query = """
     SELECT * FROM continents;
     """
-    execute_query(select_continent_query)
+    cursor.execute(select_continent_query)
     logger.info("Continents table created and populated successfully.")
 
-def create_countries_table():
+def create_countries_table(cursor):
     try:
         query = """CREATE TABLE  IF NOT EXISTS Country (
         ID INT PRIMARY KEY,
@@ -48,7 +48,7 @@ def create_countries_table():
         continent_id INT,
         FOREIGN KEY (continent_id) REFERENCES Continents(ID)
         );"""
-        execute_query(query)
+        cursor.execute(query)
         logger.info("Countries table created successfully.")
 
         # Insert sample data into the countries table
@@ -66,19 +66,71 @@ def create_countries_table():
         (10, 'South Africa', 1219090, 'Afrikaans/English/Zulu/Xhosa', 'Cape Town', 59308690, 1)
         ON CONFLICT (ID) DO NOTHING; -- Ensures no duplicates if already inserted
         """
-        execute_query(insert_query)
+        cursor.execute(insert_query)
         logger.info("Sample data inserted into countries table successfully.")
     except Exception as e:
-        logger.error(f"Error creating countries table: {e}")
+        logger.error("Error creating countries table: %s", e)
         raise ValueError("Failed to create countries table") from e
     
 
-def create_city_table():
-    pass
+def create_city_table(cursor):
+    create_table_query = """
+    CREATE TABLE IF NOT EXISTS City (
+        ID SERIAL PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        prefecture VARCHAR(100),
+        country_id INT,
+        FOREIGN KEY (country_id) REFERENCES Country(ID),
+        UNIQUE (name, country_id)
+    );
+    """
+    cursor.execute(create_table_query)
+
+    # Cities referenced by the sample airports
+    insert_query = """
+    INSERT INTO City (ID, name, prefecture, country_id) VALUES
+    (1, 'Tokyo', 'Tokyo', 4),
+    (2, 'Osaka', 'Osaka', 4),
+    (3, 'Fukuoka', 'Fukuoka', 4),
+    (4, 'Sapporo', 'Hokkaido', 4),
+    (5, 'Naha', 'Okinawa', 4),
+    (6, 'Nagoya', 'Aichi', 4),
+    (7, 'Sendai', 'Miyagi', 4),
+    (8, 'Hiroshima', 'Hiroshima', 4)
+    ON CONFLICT (ID) DO NOTHING;
+
+    -- Keep the serial in step with the explicit IDs above
+    SELECT setval(pg_get_serial_sequence('city', 'id'), (SELECT MAX(ID) FROM City));
+    """
+    cursor.execute(insert_query)
+    logger.info("City table created and populated successfully.")
+
+def create_postgis_extension():
+    """
+    Enable PostGIS when the server provides it (the `postgis/postgis` image
+    does). Returns whether it is enabled; without it places and airports get
+    no geography columns.
+    """
+    if not fetch_all("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'"):
+        logger.error("PostGIS is not installed on the database server; skipping geography columns.")
+        return False
+    with transaction() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
+    logger.info("PostGIS extension enabled.")
+    return True
+
+def _geography_query(table: str) -> str:
+    """A `geog` column kept in step with the table's coordinates, with a GiST index for ST_DWithin and <-> queries."""
+    return f"""
+    ALTER TABLE {table} ADD COLUMN IF NOT EXISTS geog geography(Point, 4326)
+        GENERATED ALWAYS AS (ST_SetSRID(ST_MakePoint(longitude::FLOAT8, latitude::FLOAT8), 4326)::geography) STORED;
 
-def create_airport_table():
+    CREATE INDEX IF NOT EXISTS {table.lower()}_geog_idx ON {table} USING GIST (geog);
+    """
+
+def create_airport_table(cursor, spatial=False):
     create_table_query = """
-    CREATE TABLE Airport (
+    CREATE TABLE IF NOT EXISTS Airport (
         ID INT PRIMARY KEY,
         name VARCHAR(100) NOT NULL,
         prefix CHAR(3), -- e.g., IATA code
@@ -91,89 +143,125 @@ def create_airport_table():
         FOREIGN KEY (city_id) REFERENCES City(ID)
     );
     """
-    
-    query = """
-    -- Insert sample data into Airport table for Japanese airports
-
-    -- Tokyo - Narita International Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (1, 'Narita International Airport', 'NRT', 35.7769, 140.3929, 40000000, 1, 4.5, 1);
-
-    -- Tokyo - Haneda Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (2, 'Haneda Airport', 'HND', 35.5494, 139.7798, 70000000, 2, 4.7, 1);
-
-    -- Osaka - Kansai International Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (3, 'Kansai International Airport', 'KIX', 34.4263, 135.2440, 28000000, 3, 4.4, 2);
+    cursor.execute(create_table_query)
+    if spatial:
+        cursor.execute(_geography_query("Airport"))
 
-    -- Kyoto (nearest city - Osaka) - Osaka Itami Airport (Osaka International Airport)
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (4, 'Osaka Itami Airport', 'ITM', 34.7833, 135.4381, 13000000, 4, 4.0, 2);
+    # Sample data for Japanese airports
+    insert_query = """
+    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id) VALUES
+    (1, 'Narita International Airport', 'NRT', 35.7769, 140.3929, 40000000, 1, 4.5, 1), -- Tokyo
+    (2, 'Haneda Airport', 'HND', 35.5494, 139.7798, 70000000, 2, 4.7, 1), -- Tokyo
+    (3, 'Kansai International Airport', 'KIX', 34.4263, 135.2440, 28000000, 3, 4.4, 2), -- Osaka
+    (4, 'Osaka Itami Airport', 'ITM', 34.7833, 135.4381, 13000000, 4, 4.0, 2), -- Osaka, nearest to Kyoto
+    (5, 'Fukuoka Airport', 'FUK', 33.5851, 130.4512, 23000000, 5, 4.3, 3), -- Fukuoka
+    (6, 'New Chitose Airport', 'CTS', 42.7758, 141.6925, 10000000, 6, 4.2, 4), -- Sapporo
+    (7, 'Naha Airport', 'OKA', 26.1950, 127.6460, 16000000, 7, 4.0, 5), -- Okinawa
+    (8, 'Chubu Centrair International Airport', 'NGO', 34.8583, 136.8044, 12000000, 8, 4.6, 6), -- Nagoya
+    (9, 'Sendai Airport', 'SDJ', 38.1375, 140.8800, 10000000, 9, 4.1, 7), -- Sendai
+    (10, 'Hiroshima Airport', 'HIJ', 34.4425, 132.9133, 15000000, 10, 4.2, 8) -- Hiroshima
+    ON CONFLICT (ID) DO NOTHING;
+    """
+    cursor.execute(insert_query)
+    logger.info("Airport table created and populated successfully.")
 
-    -- Fukuoka - Fukuoka Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (5, 'Fukuoka Airport', 'FUK', 33.5851, 130.4512, 23000000, 5, 4.3, 3);
 
-    -- Sapporo - New Chitose Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (6, 'New Chitose Airport', 'CTS', 42.7758, 141.6925, 10000000, 6, 4.2, 4);
+def create_place_table(cursor, spatial=False):
+    create_table_query = """
+    CREATE TABLE IF NOT EXISTS Place (
+        ID SERIAL PRIMARY KEY,
+        place_key CHAR(32) NOT NULL UNIQUE, -- md5 of the name and rounded coordinates, used to deduplicate
+        name VARCHAR(255) NOT NULL,
+        address TEXT,
+        postal_code VARCHAR(8),
+        prefecture VARCHAR(32), -- lower-case romaji, e.g. 'tokyo'
+        municipality VARCHAR(64), -- e.g. '札幌市', '児湯郡都農町'
+        phone VARCHAR(64),
+        website TEXT,
+        rating FLOAT,
+        total_reviews INT,
+        categories VARCHAR(255),
+        latitude DECIMAL(9,6),
+        longitude DECIMAL(9,6),
+        city_id INT,
+        updated_at TIMESTAMP NOT NULL DEFAULT now(),
+        FOREIGN KEY (city_id) REFERENCES City(ID)
+    );
 
-    -- Okinawa - Naha Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (7, 'Naha Airport', 'OKA', 26.1950, 127.6460, 16000000, 7, 4.0, 5);
+    -- Columns added after the first release
+    ALTER TABLE Place ADD COLUMN IF NOT EXISTS postal_code VARCHAR(8);
+    ALTER TABLE Place ADD COLUMN IF NOT EXISTS prefecture VARCHAR(32);
+    ALTER TABLE Place ADD COLUMN IF NOT EXISTS municipality VARCHAR(64);
+    """
+    cursor.execute(create_table_query)
+    if spatial:
+        cursor.execute(_geography_query("Place"))
+    logger.info("Place table created successfully.")
 
-    -- Nagoya - Chubu Centrair International Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (8, 'Chubu Centrair International Airport', 'NGO', 34.8583, 136.8044, 12000000, 8, 4.6, 6);
+def create_review_table(cursor):
+    create_table_query = """
+    CREATE TABLE IF NOT EXISTS Review (
+        ID BIGSERIAL PRIMARY KEY,
+        review_key CHAR(32) NOT NULL UNIQUE, -- md5 of the place and scraped_data.review_key (reviewer, text start)
+        place_id INT NOT NULL,
+        reviewer VARCHAR(255),
+        rating SMALLINT,
+        review_date VARCHAR(64), -- as shown on the page, e.g. '1 か月前'
+        reviewed_on DATE, -- review_date counted back from the scrape time, only as precise as review_date
+        text TEXT,
+        FOREIGN KEY (place_id) REFERENCES Place(ID) ON DELETE CASCADE
+    );
 
-    -- Sendai - Sendai Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (9, 'Sendai Airport', 'SDJ', 38.1375, 140.8800, 10000000, 9, 4.1, 7);
+    ALTER TABLE Review ADD COLUMN IF NOT EXISTS reviewed_on DATE;
 
-    -- Hiroshima - Hiroshima Airport
-    INSERT INTO Airport (ID, name, prefix, latitude, longitude, capacity, ranking, rating, city_id)
-    VALUES 
-    (10, 'Hiroshima Airport', 'HIJ', 34.4425, 132.9133, 15000000, 10, 4.2, 8);
+    CREATE INDEX IF NOT EXISTS review_place_id_idx ON Review (place_id);
     """
+    cursor.execute(create_table_query)
+    logger.info("Review table created successfully.")
 
+def create_place_nearest_airport_table(cursor):
+    create_table_query = """
+    -- Nearest airport of every place with coordinates, kept up to date by the CSV loader
+    -- (see travel_app.db_api.spatial.refresh_place_nearest_airport)
+    CREATE TABLE IF NOT EXISTS place_nearest_airport (
+        place_id INT PRIMARY KEY,
+        airport_id INT NOT NULL,
+        distance_m FLOAT NOT NULL,
+        computed_at TIMESTAMP NOT NULL DEFAULT now(),
+        FOREIGN KEY (place_id) REFERENCES Place(ID) ON DELETE CASCADE,
+        FOREIGN KEY (airport_id) REFERENCES Airport(ID) ON DELETE CASCADE
+    );
 
-def create_place_table():
-    pass
+    CREATE INDEX IF NOT EXISTS place_nearest_airport_airport_idx ON place_nearest_airport (airport_id, distance_m);
+    """
+    cursor.execute(create_table_query)
+    logger.info("Place nearest airport table created successfully.")
 
 def create_database():
+    """
+    Create every table and insert the reference data, in one transaction so a
+    failing step leaves nothing half created. Each step is idempotent; it is
+    run by `travel_app create-db`.
+    """
     try:
-        create_continents_table()
-    except Exception as e:
-        logger.error(f"Error creating continents table: {e}")
-        raise ValueError("Failed to create continents table") from e
-    try:
-        create_countries_table()
-    except Exception as e:
-        logger.error(f"Error creating countries table: {e}")
-        raise ValueError("Failed to create countries table") from e
-    try:
-        create_city_table()
-    except Exception as e:
-        logger.error(f"Error creating city table: {e}")
-        raise ValueError("Failed to create city table") from e
-    try:
-        create_airport_table()
-    except Exception as e:
-        logger.error(f"Error creating airport table: {e}")
-        raise ValueError("Failed to create airport table") from e
-    try:
-        create_place_table()
+        spatial = create_postgis_extension()
     except Exception as e:
-        logger.error(f"Error creating place table: {e}")
-        raise ValueError("Failed to create place table") from e
-
+        logger.error("Error enabling PostGIS: %s", e)
+        raise ValueError("Failed to enable PostGIS") from e
+    steps = [
+        ("continents table", create_continents_table),
+        ("countries table", create_countries_table),
+        ("city table", create_city_table),
+        ("airport table", lambda cursor: create_airport_table(cursor, spatial)),
+        ("place table", lambda cursor: create_place_table(cursor, spatial)),
+        ("review table", create_review_table),
+    ]
+    if spatial:
+        steps.append(("place nearest airport table", create_place_nearest_airport_table))
+    with transaction() as cursor:
+        for name, step in steps:
+            try:
+                step(cursor)
+            except Exception as e:
+                logger.error("Error creating %s: %s", name, e)
+                raise ValueError(f"Failed to create {name}") from e
@@ -1,54 +1,229 @@
+import csv
+import io
+import os
+import threading
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import pool, sql
+from psycopg2.extras import execute_batch, execute_values as _execute_values
 from travel_app.utils import logger
 
 # Database connection details
-DB_HOST = "db"  # The 'db' is the name of the service in Docker Compose
-DB_PORT = "5432"
-DB_NAME = "travel_db"
-DB_USER = "postgres"
-DB_PASSWORD = "postgres"
-
-# Establishing the connection
-def get_db_connection():
-    """Create and return a database connection."""
-    conn = psycopg2.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD
-    )
-    return conn
+DB_HOST = os.environ.get("DB_HOST", "db")  # The 'db' is the name of the service in Docker Compose
+DB_PORT = os.environ.get("DB_PORT", "5432")
+DB_NAME = os.environ.get("DB_NAME", "travel_db")
+DB_USER = os.environ.get("DB_USER", "postgres")
+DB_PASSWORD = os.environ.get("DB_PASSWORD", "postgres")
+
+# Connection pool size
+DB_POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.environ.get("DB_POOL_MAX", "10"))
+
+# Longest query text written to the log
+MAX_LOGGED_QUERY = 200
+
+_pool = None
+_pool_lock = threading.Lock()
 
-def execute_query(query: str) -> str:
-    """Execute a query and prints output as text."""
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool.ThreadedConnectionPool(
+                    DB_POOL_MIN,
+                    DB_POOL_MAX,
+                    host=DB_HOST,
+                    port=DB_PORT,
+                    dbname=DB_NAME,
+                    user=DB_USER,
+                    password=DB_PASSWORD
+                )
+    return _pool
+
+def close_pool():
+    """Close every pooled connection."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+@contextmanager
+def connection():
+    """Borrow a connection from the pool and return it when done."""
+    db_pool = get_pool()
+    conn = db_pool.getconn()
     try:
-        # Establish the database connection
-        logger.info(f"Executing query: {query}")
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Execute the provided query
-        cursor.execute(query)
-
-        output = ""
-
-        # If it's a SELECT query, fetch the results
-        if query.strip().lower().startswith("select"):
-            results = cursor.fetchall()
-            # Format results as a string for display
-            output = "\n".join([str(row) for row in results])
-            logger.info(f"Query result: {output}")  # Log query result
+        yield conn
+    finally:
+        # Never hand a connection in a failed transaction to the next user
+        if conn.closed:
+            db_pool.putconn(conn, close=True)
         else:
-            # Commit changes for CREATE, INSERT, UPDATE queries
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            db_pool.putconn(conn)
+
+@contextmanager
+def transaction():
+    """Yield a cursor on a pooled connection; commit on success, roll back on error."""
+    with connection() as conn:
+        try:
+            with conn.cursor() as cursor:
+                yield cursor
             conn.commit()
-            logger.info("Query executed successfully and changes committed.")
+        except Exception:
+            conn.rollback()
+            raise
+
+class _Short:
+    """A query for the log, shortened only if the message is actually written."""
+
+    __slots__ = ("query",)
+
+    def __init__(self, query):
+        self.query = query
+
+    def __str__(self):
+        text = " ".join(str(self.query).split())
+        return text if len(text) <= MAX_LOGGED_QUERY else text[:MAX_LOGGED_QUERY] + "..."
+
+def execute_query(query: str, params=None) -> str:
+    """
+    Execute a query in its own transaction and return its result rows as text, one row per line.
+
+    Statements without a result set return an empty string; errors are logged and their message is returned.
+    """
+    try:
+        logger.debug("Executing query: %s", _Short(query))
+        with transaction() as cursor:
+            # Execute the provided query
+            cursor.execute(query, params)
+
+            output = ""
+
+            # If it's a SELECT query, fetch the results
+            if cursor.description is not None:
+                results = cursor.fetchall()
+                # Format results as a string for display
+                output = "\n".join([str(row) for row in results])
+                logger.debug("Query returned %d rows", len(results))
+            else:
+                logger.debug("Query executed successfully and changes committed.")
 
-        cursor.close()
-        conn.close()        
-        
-        logger.info(output)
+        return output
 
     except Exception as e:
-        logger.error(f"Error executing query: {str(e)}")
-        return str(e)
\ No newline at end of file
+        logger.error("Error executing query: %s", e)
+        return str(e)
+
+def fetch_all(query: str, params=None) -> list:
+    """Execute a query and return all result rows; errors are raised."""
+    with transaction() as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+def execute_many(query: str, rows, page_size: int = 1000) -> int:
+    """Execute a parameterized statement for every row, `page_size` rows per round trip."""
+    rows = list(rows)
+    with transaction() as cursor:
+        execute_batch(cursor, query, rows, page_size=page_size)
+    logger.debug("Executed batch of %d rows: %s", len(rows), _Short(query))
+    return len(rows)
+
+def execute_values(query: str, rows, template=None, page_size: int = 1000, fetch: bool = False):
+    """
+    Insert many rows with a single multi-row VALUES statement per page.
+
+    `query` must contain one `%s` where the VALUES list goes, e.g.
+    `INSERT INTO t (a, b) VALUES %s ON CONFLICT DO NOTHING`.
+    """
+    with transaction() as cursor:
+        result = _execute_values(cursor, query, rows, template=template, page_size=page_size, fetch=fetch)
+    logger.debug("Executed VALUES insert: %s", _Short(query))
+    return result
+
+def _table_identifier(table: str):
+    return sql.Identifier(*table.split("."))
+
+_END = object()
+
+class _CsvRowStream(io.TextIOBase):
+    """Read-only file object that renders rows as CSV lazily, so COPY can stream them."""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._line = io.StringIO()
+        self._writer = csv.writer(self._line)
+        self._pending = ""
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunks, length = [self._pending], len(self._pending)
+        while size < 0 or length < size:
+            row = next(self._rows, _END)
+            if row is _END:
+                break
+            self._line.seek(0)
+            self._line.truncate()
+            self._writer.writerow(["\\N" if value is None else value for value in row])
+            line = self._line.getvalue()
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = "".join(chunks)
+        if size < 0:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
+
+def _copy(table: str, columns, stream, cursor=None, null="\\N"):
+    copy_sql = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL {})").format(
+        _table_identifier(table),
+        sql.SQL(", ").join(sql.Identifier(column) for column in columns),
+        sql.Literal(null),
+    )
+    if cursor is not None:
+        cursor.copy_expert(copy_sql, stream)
+    else:
+        with transaction() as own_cursor:
+            own_cursor.copy_expert(copy_sql, stream)
+
+def copy_rows(table: str, columns, rows, cursor=None) -> int:
+    """
+    Bulk load `rows` into `table` with `COPY ... FROM STDIN` in one round trip.
+
+    Rows are streamed as CSV while COPY reads them; None becomes NULL. Runs on
+    `cursor` when given (to share its transaction), otherwise in a transaction
+    of its own.
+    """
+    stream = _CsvRowStream(rows)
+    _copy(table, columns, stream, cursor)
+    logger.debug("Copied %d rows into %s", stream.count, table)
+    return stream.count
+
+def copy_frame(table: str, frame, cursor=None) -> int:
+    """
+    Like `copy_rows`, for a pandas DataFrame whose columns are named after the
+    table's. The frame is rendered as CSV by pyarrow in one call, much faster
+    than row by row; missing values become NULL.
+    """
+    # pyarrow is only needed here
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    buffer = io.BytesIO()
+    # Strings are always quoted, so only missing values are written as bare empty fields
+    pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), buffer,
+                     pa_csv.WriteOptions(include_header=False))
+    buffer.seek(0)
+    _copy(table, list(frame.columns), buffer, cursor, null="")
+    logger.debug("Copied %d rows into %s", len(frame), table)
+    return len(frame)
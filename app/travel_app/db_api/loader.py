@@ -0,0 +1,239 @@
+import os
+import time
+
+import pandas as pd
+
+from scraped_data import PLACE_CSV_COLUMNS, REVIEW_CSV_COLUMNS, review_key
+from travel_app.utils import logger
+from travel_app.db_api.db_operations import transaction, copy_frame
+from travel_app.db_api.spatial import spatial_enabled, refresh_place_nearest_airport
+from travel_app.processing import (deduplicate_places, deduplicate_reviews, normalize_places, normalize_reviews,
+                                   read_csv_files, review_places)
+
+# CSV files read, normalized and staged at a time; a place's reviews are all in one file
+LOAD_CHUNK_FILES = 500
+
+STAGING_PLACE_COLUMNS = ["name", "address", "postal_code", "prefecture", "municipality", "phone", "website",
+                         "rating", "total_reviews", "categories", "latitude", "longitude"]
+STAGING_REVIEW_COLUMNS = ["review_key", "reviewer", "rating", "date", "reviewed_on", "text", "place_name",
+                          "address", "postal_code", "prefecture", "municipality", "phone", "website",
+                          "place_rating", "total_reviews", "categories", "latitude", "longitude"]
+STAGING_PLACE_MAP_COLUMNS = ["name", "latitude", "longitude", "canonical_name", "canonical_latitude",
+                             "canonical_longitude"]
+
+CREATE_STAGING_QUERY = """
+CREATE TEMP TABLE staging_place (
+    name TEXT, address TEXT, postal_code TEXT, prefecture TEXT, municipality TEXT, phone TEXT, website TEXT,
+    rating FLOAT, total_reviews INT, categories TEXT, latitude NUMERIC, longitude NUMERIC
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE staging_review (
+    review_key TEXT, reviewer TEXT, rating SMALLINT, date TEXT, reviewed_on DATE, text TEXT, place_name TEXT, address TEXT,
+    postal_code TEXT, prefecture TEXT, municipality TEXT, phone TEXT, website TEXT, place_rating FLOAT,
+    total_reviews INT, categories TEXT, latitude NUMERIC, longitude NUMERIC
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE staging_place_map (
+    name TEXT, latitude NUMERIC, longitude NUMERIC,
+    canonical_name TEXT, canonical_latitude NUMERIC, canonical_longitude NUMERIC
+) ON COMMIT DROP;
+"""
+
+# Reviews are staged before all places are known; point those of duplicate places at the canonical one
+REKEY_STAGED_REVIEWS_QUERY = """
+UPDATE staging_review s
+SET place_name = m.canonical_name, latitude = m.canonical_latitude, longitude = m.canonical_longitude
+FROM staging_place_map m
+WHERE s.place_name = m.name
+  AND s.latitude IS NOT DISTINCT FROM m.latitude
+  AND s.longitude IS NOT DISTINCT FROM m.longitude;
+"""
+
+
+def _place_key(name: str, latitude: str, longitude: str) -> str:
+    """SQL expression for the place deduplication key: name plus coordinates rounded to ~1 m."""
+    return (
+        f"md5(lower({name}) || '|' || coalesce(round({latitude}, 5)::TEXT, '')"
+        f" || '|' || coalesce(round({longitude}, 5)::TEXT, ''))"
+    )
+
+
+# Rows are cleaned and typed by travel_app.processing before they are staged
+UPSERT_PLACES_QUERY = f"""
+WITH source AS (
+    SELECT name, address, postal_code, prefecture, municipality, phone, website, rating, total_reviews,
+           categories, latitude, longitude
+    FROM staging_place
+    UNION ALL
+    SELECT DISTINCT place_name, address, postal_code, prefecture, municipality, phone, website, place_rating,
+           total_reviews, categories, latitude, longitude
+    FROM staging_review
+),
+cleaned AS (
+    SELECT
+        {_place_key("name", "latitude", "longitude")} AS place_key,
+        left(name, 255) AS name,
+        address,
+        postal_code,
+        prefecture,
+        municipality,
+        left(phone, 64) AS phone,
+        website,
+        rating,
+        total_reviews,
+        left(categories, 255) AS categories,
+        latitude,
+        longitude
+    FROM source
+    WHERE name IS NOT NULL
+)
+INSERT INTO Place (place_key, name, address, postal_code, prefecture, municipality, phone, website, rating,
+                   total_reviews, categories, latitude, longitude)
+SELECT DISTINCT ON (place_key)
+    place_key, name, address, postal_code, prefecture, municipality, phone, website, rating, total_reviews,
+    categories, latitude, longitude
+FROM cleaned
+ORDER BY place_key, total_reviews DESC NULLS LAST
+ON CONFLICT (place_key) DO UPDATE SET
+    address = COALESCE(EXCLUDED.address, Place.address),
+    postal_code = COALESCE(EXCLUDED.postal_code, Place.postal_code),
+    prefecture = COALESCE(EXCLUDED.prefecture, Place.prefecture),
+    municipality = COALESCE(EXCLUDED.municipality, Place.municipality),
+    phone = COALESCE(EXCLUDED.phone, Place.phone),
+    website = COALESCE(EXCLUDED.website, Place.website),
+    rating = COALESCE(EXCLUDED.rating, Place.rating),
+    total_reviews = COALESCE(EXCLUDED.total_reviews, Place.total_reviews),
+    categories = COALESCE(EXCLUDED.categories, Place.categories),
+    latitude = EXCLUDED.latitude,
+    longitude = EXCLUDED.longitude,
+    updated_at = now()
+-- Only places that actually change are touched, so updated_at tells what changed since a given time
+WHERE (Place.address, Place.postal_code, Place.prefecture, Place.municipality, Place.phone, Place.website,
+       Place.rating, Place.total_reviews, Place.categories, Place.latitude, Place.longitude)
+    IS DISTINCT FROM (
+        COALESCE(EXCLUDED.address, Place.address),
+        COALESCE(EXCLUDED.postal_code, Place.postal_code),
+        COALESCE(EXCLUDED.prefecture, Place.prefecture),
+        COALESCE(EXCLUDED.municipality, Place.municipality),
+        COALESCE(EXCLUDED.phone, Place.phone),
+        COALESCE(EXCLUDED.website, Place.website),
+        COALESCE(EXCLUDED.rating, Place.rating),
+        COALESCE(EXCLUDED.total_reviews, Place.total_reviews),
+        COALESCE(EXCLUDED.categories, Place.categories),
+        EXCLUDED.latitude,
+        EXCLUDED.longitude
+    );
+"""
+
+INSERT_REVIEWS_QUERY = f"""
+INSERT INTO Review (review_key, place_id, reviewer, rating, review_date, reviewed_on, text)
+SELECT DISTINCT ON (review_key) review_key, place_id, reviewer, rating, review_date, reviewed_on, text
+FROM (
+    SELECT
+        -- s.review_key is scraped_data.review_key: reviewer and start of the text, no relative date
+        md5(p.place_key || '|' || s.review_key) AS review_key,
+        p.ID AS place_id,
+        left(s.reviewer, 255) AS reviewer,
+        s.rating,
+        left(s.date, 64) AS review_date,
+        s.reviewed_on,
+        s.text
+    FROM staging_review s
+    JOIN Place p ON p.place_key = {_place_key("s.place_name", "s.latitude", "s.longitude")}
+) reviews
+-- Reviews loaded before reviewed_on existed get it filled in
+ON CONFLICT (review_key) DO UPDATE SET reviewed_on = EXCLUDED.reviewed_on
+WHERE Review.reviewed_on IS NULL AND EXCLUDED.reviewed_on IS NOT NULL;
+"""
+
+
+def find_csv_files(paths):
+    """Return every CSV file in `paths` (files or directories), sorted."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".csv"))
+        elif path.endswith(".csv"):
+            files.append(path)
+    return sorted(files)
+
+
+def review_keys(reviews):
+    """`scraped_data.review_key` of every review of a normalized `REVIEW_COLUMNS` frame."""
+    reviewers = reviews["reviewer"].fillna("").tolist()
+    texts = reviews["text"].fillna("").tolist()
+    return pd.Series([review_key(reviewer, text) for reviewer, text in zip(reviewers, texts)],
+                     index=reviews.index, dtype="string")
+
+
+def load_csv_files(paths, dedup=True, chunk_files=LOAD_CHUNK_FILES):
+    """
+    Load scraped place and review CSVs into the Place and Review tables.
+
+    The files are read `chunk_files` at a time, cleaned in one vectorized pass
+    (`travel_app.processing`) and their reviews streamed into a temporary
+    staging table with COPY, so only the places and one chunk of reviews are
+    held in memory. Then places and reviews are upserted in two set-based
+    statements: places are deduplicated on name and coordinates, reviews on
+    place, reviewer and start of the text (`scraped_data.review_key`), so
+    rescraping a place with newer relative dates adds no duplicates. Unless
+    `dedup` is False, near-duplicate places across all files are collapsed,
+    and near-duplicate reviews within a chunk are dropped
+    (`travel_app.processing.dedup`). With PostGIS the nearest airport of the
+    new and updated places is refreshed too. Everything runs in one
+    transaction. Returns a dict of row counts; `places_upserted` only counts
+    places that were inserted or actually changed.
+    """
+    started = time.monotonic()
+    files = find_csv_files(paths)
+    logger.info("Loading %d CSV files from %s", len(files), ", ".join(paths))
+    places, referenced_places = [], []
+    staged_reviews = duplicate_reviews = duplicate_places = 0
+
+    with transaction() as cursor:
+        cursor.execute(CREATE_STAGING_QUERY)
+        # At least one (possibly empty) chunk, so the frames below exist
+        for start in range(0, max(len(files), 1), chunk_files):
+            chunk = files[start:start + chunk_files]
+            places.append(normalize_places(read_csv_files(chunk, PLACE_CSV_COLUMNS)))
+            reviews = normalize_reviews(read_csv_files(chunk, REVIEW_CSV_COLUMNS))
+            if dedup:
+                referenced_places.append(review_places(reviews))
+                scraped_reviews = len(reviews)
+                reviews = deduplicate_reviews(reviews)
+                duplicate_reviews += scraped_reviews - len(reviews)
+            reviews["review_key"] = review_keys(reviews)
+            staged_reviews += copy_frame("staging_review", reviews[STAGING_REVIEW_COLUMNS], cursor)
+            logger.debug("Staged %d reviews of %d files", staged_reviews, start + len(chunk))
+
+        places = pd.concat(places, ignore_index=True)
+        if dedup:
+            places, mapping = deduplicate_places(places, pd.concat(referenced_places, ignore_index=True))
+            duplicate_places = len(mapping)
+            if duplicate_places:
+                copy_frame("staging_place_map", mapping[STAGING_PLACE_MAP_COLUMNS], cursor)
+                cursor.execute(REKEY_STAGED_REVIEWS_QUERY)
+            logger.debug("Collapsed %d duplicate places and %d duplicate reviews", duplicate_places,
+                         duplicate_reviews)
+        staged_places = copy_frame("staging_place", places[STAGING_PLACE_COLUMNS], cursor)
+        cursor.execute("ANALYZE staging_place; ANALYZE staging_review;")
+
+        cursor.execute(UPSERT_PLACES_QUERY)
+        upserted_places = cursor.rowcount
+        cursor.execute(INSERT_REVIEWS_QUERY)
+        inserted_reviews = cursor.rowcount
+        nearest_airports = refresh_place_nearest_airport(cursor=cursor) if spatial_enabled(cursor) else None
+
+    counts = {
+        "files": len(files),
+        "staged_places": staged_places,
+        "staged_reviews": staged_reviews,
+        "duplicate_places": duplicate_places,
+        "duplicate_reviews": duplicate_reviews,
+        "places_upserted": upserted_places,
+        "reviews_inserted": inserted_reviews,
+    }
+    if nearest_airports is not None:
+        counts["nearest_airports_refreshed"] = nearest_airports
+    logger.info("Loaded CSVs in %.1fs: %s", time.monotonic() - started, counts)
+    return counts
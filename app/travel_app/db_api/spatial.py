@@ -0,0 +1,90 @@
+from travel_app.db_api.db_operations import fetch_all, transaction
+
+# The query point as a geography, from %(latitude)s and %(longitude)s parameters
+_POINT = "ST_SetSRID(ST_MakePoint(%(longitude)s, %(latitude)s), 4326)::geography"
+
+# Nearest airport of the places that have none yet or changed since it was computed (or of every
+# place with %(full)s). The LATERAL subquery is a KNN scan of the Airport GiST index per place.
+REFRESH_NEAREST_AIRPORT_QUERY = """
+INSERT INTO place_nearest_airport (place_id, airport_id, distance_m, computed_at)
+SELECT p.ID, a.ID, ST_Distance(p.geog, a.geog), now()
+FROM Place p
+LEFT JOIN place_nearest_airport n ON n.place_id = p.ID
+CROSS JOIN LATERAL (
+    SELECT Airport.ID, Airport.geog
+    FROM Airport
+    WHERE Airport.geog IS NOT NULL
+    ORDER BY Airport.geog <-> p.geog
+    LIMIT 1
+) a
+WHERE p.geog IS NOT NULL
+  AND (%(full)s OR n.place_id IS NULL OR p.updated_at > n.computed_at)
+ON CONFLICT (place_id) DO UPDATE SET
+    airport_id = EXCLUDED.airport_id,
+    distance_m = EXCLUDED.distance_m,
+    computed_at = EXCLUDED.computed_at;
+"""
+
+PLACES_WITHIN_QUERY = f"""
+SELECT ID, name, ST_Distance(geog, {_POINT}) AS distance_m
+FROM Place
+WHERE ST_DWithin(geog, {_POINT}, %(radius_m)s)
+ORDER BY geog <-> {_POINT}
+LIMIT %(limit)s;
+"""
+
+NEAREST_PLACES_QUERY = f"""
+SELECT ID, name, ST_Distance(geog, {_POINT}) AS distance_m
+FROM Place
+WHERE geog IS NOT NULL
+ORDER BY geog <-> {_POINT}
+LIMIT %(limit)s;
+"""
+
+NEAREST_AIRPORT_QUERY = """
+SELECT a.ID, a.name, a.prefix, n.distance_m
+FROM place_nearest_airport n
+JOIN Airport a ON a.ID = n.airport_id
+WHERE n.place_id = %(place_id)s;
+"""
+
+
+def spatial_enabled(cursor=None) -> bool:
+    """Whether `create_database` set up the geography columns (it does when PostGIS is available)."""
+    query = "SELECT to_regclass('place_nearest_airport') IS NOT NULL"
+    if cursor is not None:
+        cursor.execute(query)
+        return cursor.fetchone()[0]
+    return fetch_all(query)[0][0]
+
+
+def refresh_place_nearest_airport(full=False, cursor=None) -> int:
+    """
+    Recompute the nearest airport of new and updated places, or of all places
+    with `full` (after airports changed). Runs on `cursor` when given, so the
+    loader refreshes in the same transaction as it upserts. Returns the number
+    of places refreshed.
+    """
+    if cursor is not None:
+        cursor.execute(REFRESH_NEAREST_AIRPORT_QUERY, {"full": full})
+        return cursor.rowcount
+    with transaction() as own_cursor:
+        own_cursor.execute(REFRESH_NEAREST_AIRPORT_QUERY, {"full": full})
+        return own_cursor.rowcount
+
+
+def places_within(latitude: float, longitude: float, radius_m: float, limit: int = None) -> list:
+    """`(ID, name, distance_m)` of the places within `radius_m` metres of a point, nearest first."""
+    return fetch_all(PLACES_WITHIN_QUERY, {"latitude": latitude, "longitude": longitude,
+                                           "radius_m": radius_m, "limit": limit})
+
+
+def nearest_places(latitude: float, longitude: float, limit: int = 10) -> list:
+    """`(ID, name, distance_m)` of the `limit` places nearest to a point."""
+    return fetch_all(NEAREST_PLACES_QUERY, {"latitude": latitude, "longitude": longitude, "limit": limit})
+
+
+def nearest_airport(place_id: int):
+    """`(ID, name, prefix, distance_m)` of a place's nearest airport, or None."""
+    rows = fetch_all(NEAREST_AIRPORT_QUERY, {"place_id": place_id})
+    return rows[0] if rows else None
@@ -1,14 +1,105 @@
-from travel_app.utils.logging import logger
-from travel_app.db_api.db_operations import execute_query
+import argparse
+import csv
+
+from travel_app.utils.logging import LEVELS, logger
+from travel_app.db_api.db_operations import execute_query, close_pool, fetch_all
 from travel_app.db_api.create_database import create_database
+from travel_app.db_api.loader import load_csv_files
+from travel_app.db_api.spatial import spatial_enabled, refresh_place_nearest_airport
+from travel_app.search import ReviewSearchIndex
+from travel_app.translation import BACKENDS, Translator
+
+# What `travel_app translate` translates: (ID, text) rows
+TRANSLATE_QUERIES = {
+    "places": "SELECT ID, name FROM Place ORDER BY ID",
+    "reviews": "SELECT ID, text FROM Review WHERE text <> '' ORDER BY ID",
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="travel_app")
+    parser.add_argument("--log-level", choices=list(LEVELS), default=None,
+                        help="only log messages of this level and above (default: $TRAVEL_APP_LOG_LEVEL or INFO)")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("create-db", help="create the tables and insert the reference data (default), once before the other commands")
+    load_parser = subparsers.add_parser("load-csv", help="load scraped place and review CSVs into the database")
+    load_parser.add_argument("paths", nargs="*", default=["outputs", "scrapped_locations"],
+                             help="CSV files or directories of CSV files")
+    load_parser.add_argument("--keep-duplicates", action="store_true",
+                             help="load near-duplicate places and reviews as they are")
+    subparsers.add_parser("refresh-nearest-airports",
+                          help="recompute the nearest airport of every place (needs PostGIS), e.g. after editing airports")
+    index_parser = subparsers.add_parser("index-reviews",
+                                         help="add the reviews loaded since the last run to the search index")
+    index_parser.add_argument("--rebuild", action="store_true", help="index every review again from scratch")
+    search_parser = subparsers.add_parser("search", help="search the review text, best match first")
+    search_parser.add_argument("query", help="keywords, all of which must appear, e.g. '駐車場 広い'")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.add_argument("--place-id", type=int, default=None, help="only search the reviews of this place")
+    search_parser.add_argument("--any", action="store_true", help="match reviews with any of the keywords")
+    translate_parser = subparsers.add_parser(
+        "translate", help="translate place names or review texts, sending only text not translated before")
+    translate_parser.add_argument("what", choices=list(TRANSLATE_QUERIES))
+    translate_parser.add_argument("--source", default="auto", help="source language (default: auto)")
+    translate_parser.add_argument("--target", default="en", help="target language (default: en)")
+    translate_parser.add_argument("--backend", choices=list(BACKENDS), default="libretranslate",
+                                  help="libretranslate ($TRAVEL_APP_TRANSLATE_URL) or stub (offline, for testing)")
+    translate_parser.add_argument("--workers", type=int, default=4, help="batches translated at the same time")
+    translate_parser.add_argument("--output", default=None, help="write ID, text and translation rows to this CSV")
+    return parser.parse_args(argv)
 
 
+def search_reviews(args):
+    with ReviewSearchIndex() as index:
+        hits = index.search(args.query, limit=args.limit, place_id=args.place_id, any_term=args.any)
+    for hit in hits:
+        text = " ".join(hit["text"].split())
+        print(f"[{hit['score']:.2f}] {hit['place_name']} ({hit['rating']}/5, {hit['reviewed_on']}): {text[:200]}")
 
-def main():
-    create_database()
+
+def translate_texts(args):
+    rows = fetch_all(TRANSLATE_QUERIES[args.what])
+    translator = Translator(BACKENDS[args.backend](), max_workers=args.workers)
+    translations = translator.translate([row[1] for row in rows], args.source, args.target)
+    logger.info("%d of %d %s translated", sum(text is not None for text in translations), len(rows), args.what)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["ID", "Text", "Translation"])
+            writer.writerows((row[0], row[1], text) for row, text in zip(rows, translations))
+    translator.cache.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.log_level:
+        logger.set_level(args.log_level)
+    try:
+        if args.command in (None, "create-db"):
+            create_database()
+        elif args.command == "search":
+            search_reviews(args)
+        elif args.command == "load-csv":
+            load_csv_files(args.paths, dedup=not args.keep_duplicates)
+            with ReviewSearchIndex() as index:
+                index.update()
+        elif args.command == "index-reviews":
+            with ReviewSearchIndex() as index:
+                if args.rebuild:
+                    index.rebuild()
+                else:
+                    index.update()
+        elif args.command == "translate":
+            translate_texts(args)
+        elif args.command == "refresh-nearest-airports":
+            if spatial_enabled():
+                logger.info("Refreshed the nearest airport of %d places", refresh_place_nearest_airport(full=True))
+            else:
+                logger.error("PostGIS is not enabled on the database; nothing to refresh.")
+    finally:
+        close_pool()
 
 
 if __name__ == "__main__":
     logger.info("Executing create, insert, and select queries")
     main()
-
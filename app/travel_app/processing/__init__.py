@@ -0,0 +1,2 @@
+from scraped_data.normalize import normalize_places, normalize_reviews, read_csv_files
+from .dedup import deduplicate, deduplicate_places, deduplicate_reviews, rekey_reviews, review_places
@@ -0,0 +1,310 @@
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from scraped_data.normalize import PLACE_COLUMNS
+from travel_app.processing.geo import haversine_km
+
+# The place columns repeated on the review rows, in `PLACE_COLUMNS` order
+REVIEW_PLACE_COLUMNS = [{"name": "place_name", "rating": "place_rating"}.get(column, column)
+                        for column in PLACE_COLUMNS]
+# What the loader identifies a place by (see db_api.loader._place_key)
+PLACE_KEY_COLUMNS = ["name", "latitude", "longitude"]
+
+_FNV_PRIME = np.uint64(0x100000001B3)
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def _mix(values):
+    # splitmix64 finalizer: spreads the bits of a 64-bit hash
+    values = np.asarray(values, dtype="uint64")
+    with np.errstate(over="ignore"):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def shingle_hashes(texts, k=3):
+    """
+    64-bit hashes of the `k`-character shingles of every text, as `(hashes,
+    docs)` arrays where `docs` holds the position of the shingle's text.
+    Texts shorter than `k` are a single shingle and missing or empty texts
+    have none. Runs in numpy over all texts at once.
+    """
+    texts = ["" if text is None or text is pd.NA else str(text) for text in texts]
+    lengths = np.fromiter(map(len, texts), dtype="int64", count=len(texts))
+    padding = "\0" * (k - 1)
+    codes = np.frombuffer("".join(text + padding for text in texts).encode("utf-32-le"), dtype="uint32")
+    # Start of every shingle: each text's first `len - k + 1` positions, or its first one if shorter
+    counts = np.where(lengths >= k, lengths - k + 1, (lengths > 0).astype("int64"))
+    text_starts = np.concatenate(([0], np.cumsum(lengths + k - 1)[:-1]))
+    docs = np.repeat(np.arange(len(texts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    starts = np.repeat(text_starts, counts) + offsets
+    hashes = codes[starts].astype("uint64")
+    with np.errstate(over="ignore"):
+        for i in range(1, k):
+            hashes = (hashes * _FNV_PRIME) ^ codes[starts + i]
+    return _mix(hashes), docs
+
+
+def token_hashes(values):
+    """Stable 64-bit hashes of whole values (e.g. rounded coordinates), one token per row."""
+    values = np.asarray(values, dtype=object)
+    return pd.util.hash_array(values, categorize=True), np.arange(len(values))
+
+
+def minhash_signatures(hashes, docs, n, num_perm=64, seed=0):
+    """
+    `(n, num_perm)` MinHash signatures of the sets of `hashes` of `n`
+    documents (`docs` gives the document of every hash) and a mask of the
+    documents that have any hash. The fraction of equal columns of two
+    signatures estimates the Jaccard similarity of their sets.
+    """
+    order = np.argsort(docs, kind="stable")
+    hashes, docs = hashes[order], docs[order]
+    present = np.zeros(n, dtype=bool)
+    present[docs] = True
+    starts = np.searchsorted(docs, np.flatnonzero(present))
+    rng = np.random.default_rng(seed)
+    # Multiply-shift hashing: the high 32 bits of a * h + b (mod 2**64) for random odd `a`
+    a = rng.integers(0, np.iinfo("uint64").max, size=num_perm, dtype="uint64", endpoint=True) | np.uint64(1)
+    b = rng.integers(0, np.iinfo("uint64").max, size=num_perm, dtype="uint64", endpoint=True)
+    signatures = np.full((n, num_perm), np.iinfo("uint32").max, dtype="uint32")
+    if len(hashes) == 0:
+        return signatures, present
+    with np.errstate(over="ignore"):
+        for perm in range(num_perm):
+            values = ((hashes * a[perm] + b[perm]) >> np.uint64(32)).astype("uint32")
+            signatures[present, perm] = np.minimum.reduceat(values, starts)
+    return signatures, present
+
+
+def lsh_pairs(signatures, present, bands=16):
+    """
+    Candidate pairs `(i, j)` of similar signatures, without comparing every
+    pair: documents whose signatures agree on all rows of any of `bands`
+    bands share a bucket, and each is paired with the first document of its
+    bucket. With 64 permutations in 16 bands, pairs of Jaccard similarity
+    0.8 become candidates with probability 0.9998 and pairs of 0.3 with 0.12.
+    """
+    rows = signatures.shape[1] // bands
+    candidates = np.flatnonzero(present)
+    pairs = []
+    for band in range(bands):
+        keys = np.zeros(len(candidates), dtype="uint64")
+        with np.errstate(over="ignore"):
+            for column in signatures[candidates, band * rows:(band + 1) * rows].T:
+                keys = _mix(keys * _FNV_PRIME ^ column.astype("uint64"))
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        bucket_first = order[np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))]
+        linked = ~first
+        pairs.append(np.column_stack((candidates[bucket_first[linked]], candidates[order[linked]])))
+    pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype="int64")
+    return np.unique(pairs, axis=0)
+
+
+def cluster(signatures, present, threshold=0.8, bands=16, groups=None, priority=None, checks=(),
+            pair_filter=None):
+    """
+    Canonical position of every document: documents whose estimated Jaccard
+    similarity is at least `threshold` are linked if, with `groups`, they
+    share a group code, for every `(signatures, threshold)` of `checks` they
+    are that similar on those signatures too, and `pair_filter(left, right)`
+    (arrays of positions) accepts them. Every connected cluster maps to its
+    member with the highest `priority` (the first one on ties). Documents
+    that are not near-duplicates of anything map to themselves.
+    """
+    n = len(signatures)
+    pairs = lsh_pairs(signatures, present, bands)
+    left, right = pairs[:, 0], pairs[:, 1]
+    similar = (signatures[left] == signatures[right]).mean(axis=1) >= threshold
+    if groups is not None:
+        groups = np.asarray(groups)
+        similar &= groups[left] == groups[right]
+    for other, other_threshold in checks:
+        similar &= (other[left] == other[right]).mean(axis=1) >= other_threshold
+    if pair_filter is not None and len(left):
+        similar &= np.asarray(pair_filter(left, right), dtype=bool)
+    left, right = left[similar], right[similar]
+    graph = coo_matrix((np.ones(len(left), dtype="int8"), (left, right)), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    priority = np.zeros(n) if priority is None else np.asarray(priority, dtype="float64")
+    # Best member of every cluster: sort by label, then priority descending, then position
+    order = np.lexsort((np.arange(n), -np.nan_to_num(priority, nan=-np.inf), labels))
+    first = np.ones(n, dtype=bool)
+    first[1:] = labels[order][1:] != labels[order][:-1]
+    best = np.empty(labels.max() + 1 if n else 0, dtype="int64")
+    best[labels[order][first]] = order[first]
+    return best[labels]
+
+
+def _fold(text: str) -> str:
+    if not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def _folded(series):
+    """
+    Case, width and punctuation insensitive text of every row, "" for NA, as
+    an object array. Folded in Python, per distinct value: the regex engine
+    behind Arrow-backed strings only knows ASCII word characters.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    folded = np.array(["" if value is None or value is pd.NA else _fold(str(value)) for value in uniques],
+                      dtype=object)
+    return folded[codes]
+
+
+def place_canonical(places, threshold=0.8, name_threshold=0.5, max_km=2.0, num_perm=64, bands=16):
+    """
+    Canonical row label of every place (`PLACE_COLUMNS` frame): places are
+    fingerprinted by the shingles of their normalized name and address plus
+    their coordinates rounded to about 1 km and 100 m, and link when those
+    fingerprints are `threshold` similar and their names alone
+    `name_threshold` similar, and they are at most `max_km` apart (places
+    without coordinates never link). The same place scraped under name
+    variants or with slightly drifting coordinates clusters together, while
+    chain stores (one name, other addresses and coordinates), distinct
+    sights sharing an address and places whose scraped coordinates point
+    somewhere else entirely do not. Each cluster maps to its place with the
+    most reviews.
+    """
+    if places.empty:
+        return pd.Series(places.index, index=places.index)
+    name_hashes, name_docs = shingle_hashes(_folded(places["name"]))
+    address_hashes, address_docs = shingle_hashes("\x01" + _folded(places["address"]))
+    latitude, longitude = places["latitude"].astype("Float64"), places["longitude"].astype("Float64")
+    parts = [(name_hashes, name_docs), (address_hashes, address_docs)]
+    for decimals in (2, 3):
+        cells = latitude.round(decimals).astype("string") + "," + longitude.round(decimals).astype("string")
+        hashes, docs = token_hashes(cells.to_numpy(dtype=object))
+        keep = cells.notna().to_numpy()
+        parts.append((hashes[keep], docs[keep]))
+    hashes = np.concatenate([part[0] for part in parts])
+    docs = np.concatenate([part[1] for part in parts])
+    signatures, present = minhash_signatures(hashes, docs, len(places), num_perm)
+    name_signatures, _ = minhash_signatures(name_hashes, name_docs, len(places), num_perm)
+    priority = places["total_reviews"].astype("Float64").to_numpy(dtype="float64", na_value=np.nan)
+    latitudes = latitude.to_numpy(dtype="float64", na_value=np.nan)
+    longitudes = longitude.to_numpy(dtype="float64", na_value=np.nan)
+
+    def near(left, right):
+        # LSH only sees rounded-coordinate tokens, which matching names and addresses can outvote
+        distances = haversine_km(latitudes[left], longitudes[left], latitudes[right], longitudes[right])
+        return distances <= max_km
+
+    canonical = cluster(signatures, present, threshold, bands, priority=priority,
+                        checks=[(name_signatures, name_threshold)], pair_filter=near)
+    return pd.Series(places.index[canonical], index=places.index)
+
+
+def review_canonical(reviews, threshold=0.85, num_perm=64, bands=16, k=3):
+    """
+    Canonical row label of every review (`REVIEW_COLUMNS` frame): reviews of
+    the same place by the same reviewer whose text shingles have an
+    estimated Jaccard similarity of at least `threshold` (e.g. the same
+    review scraped twice, once truncated) cluster together and map to the
+    longest text, and identical reviews to the first. Only the reviews that
+    share place and reviewer with a different text are fingerprinted.
+    """
+    if reviews.empty:
+        return pd.Series(reviews.index, index=reviews.index)
+    groups, _ = pd.factorize(pd.MultiIndex.from_frame(reviews[["place_name", "latitude", "longitude", "reviewer"]]))
+    text_codes, _ = pd.factorize(reviews["text"], use_na_sentinel=False)
+    # Identical reviews map to the first; only groups left with several texts can hold near-duplicates
+    unique_keys, positions, inverse = np.unique(
+        np.column_stack((groups, text_codes)), axis=0, return_index=True, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+    canonical = np.arange(len(positions))
+    candidates = np.flatnonzero(np.bincount(unique_keys[:, 0])[unique_keys[:, 0]] > 1)
+    if len(candidates):
+        texts = _folded(reviews["text"].iloc[positions[candidates]])
+        hashes, docs = shingle_hashes(texts, k)
+        signatures, present = minhash_signatures(hashes, docs, len(candidates), num_perm)
+        priority = np.fromiter(map(len, texts), dtype="float64", count=len(texts))
+        canonical[candidates] = candidates[
+            cluster(signatures, present, threshold, bands, groups=unique_keys[candidates, 0], priority=priority)
+        ]
+    return pd.Series(reviews.index[positions[canonical[inverse]]], index=reviews.index)
+
+
+def _key(frame, columns):
+    # One string per row of the place key columns, NA included
+    key = frame[columns[0]].astype("string").fillna("\0")
+    for column in columns[1:]:
+        key = key + "|" + frame[column].astype("string").fillna("\0")
+    return key
+
+
+def deduplicate_places(places, review_places, threshold=0.8):
+    """
+    Cluster the places of a `PLACE_COLUMNS` frame and the distinct places
+    reviews refer to (`review_places`, also with `PLACE_COLUMNS`) by
+    `place_canonical`. Returns the places with every duplicate re-keyed to its
+    canonical place's name and coordinates, so the loader merges them into one
+    Place row, and the mapping of every re-keyed place (name, latitude,
+    longitude) to its canonical_name, canonical_latitude and canonical_longitude.
+    """
+    keys = PLACE_KEY_COLUMNS
+    table = pd.concat([places[PLACE_COLUMNS], review_places[PLACE_COLUMNS].drop_duplicates(keys)], ignore_index=True)
+    table = table.drop_duplicates(keys, ignore_index=True)
+    canonical = place_canonical(table, threshold)
+    moved = (canonical != canonical.index).to_numpy()
+    mapping = table.loc[moved, keys].reset_index(drop=True)
+    for column in keys:
+        mapping[f"canonical_{column}"] = table[column].iloc[canonical[moved].to_numpy()].to_numpy()
+    if len(mapping):
+        places = _rekey(places, keys, mapping)
+    return places, mapping
+
+
+def deduplicate_reviews(reviews, threshold=0.85):
+    """The reviews of a `REVIEW_COLUMNS` frame without the near-duplicates found by `review_canonical`."""
+    review_rows = review_canonical(reviews, threshold)
+    return reviews[(review_rows == review_rows.index).to_numpy()]
+
+
+def review_places(reviews):
+    """The distinct places `reviews` (a `REVIEW_COLUMNS` frame) refer to, with `PLACE_COLUMNS`."""
+    return reviews[REVIEW_PLACE_COLUMNS].set_axis(PLACE_COLUMNS, axis=1).drop_duplicates(PLACE_KEY_COLUMNS)
+
+
+def deduplicate(places, reviews, place_threshold=0.8, review_threshold=0.85):
+    """
+    Collapse near-duplicate places and reviews of normalized frames before
+    loading: places from both frames are clustered by `deduplicate_places`
+    and the reviews re-keyed to the canonical places too, then near-duplicate
+    reviews are dropped (`deduplicate_reviews`). Returns the places, the
+    reviews and the mapping of re-keyed places.
+    """
+    places, mapping = deduplicate_places(places, review_places(reviews), place_threshold)
+    if len(mapping):
+        reviews = rekey_reviews(reviews, mapping)
+    return places, deduplicate_reviews(reviews, review_threshold), mapping
+
+
+def rekey_reviews(reviews, mapping):
+    """`reviews` with the place columns of every re-keyed place in `mapping` replaced by its canonical place's."""
+    return _rekey(reviews, ["place_name", "latitude", "longitude"], mapping)
+
+
+def _rekey(frame, columns, mapping):
+    # Replace the place key columns of every row re-keyed in `mapping` with those of its canonical place
+    canonical = mapping.set_axis(_key(mapping, PLACE_KEY_COLUMNS).to_numpy())
+    keys = _key(frame, columns).to_numpy()
+    moved = pd.Series(keys).isin(canonical.index).to_numpy()
+    frame = frame.copy()
+    for column, key_column in zip(columns, PLACE_KEY_COLUMNS):
+        values = canonical[f"canonical_{key_column}"].reindex(keys[moved]).to_numpy()
+        frame.loc[frame.index[moved], column] = values
+    return frame
@@ -0,0 +1,134 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+# Mean Earth radius (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def unit_vectors(latitudes, longitudes):
+    """(n, 3) array of points on the unit sphere for coordinates in degrees."""
+    lat = np.radians(np.asarray(latitudes, dtype="float64"))
+    lon = np.radians(np.asarray(longitudes, dtype="float64"))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def _chord(km):
+    # Straight-line distance through the unit sphere between points `km` apart on its surface
+    return 2 * np.sin(np.minimum(np.asarray(km, dtype="float64") / EARTH_RADIUS_KM, np.pi) / 2)
+
+
+def _kilometres(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in km between coordinates in degrees; broadcasts over arrays."""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype="float64")) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class GeoIndex:
+    """
+    Spatial index over latitude/longitude points, e.g. places or airports.
+
+    Points are stored as unit vectors in a KD-tree, where the straight-line
+    (chord) distance is monotonic in the great-circle distance, so radius and
+    nearest-neighbour queries are exact on the sphere, with no special cases at
+    the poles or the antimeridian. Queries return the `ids` given at
+    construction (row positions by default) with distances in km. The `*_batch`
+    methods answer many queries in one vectorized call, spread over all cores.
+    """
+
+    def __init__(self, latitudes, longitudes, ids=None, leafsize=16):
+        latitudes = np.asarray(latitudes, dtype="float64")
+        longitudes = np.asarray(longitudes, dtype="float64")
+        valid = np.isfinite(latitudes) & np.isfinite(longitudes)
+        ids = np.arange(len(latitudes)) if ids is None else np.asarray(ids)
+        self.ids = ids[valid]
+        self.latitudes = latitudes[valid]
+        self.longitudes = longitudes[valid]
+        self._tree = cKDTree(unit_vectors(self.latitudes, self.longitudes), leafsize=leafsize)
+        # Latitude order, for bounding-box queries
+        self._by_latitude = np.argsort(self.latitudes, kind="stable")
+        self._sorted_latitudes = self.latitudes[self._by_latitude]
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """Index `(id, latitude, longitude)` rows, e.g. the result of `fetch_all`; rows without coordinates are skipped."""
+        rows = [row for row in rows if row[1] is not None and row[2] is not None]
+        ids = np.array([row[0] for row in rows])
+        return cls([float(row[1]) for row in rows], [float(row[2]) for row in rows], ids, **kwargs)
+
+    @classmethod
+    def from_frame(cls, frame, latitude="latitude", longitude="longitude", id_column=None, **kwargs):
+        """Index the rows of a DataFrame, identified by `id_column` or by the frame's index."""
+        ids = frame.index.to_numpy() if id_column is None else frame[id_column].to_numpy()
+        return cls(frame[latitude].to_numpy(dtype="float64", na_value=np.nan),
+                   frame[longitude].to_numpy(dtype="float64", na_value=np.nan), ids, **kwargs)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def within(self, latitude, longitude, radius_km, sort=True):
+        """`(ids, distances_km)` of the points within `radius_km` of a coordinate, nearest first unless `sort` is False."""
+        point = unit_vectors([latitude], [longitude])[0]
+        positions = np.asarray(self._tree.query_ball_point(point, _chord(radius_km)), dtype="intp")
+        distances = _kilometres(np.linalg.norm(self._tree.data[positions] - point, axis=1))
+        if sort:
+            order = np.argsort(distances, kind="stable")
+            positions, distances = positions[order], distances[order]
+        return self.ids[positions], distances
+
+    def nearest(self, latitude, longitude, k=1, max_km=None):
+        """`(ids, distances_km)` of the `k` points nearest to a coordinate, nearest first."""
+        ids, distances = self.nearest_batch([latitude], [longitude], k, max_km)
+        found = np.isfinite(distances[0])
+        return ids[0][found], distances[0][found]
+
+    def nearest_batch(self, latitudes, longitudes, k=1, max_km=None, workers=-1):
+        """
+        The `k` nearest points of every query coordinate at once: `(ids, distances_km)`
+        arrays of shape (n, k). Missing neighbours (fewer than `k` points, or
+        none within `max_km`) have an infinite distance and an id of None.
+        """
+        k = min(k, len(self))
+        points = unit_vectors(latitudes, longitudes)
+        if k == 0:
+            return np.full((len(points), 0), None, dtype=object), np.empty((len(points), 0))
+        bound = np.inf if max_km is None else _chord(max_km) * (1 + 1e-12)
+        chords, positions = self._tree.query(points, k=k, distance_upper_bound=bound, workers=workers)
+        chords, positions = chords.reshape(len(points), k), positions.reshape(len(points), k)
+        found = np.isfinite(chords)
+        ids = np.full(positions.shape, None, dtype=object)
+        ids[found] = self.ids[positions[found]]
+        if found.all() and self.ids.dtype != object:
+            ids = ids.astype(self.ids.dtype)
+        return ids, np.where(found, _kilometres(np.where(found, chords, 0)), np.inf)
+
+    def within_batch(self, latitudes, longitudes, radius_km, workers=-1):
+        """The ids within `radius_km` of every query coordinate, as a list of arrays (unordered)."""
+        points = unit_vectors(latitudes, longitudes)
+        matches = self._tree.query_ball_point(points, _chord(radius_km), workers=workers)
+        return [self.ids[np.asarray(positions, dtype="intp")] for positions in matches]
+
+    def count_within_batch(self, latitudes, longitudes, radius_km, workers=-1):
+        """How many points lie within `radius_km` of every query coordinate."""
+        points = unit_vectors(latitudes, longitudes)
+        return self._tree.query_ball_point(points, _chord(radius_km), workers=workers, return_length=True)
+
+    def within_box(self, south, west, north, east):
+        """
+        Ids of the points inside a latitude/longitude box. A box crossing the
+        antimeridian has `west` > `east`, e.g. (-50, 170, -30, -170).
+        """
+        start = np.searchsorted(self._sorted_latitudes, south, side="left")
+        stop = np.searchsorted(self._sorted_latitudes, north, side="right")
+        positions = self._by_latitude[start:stop]
+        longitudes = self.longitudes[positions]
+        if west <= east:
+            inside = (longitudes >= west) & (longitudes <= east)
+        else:
+            inside = (longitudes >= west) | (longitudes <= east)
+        return self.ids[np.sort(positions[inside])]
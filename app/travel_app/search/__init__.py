@@ -0,0 +1,2 @@
+from .tokenizer import tokenize_document, to_match_query
+from .review_index import ReviewSearchIndex
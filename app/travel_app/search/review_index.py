@@ -0,0 +1,157 @@
+import os
+import sqlite3
+import threading
+import time
+
+from travel_app.utils import logger
+from travel_app.db_api.db_operations import fetch_all
+from travel_app.search.tokenizer import tokenize_document, to_match_query
+
+# Reviews after `last_id`, with their place, in ID order
+NEW_REVIEWS_QUERY = """
+SELECT r.ID, r.place_id, p.name, r.rating, r.reviewed_on, r.text
+FROM Review r
+JOIN Place p ON p.ID = r.place_id
+WHERE r.ID > %(last_id)s AND r.text IS NOT NULL
+ORDER BY r.ID
+LIMIT %(limit)s;
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS review_doc (
+    id INTEGER PRIMARY KEY, -- Review.ID
+    place_id INTEGER NOT NULL,
+    place_name TEXT,
+    rating INTEGER,
+    reviewed_on TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS review_doc_place_idx ON review_doc (place_id);
+-- Contentless: only the bigram postings are stored, the text lives in review_doc under the same rowid
+CREATE VIRTUAL TABLE IF NOT EXISTS review_fts USING fts5(tokens, content='');
+"""
+
+SEARCH_QUERY = """
+SELECT d.id, d.place_id, d.place_name, d.rating, d.reviewed_on, d.text, f.rank
+FROM review_fts f
+JOIN review_doc d ON d.id = f.rowid
+WHERE review_fts MATCH ? {place_filter}
+ORDER BY f.rank
+LIMIT ?
+"""
+
+
+class ReviewSearchIndex:
+    """
+    Full-text index of the Review table, kept in SQLite FTS5.
+
+    Review text is split into character bigrams (`tokenizer.tokenize_document`),
+    so Japanese keywords of any length match without a dictionary, and results
+    are ranked by BM25. `update()` indexes only the reviews loaded since the
+    last update, in ID order. The path defaults to $TRAVEL_APP_SEARCH_DB or
+    review_search.db. Use as a context manager, or call `close()`.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("TRAVEL_APP_SEARCH_DB", "review_search.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def last_id(self) -> int:
+        """ID of the newest indexed review, 0 when empty."""
+        with self._lock:
+            return self._conn.execute("SELECT coalesce(max(id), 0) FROM review_doc").fetchone()[0]
+
+    def add(self, rows) -> int:
+        """
+        Index `(id, place_id, place_name, rating, reviewed_on, text)` rows in one
+        transaction; ids already indexed are skipped. Returns how many were new.
+        """
+        rows = [row for row in rows if row[5]]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                ids = [row[0] for row in rows]
+                known = {row[0] for row in self._conn.execute(
+                    "SELECT id FROM review_doc WHERE id BETWEEN ? AND ?", (min(ids), max(ids)))}
+                rows = [row for row in rows if row[0] not in known]
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO review_doc (id, place_id, place_name, rating, reviewed_on, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(row[0], row[1], row[2], row[3], None if row[4] is None else str(row[4]), row[5]) for row in rows],
+                )
+                self._conn.executemany("INSERT INTO review_fts (rowid, tokens) VALUES (?, ?)",
+                                       [(row[0], tokenize_document(row[5])) for row in rows])
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def update(self, batch_size: int = 10000) -> int:
+        """Index the reviews added to the database since the last update; returns how many."""
+        started = time.monotonic()
+        last_id = self.last_id()
+        added = 0
+        while True:
+            rows = fetch_all(NEW_REVIEWS_QUERY, {"last_id": last_id, "limit": batch_size})
+            if not rows:
+                break
+            added += self.add(rows)
+            last_id = rows[-1][0]
+        logger.info("Indexed %d new reviews for search in %.1fs", added, time.monotonic() - started)
+        return added
+
+    def rebuild(self, batch_size: int = 10000) -> int:
+        """Drop the index and index every review again, then merge the index segments."""
+        with self._lock:
+            self._conn.executescript("DROP TABLE IF EXISTS review_fts; DROP TABLE IF EXISTS review_doc;" + SCHEMA)
+        added = self.update(batch_size)
+        self.optimize()
+        return added
+
+    def optimize(self):
+        """Merge the FTS5 segments written by many small updates, which speeds up queries."""
+        with self._lock:
+            self._conn.execute("INSERT INTO review_fts (review_fts) VALUES ('optimize')")
+
+    def search(self, query: str, limit: int = 20, place_id=None, any_term: bool = False) -> list:
+        """
+        Reviews matching a keyword query, best BM25 match first, as dicts with
+        id, place_id, place_name, rating, reviewed_on, text and score (lower
+        is better). Terms are separated by spaces and must all appear, or any
+        of them with `any_term`; `place_id` restricts the search to one place.
+        """
+        match = to_match_query(query, any_term)
+        if not match:
+            return []
+        params = [match]
+        place_filter = ""
+        if place_id is not None:
+            place_filter = "AND d.place_id = ?"
+            params.append(place_id)
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(SEARCH_QUERY.format(place_filter=place_filter), params).fetchall()
+        columns = ("id", "place_id", "place_name", "rating", "reviewed_on", "text", "score")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def counts(self):
+        """Number of places and reviews in the index."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT place_id), COUNT(*) FROM review_doc").fetchone()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
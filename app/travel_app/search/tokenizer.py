@@ -0,0 +1,65 @@
+import re
+import unicodedata
+
+# Hiragana, katakana (with the long vowel mark) and kanji: scripts written without spaces
+_CJK = "々぀-ヿ㐀-䶿一-鿿豈-﫿"
+_TOKENS = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+# Full-width letters and digits and half-width katakana
+_WIDTH_FORMS = re.compile("[\uff00-\uffef]")
+
+
+def _normalize(text: str) -> str:
+    # NFKC folds the width forms (FTS5 folds the case); it is slow on long Japanese
+    # text, so only text that has any is normalized
+    return unicodedata.normalize("NFKC", text) if _WIDTH_FORMS.search(text) else text
+
+
+def _bigrams(run: str) -> str:
+    return " ".join(map(str.__add__, run, run[1:]))
+
+
+def tokenize_document(text: str) -> str:
+    """
+    Index tokens of `text`, space separated for FTS5's unicode61 tokenizer.
+
+    Japanese has no spaces between words, so every run of Japanese script
+    becomes its overlapping character bigrams ("東京タワー" -> "東京 京タ タワ
+    ワー") plus its last character, which lets one-character queries match
+    at the end of a run as well. Other words are kept whole.
+    """
+    tokens = []
+    for run, word in _TOKENS.findall(_normalize(text or "")):
+        if word:
+            tokens.append(word)
+        elif len(run) > 1:
+            tokens.append(_bigrams(run))
+            tokens.append(run[-1])
+        else:
+            tokens.append(run)
+    return " ".join(tokens)
+
+
+def _quote(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+
+def to_match_query(query: str, any_term: bool = False) -> str:
+    """
+    FTS5 MATCH expression for a keyword query. Each whitespace-separated term
+    must appear (any of them with `any_term`); a Japanese term matches as the
+    phrase of its bigrams, i.e. as a substring, and a single Japanese
+    character as a prefix of any bigram. Returns "" if nothing is searchable.
+    """
+    terms = []
+    for term in query.split():
+        tokens = []
+        for run, word in _TOKENS.findall(_normalize(term)):
+            if word:
+                tokens.append(_quote(word))
+            elif len(run) == 1:
+                tokens.append(_quote(run) + " *")
+            else:
+                tokens.append(_quote(_bigrams(run)))
+        if tokens:
+            terms.append(tokens[0] if len(tokens) == 1 else "(" + " AND ".join(tokens) + ")")
+    return (" OR " if any_term else " AND ").join(terms)
@@ -0,0 +1,2 @@
+from .backends import BACKENDS, LibreTranslateBackend, StubBackend, TranslationError
+from .translator import TranslationCache, Translator, content_key
@@ -0,0 +1,67 @@
+import json
+import os
+
+import urllib3
+
+
+class TranslationError(Exception):
+    """A translation backend failed to translate a batch."""
+
+
+class StubBackend:
+    """
+    Offline backend for tests and dry runs: "translates" by tagging every
+    text with the target language, e.g. "[en] 東京". Records the batches it
+    was asked for in `calls`.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def translate(self, texts, source="auto", target="en"):
+        self.calls.append(list(texts))
+        return [f"[{target}] {text}" for text in texts]
+
+
+class LibreTranslateBackend:
+    """
+    LibreTranslate's HTTP API (e.g. the `translator` service of
+    docker-compose.yml), sending a whole batch per request. The URL and API
+    key default to $TRAVEL_APP_TRANSLATE_URL (http://localhost:5000) and
+    $TRAVEL_APP_TRANSLATE_API_KEY. Connections are pooled and reused, and
+    requests are retried on connection errors, 429 and 5xx with backoff.
+    """
+
+    def __init__(self, url=None, api_key=None, timeout=60.0, retries=3, max_connections=8):
+        self.url = (url or os.environ.get("TRAVEL_APP_TRANSLATE_URL", "http://localhost:5000")).rstrip("/")
+        self.api_key = api_key or os.environ.get("TRAVEL_APP_TRANSLATE_API_KEY")
+        retry = urllib3.Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=None, raise_on_status=False)
+        self._http = urllib3.PoolManager(maxsize=max_connections, retries=retry,
+                                         timeout=urllib3.Timeout(total=timeout))
+
+    def translate(self, texts, source="auto", target="en"):
+        body = {"q": list(texts), "source": source, "target": target, "format": "text"}
+        if self.api_key:
+            body["api_key"] = self.api_key
+        try:
+            response = self._http.request("POST", f"{self.url}/translate", body=json.dumps(body).encode("utf-8"),
+                                          headers={"Content-Type": "application/json"})
+        except urllib3.exceptions.HTTPError as e:
+            raise TranslationError(f"LibreTranslate request failed: {e}") from e
+        try:
+            result = json.loads(response.data.decode("utf-8"))
+        except ValueError:
+            result = {}
+        if response.status != 200:
+            raise TranslationError(f"LibreTranslate returned HTTP {response.status}: {result.get('error', '')}")
+        translated = result.get("translatedText")
+        if not isinstance(translated, list) or len(translated) != len(body["q"]):
+            raise TranslationError("LibreTranslate returned an unexpected response")
+        return translated
+
+
+BACKENDS = {
+    "libretranslate": LibreTranslateBackend,
+    "stub": StubBackend,
+}
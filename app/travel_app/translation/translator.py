@@ -0,0 +1,131 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from travel_app.utils import logger
+from travel_app.translation.backends import TranslationError
+
+
+def content_key(text: str, source: str, target: str) -> str:
+    """Cache key of a translation: sha256 of the language pair and the text."""
+    return hashlib.sha256(f"{source}\0{target}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Translations by content hash, kept in SQLite so that no text is ever sent
+    to the backend twice. The path defaults to $TRAVEL_APP_TRANSLATION_DB or
+    translations.db. Safe to share between threads.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("TRAVEL_APP_TRANSLATION_DB", "translations.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translation (
+                key TEXT PRIMARY KEY, -- content_key(text, source, target)
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+
+    def get_many(self, keys, chunk_size=500) -> dict:
+        """Cached translations of `keys`, as {key: translated}."""
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                rows = self._conn.execute(
+                    f"SELECT key, translated FROM translation WHERE key IN ({', '.join('?' * len(chunk))})", chunk
+                )
+                found.update(rows)
+        return found
+
+    def put_many(self, entries, source: str, target: str):
+        """Store `(key, translated)` pairs."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translation (key, source, target, translated, created_at) VALUES (?, ?, ?, ?, ?)",
+                [(key, source, target, translated, now) for key, translated in entries],
+            )
+            self._conn.execute("COMMIT")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translation").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Translator:
+    """
+    Translate many texts with as few backend calls as possible.
+
+    `translate` strips and deduplicates the texts, answers what it can from
+    the cache, and sends only the rest to the backend in batches of at most
+    `batch_size` texts and `batch_chars` characters, `max_workers` batches at
+    a time. Every finished batch is cached at once, so an interrupted run
+    loses nothing and a refresh only pays for genuinely new text. A batch
+    that fails is logged and left untranslated (None) for the next run.
+    """
+
+    def __init__(self, backend, cache=None, batch_size=32, batch_chars=5000, max_workers=4):
+        self.backend = backend
+        self.cache = cache if cache is not None else TranslationCache()
+        self.batch_size = batch_size
+        self.batch_chars = batch_chars
+        self.max_workers = max_workers
+
+    def _batches(self, texts):
+        batch, chars = [], 0
+        for text in texts:
+            if batch and (len(batch) >= self.batch_size or chars + len(text) > self.batch_chars):
+                yield batch
+                batch, chars = [], 0
+            batch.append(text)
+            chars += len(text)
+        if batch:
+            yield batch
+
+    def translate(self, texts, source="auto", target="en") -> list:
+        """Translations of `texts` in the same order; None for missing text and failed batches."""
+        texts = list(texts)
+        stripped = [text.strip() if isinstance(text, str) else "" for text in texts]
+        keys = {text: content_key(text, source, target) for text in dict.fromkeys(stripped) if text}
+        cached = self.cache.get_many(keys.values())
+        translations = {text: cached[key] for text, key in keys.items() if key in cached}
+        missing = [text for text in keys if text not in translations]
+        started = time.monotonic()
+        if missing:
+            failed = 0
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(self.backend.translate, batch, source, target): batch
+                           for batch in self._batches(missing)}
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    try:
+                        results = future.result()
+                    except TranslationError as e:
+                        failed += len(batch)
+                        logger.error("Translation of %d texts failed: %s", len(batch), e)
+                        continue
+                    self.cache.put_many([(keys[text], result) for text, result in zip(batch, results)], source, target)
+                    translations.update(zip(batch, results))
+            logger.info("Translated %d new texts in %.1fs (%d cached, %d failed)", len(missing) - failed,
+                        time.monotonic() - started, len(keys) - len(missing), failed)
+        return [translations.get(text) for text in stripped]
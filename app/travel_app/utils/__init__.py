@@ -1 +1 @@
-from .logging import Logger, logger
\ No newline at end of file
+from .logging import Logger, configure, logger
\ No newline at end of file
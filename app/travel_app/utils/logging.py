@@ -1,29 +1,148 @@
+import atexit
 import datetime
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Level names accepted by `Logger` and the TRAVEL_APP_LOG_LEVEL environment variable
+LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "ERROR": logging.ERROR,
+}
+
+_queue = queue.SimpleQueue()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class TextFormatter(logging.Formatter):
+    """`[2024-01-01 12:00:00] [TravelApp] [INFO] message`, as the logger always printed."""
+
+    def __init__(self):
+        super().__init__("[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s", "%Y-%m-%d %H:%M:%S")
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the sampling rate of sampled messages."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "logger": record.name,
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "sample_every", 1) > 1:
+            entry["sample_every"] = record.sample_every
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """Enqueue records with the message merged and the traceback rendered, for the listener thread to write."""
+
+    def prepare(self, record):
+        # The stdlib prepare() merges `%` args with getMessage(), so mutable arguments are captured now;
+        # the traceback is kept apart so the JSON format can still report it as its own field
+        exc_text = logging.Formatter().formatException(record.exc_info) if record.exc_info else None
+        record.exc_info = None
+        record = super().prepare(record)
+        record.exc_text = exc_text
+        return record
+
+
+_handler = _QueueHandler(_queue)
+
+
+def configure(json_output=None, stream=None):
+    """
+    Set where and how every logger writes: text or JSON lines (default from
+    TRAVEL_APP_LOG_FORMAT) to `stream` (stdout by default). Called once on
+    import; call again to change the output, queued messages are written first.
+    """
+    global _listener
+    if json_output is None:
+        json_output = os.environ.get("TRAVEL_APP_LOG_FORMAT", "text").lower() == "json"
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(JsonFormatter() if json_output else TextFormatter())
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+        else:
+            atexit.register(shutdown)
+        _listener = QueueListener(_queue, handler)
+        _listener.start()
+
+
+def shutdown():
+    """Write out every queued message and stop the background writer."""
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
 
 class Logger:
-    LEVELS = {
-        "INFO": "INFO",
-        "DEBUG": "DEBUG",
-        "ERROR": "ERROR"
-    }
+    """
+    Leveled logger whose messages are written by a background thread.
 
-    def __init__(self, name="Logger"):
+    Messages below `level` are dropped before anything is formatted, so
+    `logger.debug("Query returned %s rows", count)` costs next to nothing when
+    debug output is off; messages that pass are formatted by the caller and
+    written by the background thread. Pass `sample_every=N` to write only every
+    Nth occurrence of a high-volume message. The level defaults to the
+    TRAVEL_APP_LOG_LEVEL environment variable (DEBUG, INFO or ERROR; INFO by
+    default); the output is shared by every logger, see `configure`.
+    """
+
+    LEVELS = LEVELS
+
+    def __init__(self, name="Logger", level=None):
         self.name = name
+        self.set_level(level or os.environ.get("TRAVEL_APP_LOG_LEVEL", "INFO"))
+        self._samples = {}
 
-    def _log(self, level: str, message: str):
-        if level in self.LEVELS:
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            print(f"[{timestamp}] [{self.name}] [{level}] {message}")
-        else:
-            self._log("ERROR", "invalid log level, choose from [INFO, DEBUG, ERROR]")
+    def set_level(self, level: str):
+        level = level.upper()
+        if level not in LEVELS:
+            raise ValueError(f"invalid log level {level!r}, choose from [{', '.join(LEVELS)}]")
+        self.level = LEVELS[level]
+
+    def is_enabled(self, level: str) -> bool:
+        """Whether messages of `level` are written; use to skip building expensive arguments."""
+        return LEVELS[level] >= self.level
+
+    def _log(self, levelno: int, message, args, sample_every=1, exc_info=None):
+        if sample_every > 1:
+            counter = self._samples.get(message)
+            if counter is None:
+                counter = self._samples.setdefault(message, itertools.count())
+            if next(counter) % sample_every:
+                return
+        record = logging.LogRecord(self.name, levelno, "", 0, message, args or None, exc_info)
+        record.sample_every = sample_every
+        _handler.enqueue(_handler.prepare(record))
+
+    def info(self, message, *args, sample_every=1):
+        if self.level <= logging.INFO:
+            self._log(logging.INFO, message, args, sample_every)
 
-    def info(self, message):
-        self._log("INFO", message)
+    def debug(self, message, *args, sample_every=1):
+        if self.level <= logging.DEBUG:
+            self._log(logging.DEBUG, message, args, sample_every)
 
-    def debug(self, message):
-        self._log("DEBUG", message)
+    def error(self, message, *args, exc_info=False):
+        if self.level <= logging.ERROR:
+            self._log(logging.ERROR, message, args, exc_info=sys.exc_info() if exc_info else None)
 
-    def error(self, message):
-        self._log("ERROR", message)
 
+configure()
 logger = Logger(name="TravelApp")
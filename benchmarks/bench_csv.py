@@ -0,0 +1,38 @@
+"""Consolidating the per-place CSV files in `outputs/` into one DataFrame, and cleaning it."""
+import os
+import sys
+
+import pandas as pd
+
+from benchmarks.common import ROOT, Benchmark, fixture_files
+
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+
+def benchmarks(quick=False):
+    files = fixture_files("outputs/*.csv", limit=200 if quick else 1000)
+    if not files:
+        return []
+
+    def pandas_per_file():
+        # What scrape.ipynb does: one read_csv per file, then concat
+        frames = [pd.read_csv(path, encoding="utf-8-sig", dtype=str) for path in files]
+        return pd.concat(frames, ignore_index=True)
+
+    cases = [Benchmark("csv.read_csv_concat", pandas_per_file, repeat=3, items=len(files))]
+    try:
+        from scrapper.parquet_store import read_csv_tree
+    except ImportError:
+        return cases
+    from scraped_data import REVIEW_CSV_COLUMNS
+    from scraped_data.normalize import normalize_reviews
+    from travel_app.processing.dedup import review_canonical
+
+    reviews = read_csv_tree(files, REVIEW_CSV_COLUMNS)
+    normalized = normalize_reviews(reviews)
+    cases += [
+        Benchmark("csv.read_csv_tree", lambda: read_csv_tree(files, REVIEW_CSV_COLUMNS), repeat=3, items=len(files)),
+        Benchmark("csv.normalize_reviews", lambda: normalize_reviews(reviews), repeat=3, items=len(reviews)),
+        Benchmark("csv.review_canonical", lambda: review_canonical(normalized), repeat=3, items=len(normalized)),
+    ]
+    return cases
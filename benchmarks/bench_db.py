@@ -0,0 +1,68 @@
+"""Bulk inserts through `travel_app.db_api.db_operations` into a local Postgres (see the DB_* variables)."""
+import csv
+import os
+import sys
+
+import pandas as pd
+
+from scraped_data import REVIEW_CSV_COLUMNS, matches_header
+from benchmarks.common import ROOT, Benchmark, fixture_files
+
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+TABLE = "bench_review"
+COLUMNS = ["reviewer", "rating", "review_date", "text"]
+
+
+def _review_rows(limit):
+    """The first `limit` (reviewer, rating, date, text) rows of the review files in `outputs/`."""
+    rows = []
+    for path in fixture_files("outputs/*.csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not matches_header(header, REVIEW_CSV_COLUMNS):
+                continue
+            rows.extend(tuple(row[:4]) for row in reader if len(row) == len(header))
+        if len(rows) >= limit:
+            return rows[:limit]
+    return rows
+
+
+def benchmarks(quick=False):
+    try:
+        from travel_app.db_api import db_operations
+        db_operations.fetch_all("SELECT 1")
+    except Exception as e:
+        print(f"Skipping database benchmarks: {type(e).__name__}: {e}")
+        return []
+
+    rows = _review_rows(2000 if quick else 20000)
+    if not rows:
+        return []
+    with db_operations.transaction() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        cursor.execute(f"CREATE UNLOGGED TABLE {TABLE} (reviewer TEXT, rating TEXT, review_date TEXT, text TEXT)")
+
+    def truncate():
+        with db_operations.transaction() as cursor:
+            cursor.execute(f"TRUNCATE {TABLE}")
+
+    def drop():
+        with db_operations.transaction() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        db_operations.close_pool()
+
+    insert = f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES (%s, %s, %s, %s)"
+    values = f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES %s"
+    frame = pd.DataFrame(rows, columns=COLUMNS, dtype="string")
+    return [
+        Benchmark("db.execute_many", lambda: db_operations.execute_many(insert, rows),
+                  repeat=3, reset=truncate, items=len(rows)),
+        Benchmark("db.execute_values", lambda: db_operations.execute_values(values, rows),
+                  repeat=3, reset=truncate, items=len(rows)),
+        Benchmark("db.copy_rows", lambda: db_operations.copy_rows(TABLE, COLUMNS, rows),
+                  repeat=3, reset=truncate, items=len(rows)),
+        Benchmark("db.copy_frame", lambda: db_operations.copy_frame(TABLE, frame),
+                  repeat=3, reset=truncate, items=len(rows), teardown=drop),
+    ]
@@ -0,0 +1,73 @@
+"""Radius and nearest-neighbour queries of `travel_app.processing.geo` over the scraped place coordinates."""
+import csv
+import os
+import sys
+
+import numpy as np
+
+from scraped_data import PLACE_CSV_COLUMNS, matches_header
+from benchmarks.common import ROOT, Benchmark, fixture_files
+
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+# The sample airports of create_airport_table
+AIRPORTS = [(35.7769, 140.3929), (35.5494, 139.7798), (34.4263, 135.2440), (34.7833, 135.4381),
+            (33.5851, 130.4512), (42.7758, 141.6925), (26.1950, 127.6460), (34.8583, 136.8044),
+            (38.1375, 140.8800), (34.4425, 132.9133)]
+
+
+def _place_coordinates():
+    coordinates = []
+    for path in fixture_files("outputs/*.csv"):
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            if not matches_header(next(reader, None), PLACE_CSV_COLUMNS):
+                continue
+            for row in reader:
+                try:
+                    coordinates.append((float(row[7]), float(row[8])))
+                except (IndexError, ValueError):
+                    pass
+    return np.array(coordinates)
+
+
+def benchmarks(quick=False):
+    try:
+        from travel_app.processing.geo import GeoIndex, haversine_km
+    except ImportError as e:
+        print(f"Skipping geo benchmarks: {e}")
+        return []
+    places = _place_coordinates()
+    if not len(places):
+        return []
+
+    # The scraped places, repeated with a fixed jitter of up to ~50 km to reach a realistic corpus size
+    copies = 20 if quick else 200
+    rng = np.random.default_rng(0)
+    points = np.repeat(places, copies, axis=0) + rng.uniform(-0.5, 0.5, (len(places) * copies, 2))
+    index = GeoIndex(points[:, 0], points[:, 1])
+    airports = GeoIndex([lat for lat, _ in AIRPORTS], [lon for _, lon in AIRPORTS])
+    queries = places[:1000]
+
+    def python_loop():
+        # One haversine per place and airport, as a plain loop would
+        return [min(haversine_km(lat, lon, a_lat, a_lon) for a_lat, a_lon in AIRPORTS) for lat, lon in places]
+
+    def radius_queries():
+        for lat, lon in queries:
+            index.within(lat, lon, 20)
+
+    def nearest_queries():
+        for lat, lon in queries:
+            index.nearest(lat, lon, k=10)
+
+    return [
+        Benchmark("geo.build_index", lambda: GeoIndex(points[:, 0], points[:, 1]), repeat=3, items=len(points)),
+        Benchmark("geo.nearest_airport_loop", python_loop, repeat=3, items=len(places)),
+        Benchmark("geo.nearest_airport_batch", lambda: airports.nearest_batch(points[:, 0], points[:, 1]),
+                  repeat=3, items=len(points)),
+        Benchmark("geo.within_20km", radius_queries, repeat=3, items=len(queries)),
+        Benchmark("geo.nearest_10", nearest_queries, repeat=3, items=len(queries)),
+        Benchmark("geo.count_within_batch", lambda: index.count_within_batch(queries[:, 0], queries[:, 1], 20),
+                  repeat=3, items=len(queries)),
+    ]
@@ -0,0 +1,38 @@
+"""Offline place and review extraction over the rendered place page snapshot of the test fixtures."""
+import os
+
+from bs4 import BeautifulSoup
+
+from scrapper.offline_parser import (HTML_PARSER, extract_coordinates, extract_place_info, extract_reviews,
+                                    read_snapshot)
+from benchmarks.common import ROOT, Benchmark
+
+# A place panel with review cards, as saved by `map_scraping --snapshot-dir`
+# (`test.html` is the page before rendering, with no place or reviews in it)
+SNAPSHOT = os.path.join(ROOT, "tests", "fixtures", "snapshots", "kinkakuji.html")
+
+
+def benchmarks(quick=False):
+    html, _ = read_snapshot(SNAPSHOT)
+    soup = BeautifulSoup(html, HTML_PARSER)
+
+    def parse():
+        return BeautifulSoup(html, HTML_PARSER)
+
+    def extract():
+        extract_place_info(soup)
+        extract_coordinates(soup, html)
+        extract_reviews(soup)
+
+    def parse_and_extract():
+        page = BeautifulSoup(html, HTML_PARSER)
+        extract_place_info(page)
+        extract_coordinates(page, html)
+        extract_reviews(page)
+
+    repeat = 3 if quick else 10
+    return [
+        Benchmark(f"offline.parse[{HTML_PARSER}]", parse, repeat=repeat),
+        Benchmark("offline.extract", extract, repeat=repeat),
+        Benchmark(f"offline.parse_and_extract[{HTML_PARSER}]", parse_and_extract, repeat=repeat),
+    ]
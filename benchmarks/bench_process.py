@@ -0,0 +1,20 @@
+"""Top-100 extraction over the downloaded prefecture pages in `raw_html/`."""
+from scrapper.process import extract_data, extract_data_fast
+from benchmarks.common import Benchmark, fixture_files
+
+
+def benchmarks(quick=False):
+    pages = []
+    for path in fixture_files("raw_html/*.html", limit=5 if quick else None):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        return []
+
+    def run(extract):
+        return lambda: [extract(html) for html in pages]
+
+    return [
+        Benchmark("process.extract_data", run(extract_data), repeat=3, items=len(pages)),
+        Benchmark("process.extract_data_fast", run(extract_data_fast), repeat=5, items=len(pages)),
+    ]
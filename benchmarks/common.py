@@ -0,0 +1,54 @@
+import glob
+import os
+import statistics
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def fixture_files(pattern, limit=None):
+    """Files matching `pattern` under the repository root, sorted so every run uses the same ones."""
+    files = sorted(glob.glob(os.path.join(ROOT, pattern)))
+    return files[:limit] if limit else files
+
+
+class Benchmark:
+    """
+    A named piece of work to time.
+
+    `func` is timed `repeat` times; `reset`, if given, runs untimed before
+    each repetition (e.g. to empty a table). `items` is how many units of
+    work one call handles (files, rows), used to report a rate.
+    """
+
+    def __init__(self, name, func, repeat=5, reset=None, items=None, teardown=None):
+        self.name = name
+        self.func = func
+        self.repeat = repeat
+        self.reset = reset
+        self.items = items
+        self.teardown = teardown
+
+    def run(self):
+        timings = []
+        try:
+            for _ in range(self.repeat):
+                if self.reset:
+                    self.reset()
+                started = time.perf_counter()
+                self.func()
+                timings.append(time.perf_counter() - started)
+        finally:
+            if self.teardown:
+                self.teardown()
+        result = {
+            "repeat": self.repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        }
+        if self.items:
+            result["items"] = self.items
+            result["items_per_second"] = self.items / result["median"]
+        return result
@@ -0,0 +1,98 @@
+"""
+Run the benchmarks and store the timings as JSON.
+
+    python -m benchmarks.run                      # all benchmarks, results in benchmarks/results/
+    python -m benchmarks.run --only process --quick
+    python -m benchmarks.run --compare benchmarks/results/<older>.json
+
+Results are keyed by benchmark name; `--compare` prints the change of every
+median against an earlier result file and exits with status 1 when one got
+slower than `--threshold`.
+"""
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+
+from benchmarks.common import ROOT
+
+MODULES = ["bench_process", "bench_offline", "bench_csv", "bench_geo", "bench_db"]
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmarks(only=None, quick=False):
+    results = {}
+    for module_name in MODULES:
+        if only and not any(name in module_name for name in only):
+            continue
+        module = importlib.import_module(f"benchmarks.{module_name}")
+        for benchmark in module.benchmarks(quick=quick):
+            result = benchmark.run()
+            results[benchmark.name] = result
+            rate = f" ({result['items_per_second']:.1f}/s)" if "items_per_second" in result else ""
+            print(f"{benchmark.name:45s} median={result['median'] * 1000:10.2f}ms "
+                  f"min={result['min'] * 1000:10.2f}ms{rate}")
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print the median change of every benchmark; returns the names that regressed."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["benchmarks"]
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result["median"] / baseline[name]["median"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  <-- slower"
+            regressions.append(name)
+        print(f"{name:45s} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsing, extraction and loading hot paths")
+    parser.add_argument("--only", nargs="*", help="run only the modules matching these names (e.g. process db)")
+    parser.add_argument("--quick", action="store_true", help="smaller fixtures and fewer repetitions")
+    parser.add_argument("--output", default=None, help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="earlier result file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only, args.quick)
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-quick' if args.quick else ''}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "commit": commit,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "quick": args.quick,
+            "benchmarks": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
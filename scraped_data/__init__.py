@@ -0,0 +1,2 @@
+from .columns import PLACE_CSV_COLUMNS, REVIEW_CSV_COLUMNS, SCRAPED_AT_COLUMN, csv_header, matches_header
+from .keys import REVIEW_KEY_CHARS, review_key
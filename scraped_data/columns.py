@@ -0,0 +1,19 @@
+# Columns of the per-place CSV files the scraper writes. Older scrapes wrote reviews to `*_info.csv`
+# and place info to `*_reviews.csv`, so readers tell the files apart by their header.
+PLACE_CSV_COLUMNS = ["Name", "Address", "Phone", "Website", "Rating", "Total_Reviews", "Categories",
+                     "Latitude", "Longitude"]
+REVIEW_CSV_COLUMNS = ["Name", "Rating", "Date", "Review", "Place_Name", "Address", "Phone", "Website",
+                      "Place_Rating", "Total_Reviews", "Categories", "Latitude", "Longitude"]
+# When a row was scraped (ISO 8601, UTC), which the sinks write after the columns above; files of
+# older scrapes lack it. Relative review dates ("3 か月前") are counted back from it.
+SCRAPED_AT_COLUMN = "Scraped_At"
+
+
+def csv_header(columns):
+    """Header the sinks write for a CSV file with `columns`."""
+    return columns + [SCRAPED_AT_COLUMN]
+
+
+def matches_header(header, columns):
+    """Whether a CSV `header` is that of a file with `columns`, written with or without the scrape time."""
+    return header == columns or header == csv_header(columns)
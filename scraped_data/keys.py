@@ -0,0 +1,22 @@
+import hashlib
+import re
+
+# Leading characters of a review's text that go into its key. Maps truncates long
+# reviews until "More" is clicked, and this prefix is visible either way.
+REVIEW_KEY_CHARS = 40
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def review_key(reviewer, text):
+    """
+    Key of a review within its place: hash of the reviewer name and the start
+    of the text. The scraper's review index and the database loader both use it.
+
+    The date is left out on purpose: Maps shows relative dates ("2 weeks ago")
+    that change from one day to the next, so they would make every stored
+    review look new on the next refresh.
+    """
+    text = _WHITESPACE.sub(" ", text or "").strip().rstrip("…").rstrip(".").strip()
+    reviewer = _WHITESPACE.sub(" ", reviewer or "").strip()
+    return hashlib.sha1(f"{reviewer}|{text[:REVIEW_KEY_CHARS]}".encode("utf-8")).hexdigest()
@@ -0,0 +1,228 @@
+import csv
+import re
+
+import numpy as np
+import pandas as pd
+
+from .columns import SCRAPED_AT_COLUMN, csv_header
+
+# Kanji and romaji names of the prefectures, in JIS order
+PREFECTURES = [
+    ("北海道", "hokkaido"),
+    ("青森県", "aomori"), ("岩手県", "iwate"), ("宮城県", "miyagi"), ("秋田県", "akita"),
+    ("山形県", "yamagata"), ("福島県", "fukushima"),
+    ("茨城県", "ibaraki"), ("栃木県", "tochigi"), ("群馬県", "gunma"), ("埼玉県", "saitama"),
+    ("千葉県", "chiba"), ("東京都", "tokyo"), ("神奈川県", "kanagawa"),
+    ("新潟県", "niigata"), ("富山県", "toyama"), ("石川県", "ishikawa"), ("福井県", "fukui"),
+    ("山梨県", "yamanashi"), ("長野県", "nagano"), ("岐阜県", "gifu"), ("静岡県", "shizuoka"),
+    ("愛知県", "aichi"),
+    ("三重県", "mie"), ("滋賀県", "shiga"), ("京都府", "kyoto"), ("大阪府", "osaka"), ("兵庫県", "hyogo"),
+    ("奈良県", "nara"), ("和歌山県", "wakayama"),
+    ("鳥取県", "tottori"), ("島根県", "shimane"), ("岡山県", "okayama"), ("広島県", "hiroshima"),
+    ("山口県", "yamaguchi"),
+    ("徳島県", "tokushima"), ("香川県", "kagawa"), ("愛媛県", "ehime"), ("高知県", "kochi"),
+    ("福岡県", "fukuoka"), ("佐賀県", "saga"), ("長崎県", "nagasaki"), ("熊本県", "kumamoto"),
+    ("大分県", "oita"), ("宮崎県", "miyazaki"), ("鹿児島県", "kagoshima"), ("沖縄県", "okinawa"),
+]
+KANJI_TO_ROMAJI = dict(PREFECTURES)
+
+_KANJI_PREFECTURE = "(" + "|".join(kanji for kanji, _ in PREFECTURES) + ")"
+# English addresses end with the prefecture ("..., Chiyoda City, Tokyo 100-0001, Japan")
+_ROMAJI_PREFECTURE = r"^.*\b(" + "|".join(romaji for _, romaji in PREFECTURES) + r")\b"
+# The city, ward, town or village right after the prefecture; towns and villages keep their district
+# (郡), and the three cities whose name itself contains 市 are spelled out
+_MUNICIPALITY = _KANJI_PREFECTURE + r"((?:四日市|廿日市|野々市)市|[^市区]{1,5}?郡.+?[町村]|.+?[市区町村])"
+_POSTAL_CODE = r"(?:〒\s*)?(?<!\d)(\d{3})-(\d{4})(?!\d)"
+
+# Relative dates as Maps shows them: "3 か月前", "Google\nより（1 年前）", "a month ago"
+_JAPANESE_AGE = r"(\d+)\s*(年|か月|ヶ月|ヵ月|週間|日|時間|分)前"
+_ENGLISH_AGE = r"\b(\d+|an?)\s+(year|month|week|day|hour|minute)s?\s+ago"
+JAPANESE_UNITS = {"年": "year", "か月": "month", "ヶ月": "month", "ヵ月": "month", "週間": "week",
+                  "日": "day", "時間": "hour", "分": "minute"}
+UNIT_SECONDS = {"year": 365.25 * 86400, "month": 30.44 * 86400, "week": 7 * 86400, "day": 86400,
+                "hour": 3600, "minute": 60}
+
+MISSING_VALUES = ["", "Unknown", "N/A"]
+
+PLACE_COLUMNS = ["name", "address", "postal_code", "prefecture", "municipality", "phone", "website",
+                 "rating", "total_reviews", "categories", "latitude", "longitude", "scraped_at"]
+REVIEW_COLUMNS = ["reviewer", "rating", "date", "reviewed_on", "date_precision", "text", "place_name",
+                  "address", "postal_code", "prefecture", "municipality", "phone", "website",
+                  "place_rating", "total_reviews", "categories", "latitude", "longitude", "scraped_at"]
+# Place columns repeated on every row of the review CSV files
+PLACE_CSV_COLUMNS_OF_REVIEWS = ["Place_Name", "Address", "Phone", "Website", "Place_Rating", "Total_Reviews",
+                                "Categories", "Latitude", "Longitude"]
+
+
+def read_csv_files(files, columns):
+    """
+    All rows of the CSV `files` whose header is `columns`, as strings, with
+    the `Scraped_At` column the sinks write after them (NA in files of older
+    scrapes, which lack it).
+    """
+    header = csv_header(columns)
+    rows = []
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f)
+            file_header = next(reader, None)
+            if file_header == header:
+                rows.extend(row for row in reader if len(row) == len(header))
+            elif file_header == columns:
+                rows.extend(row + [None] for row in reader if len(row) == len(columns))
+    return pd.DataFrame(rows, columns=header, dtype="string")
+
+
+def scrape_times(frame):
+    """
+    When each row of `frame` was scraped, from its `Scraped_At` column; NaT
+    where it is missing. The time a file was written says nothing about it.
+    """
+    if SCRAPED_AT_COLUMN not in frame:
+        return pd.Series(pd.NaT, index=frame.index, dtype="datetime64[s, UTC]")
+    return pd.to_datetime(frame[SCRAPED_AT_COLUMN], utc=True, errors="coerce", format="ISO8601")
+
+
+def _per_unique(func, series):
+    """
+    Apply the vectorized `func` to the distinct values of `series` only and
+    broadcast the result (a Series or DataFrame) back to every row; the
+    scraped columns repeat a few thousand values over a corpus of reviews.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    result = func(pd.Series(uniques, dtype="string"))
+    return result.iloc[codes].set_axis(series.index)
+
+
+def clean_text(series):
+    """Strip the icon glyph (private use area) and newline Maps puts before addresses and phones; NA for placeholders."""
+    series = series.astype("string").str.replace("^[\ue000-\uf8ff\\s]+", "", regex=True).str.strip()
+    return series.mask(series.isin(MISSING_VALUES))
+
+
+def place_rating(rating):
+    """The average rating in a place rating like '4.6\\n(42,115)'."""
+    value = rating.astype("string").str.extract(r"^\s*(\d+(?:\.\d+)?)", expand=False)
+    return pd.to_numeric(value, errors="coerce").astype("Float64")
+
+
+def review_count(total_reviews, rating):
+    """The review count: Total_Reviews when it is a number (it often holds other text), else the '(42,115)' of the rating."""
+    total = total_reviews.astype("string").str.strip().str.replace(",", "", regex=False)
+    total = pd.to_numeric(total.where(total.str.fullmatch(r"\d+", na=False)), errors="coerce")
+    from_rating = rating.astype("string").str.extract(r"\(([\d,]+)\)", expand=False).str.replace(",", "", regex=False)
+    return total.fillna(pd.to_numeric(from_rating, errors="coerce")).astype("Int32")
+
+
+def review_rating(rating):
+    """Star rating of a review (1-5), NA for 'N/A'."""
+    value = rating.astype("string").str.extract(r"([1-5])", expand=False)
+    return pd.to_numeric(value, errors="coerce").astype("Int8")
+
+
+def _normalize_width(address):
+    # Full-width digits, hyphens and spaces to ASCII, other dashes to '-'
+    return address.str.normalize("NFKC").str.replace("[‐‑–—−]", "-", regex=True)
+
+
+def postal_codes(address):
+    """Postal code ('123-4567') in a Japanese ('〒123-4567') or English address."""
+    parts = _normalize_width(address.astype("string")).str.extract(_POSTAL_CODE)
+    return (parts[0] + "-" + parts[1]).astype("string")
+
+
+def prefectures(address):
+    """Lower-case romaji prefecture named in a Japanese or English address."""
+    address = address.astype("string")
+    kanji = address.str.extract(_KANJI_PREFECTURE, expand=False).map(KANJI_TO_ROMAJI, na_action="ignore")
+    romaji = address.str.extract(_ROMAJI_PREFECTURE, flags=re.IGNORECASE, expand=False).str.lower()
+    return kanji.astype("string").fillna(romaji)
+
+
+def municipalities(address):
+    """City, ward, town or village following the prefecture in a Japanese address ('札幌市', '児湯郡都農町')."""
+    return address.astype("string").str.extract(_MUNICIPALITY)[1].astype("string")
+
+
+def relative_ages(date_text):
+    """
+    Age in seconds and its unit ('year', 'month', ...) of relative dates as
+    Maps shows them ('3 か月前', 'Google\nより（1 年前）', 'a month ago').
+    """
+    date_text = date_text.astype("string")
+    japanese = date_text.str.extract(_JAPANESE_AGE)
+    english = date_text.str.extract(_ENGLISH_AGE, flags=re.IGNORECASE)
+    count = japanese[0].fillna(english[0].str.lower().replace({"a": "1", "an": "1"}))
+    unit = japanese[1].map(JAPANESE_UNITS, na_action="ignore").astype("string").fillna(english[1].str.lower())
+    seconds = pd.to_numeric(count, errors="coerce").astype("float64") * unit.map(UNIT_SECONDS, na_action="ignore").astype("float64")
+    return pd.DataFrame({"seconds": seconds, "unit": unit})
+
+
+def review_dates(date_text, scraped_at):
+    """
+    Absolute review dates from relative ones, counted back from `scraped_at`
+    (a timestamp or a Series of them) and truncated to the day. Returns
+    `(reviewed_on, precision)`, the precision being the unit of the relative
+    date: "1 年前" is only good to about a year.
+    """
+    ages = _per_unique(relative_ages, date_text)
+    age = pd.to_timedelta(ages["seconds"].to_numpy(dtype="float64", na_value=np.nan), unit="s")
+    reviewed_on = pd.Series(scraped_at, index=date_text.index) - age
+    return reviewed_on.dt.floor("D"), ages["unit"]
+
+
+def _place_frame(frame, name_column, rating_column):
+    address = clean_text(frame["Address"])
+    categories = clean_text(frame["Categories"])
+    phone = clean_text(frame["Phone"])
+    rating = frame[rating_column].astype("string")
+    return pd.DataFrame({
+        "name": clean_text(frame[name_column]),
+        "address": address,
+        "postal_code": _per_unique(postal_codes, address),
+        "prefecture": _per_unique(prefectures, address),
+        "municipality": _per_unique(municipalities, address),
+        # Places without a phone number sometimes had their address scraped as phone or category
+        "phone": phone.where(phone.str.contains(r"\d", regex=True, na=False) & ~phone.str.startswith("〒", na=True)),
+        "website": clean_text(frame["Website"]),
+        "rating": place_rating(rating),
+        "total_reviews": review_count(frame["Total_Reviews"], rating),
+        "categories": categories.mask(categories.str.startswith("〒", na=False) | categories.eq(address).fillna(False)),
+        "latitude": pd.to_numeric(frame["Latitude"], errors="coerce").where(lambda value: value.abs() <= 90),
+        "longitude": pd.to_numeric(frame["Longitude"], errors="coerce").where(lambda value: value.abs() <= 180),
+    }, index=frame.index)
+
+
+def normalize_places(frame, scraped_at=None):
+    """
+    Typed, cleaned `PLACE_COLUMNS` from a frame with the scraped place CSV
+    columns (Name, Address, ..., Longitude). `scraped_at` defaults to the
+    frame's own `Scraped_At` column (see `scrape_times`).
+    """
+    out = _place_frame(frame, "Name", "Rating")
+    out["scraped_at"] = scrape_times(frame) if scraped_at is None else pd.to_datetime(scraped_at, utc=True)
+    return out[PLACE_COLUMNS]
+
+
+def normalize_reviews(frame, scraped_at=None):
+    """
+    Typed, cleaned `REVIEW_COLUMNS` from a frame with the scraped review CSV
+    columns, including the review date resolved against `scraped_at` (by default
+    the frame's `Scraped_At` column). Reviews without a scrape time get no date.
+    """
+    scraped_at = scrape_times(frame) if scraped_at is None else pd.to_datetime(scraped_at, utc=True)
+    date = clean_text(frame["Date"])
+    reviewed_on, precision = review_dates(date, scraped_at)
+    # Every review repeats its place's columns: clean each distinct place once
+    codes = frame.groupby(PLACE_CSV_COLUMNS_OF_REVIEWS, sort=False, dropna=False).ngroup().to_numpy()
+    first_rows = np.unique(codes, return_index=True)[1]
+    out = _place_frame(frame.iloc[first_rows], "Place_Name", "Place_Rating").iloc[codes].set_axis(frame.index)
+    out = out.rename(columns={"name": "place_name", "rating": "place_rating"})
+    out["reviewer"] = clean_text(frame["Name"])
+    out["rating"] = _per_unique(review_rating, frame["Rating"])
+    out["date"] = date
+    out["reviewed_on"] = reviewed_on
+    out["date_precision"] = precision
+    out["text"] = frame["Review"].astype("string")
+    out["scraped_at"] = scraped_at
+    return out[REVIEW_COLUMNS]
@@ -0,0 +1,144 @@
+import sqlite3
+import threading
+import time
+
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+class Frontier:
+    """
+    Durable crawl frontier stored in SQLite.
+
+    Every URL has a state (pending, in_flight, done or failed), an attempt
+    count and the reason of its last failure. Failed URLs are retried with
+    exponential backoff until `max_attempts` is reached. URLs left in flight
+    by a crashed run are put back to pending when the frontier is opened.
+    """
+
+    def __init__(self, path="scrape_frontier.db", max_attempts=3, backoff_base=30):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0,
+                result TEXT,
+                last_error TEXT,
+                updated_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS frontier_state ON frontier (state, next_attempt_at, position)")
+        recovered = self._conn.execute(
+            "UPDATE frontier SET state = ?, updated_at = ? WHERE state = ?", (PENDING, time.time(), IN_FLIGHT)
+        ).rowcount
+        if recovered:
+            print(f"Recovered {recovered} URLs left in flight by a previous run")
+
+    def add_urls(self, urls):
+        """Add URLs in order; URLs already known keep their state."""
+        with self._lock:
+            start = self._conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM frontier").fetchone()[0]
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO frontier (url, position, updated_at) VALUES (?, ?, ?)",
+                [(url, start + i, time.time()) for i, url in enumerate(urls)],
+            )
+            self._conn.execute("COMMIT")
+
+    def requeue_done(self, older_than=0):
+        """Put URLs completed more than `older_than` seconds ago back to pending, for a refresh run."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE frontier SET state = ?, attempts = 0, updated_at = ? WHERE state = ? AND updated_at <= ?",
+                (PENDING, time.time(), DONE, time.time() - older_than),
+            ).rowcount
+
+    def claim(self):
+        """Mark the next ready URL as in flight and return it, or None if nothing is ready."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT url FROM frontier
+                WHERE state = ? OR (state = ? AND attempts < ? AND next_attempt_at <= ?)
+                ORDER BY state = ? DESC, position
+                LIMIT 1
+                """,
+                (PENDING, FAILED, self.max_attempts, now, PENDING),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (IN_FLIGHT, now, row[0]),
+            )
+            return row[0]
+
+    def mark_done(self, url, result="scraped"):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, result = ?, last_error = NULL, updated_at = ? WHERE url = ?",
+                (DONE, result, time.time(), url),
+            )
+
+    def mark_failed(self, url, reason):
+        """Record a failure and schedule the retry `backoff_base * 2 ** (attempts - 1)` seconds from now."""
+        now = time.time()
+        with self._lock:
+            attempts = self._conn.execute("SELECT attempts FROM frontier WHERE url = ?", (url,)).fetchone()[0]
+            delay = self.backoff_base * 2 ** max(0, attempts - 1)
+            self._conn.execute(
+                "UPDATE frontier SET state = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE url = ?",
+                (FAILED, str(reason)[:1000], now + delay, now, url),
+            )
+
+    def next_retry_in(self):
+        """Seconds until the earliest failed URL may be retried, or None if no retries remain."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM frontier WHERE state = ? AND attempts < ?",
+                (FAILED, self.max_attempts),
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def remaining(self):
+        """Number of URLs that still have work to do in this run."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE state = ? OR (state = ? AND attempts < ?)",
+                (PENDING, FAILED, self.max_attempts),
+            ).fetchone()[0]
+
+    def counts(self):
+        """Number of URLs per state."""
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        return dict(rows)
+
+    def failures(self, limit=20):
+        """Most recent failures as (url, attempts, last_error) tuples."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, attempts, last_error FROM frontier WHERE state = ? ORDER BY updated_at DESC LIMIT ?",
+                (FAILED, limit),
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -9,28 +9,211 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
 import time
-import pandas as pd
 import re
 import json
+import argparse
+from functools import partial
 
+from scrapper.worker_pool import run_worker_pool
+from scrapper.frontier import Frontier
+from scrapper.waits import wait_stats, scroll_stats, wait_for, any_element_present, element_count_above, script_returns_true
+from scrapper.offline_parser import save_snapshot, snapshot_name
+from scrapper.sinks import SINK_KINDS, CsvSink, make_sink, place_id
+from scrapper.review_index import ReviewIndex, review_key
+from scrapper.resolution_cache import ResolutionCache
+from scrapper.place_cache import PlaceCache, normalize_query
+from scrapper.metrics import metrics
+from scrapper.page_selectors import (
+    PLACE_TITLE_SELECTORS,
+    REVIEW_CARD_SELECTOR,
+    PLACE_INFO_SELECTORS,
+    REVIEW_ELEMENT_SELECTORS,
+    REVIEW_NAME_SELECTORS,
+    REVIEW_TEXT_SELECTORS,
+    REVIEW_DATE_SELECTORS,
+    REVIEW_SORT_BUTTON_SELECTORS,
+    REVIEW_SORT_OPTION_SELECTOR,
+    NEWEST_SORT_OPTION,
+)
 
-def setup_driver():
-    """Set up and return a Chrome webdriver with appropriate options."""
+
+# Returns the reviews tab element (or null) from the place panel
+FIND_REVIEWS_TAB_JS = """
+var elements = document.querySelectorAll('button, div[role="tab"]');
+for (var i = 0; i < elements.length; i++) {
+    if (elements[i].textContent.toLowerCase().includes('review')  || 
+        elements[i].textContent.includes('クチコミ')){
+        return elements[i];
+    }
+}
+return null;
+"""
+
+# Returns {field: text or null} using the first selector that matches for each field
+EXTRACT_PLACE_INFO_JS = """
+var selectors = arguments[0];
+var result = {};
+for (var field in selectors) {
+    result[field] = null;
+    for (var i = 0; i < selectors[field].length; i++) {
+        var element = document.querySelector(selectors[field][i]);
+        if (element) {
+            result[field] = field === 'website' ? element.getAttribute('href') : element.innerText;
+            break;
+        }
+    }
+}
+return result;
+"""
+
+# Returns a list of {Name, Rating, Date, Review}, applying the same fallback chains as the WebDriver path
+EXTRACT_REVIEWS_JS = """
+var cardSelectors = arguments[0], nameSelectors = arguments[1],
+    textSelectors = arguments[2], dateSelectors = arguments[3];
+
+function firstText(root, selectors, fallback) {
+    for (var i = 0; i < selectors.length; i++) {
+        var element = root.querySelector(selectors[i]);
+        if (element && element.innerText) {
+            return element.innerText;
+        }
+    }
+    return fallback;
+}
+
+var cards = [];
+for (var i = 0; i < cardSelectors.length; i++) {
+    cards = document.querySelectorAll(cardSelectors[i]);
+    if (cards.length) {
+        break;
+    }
+}
+
+var reviews = [];
+for (var c = 0; c < cards.length; c++) {
+    var card = cards[c];
+
+    var rating = 'N/A';
+    var ratingElements = card.querySelectorAll('span[role="img"]');
+    for (var r = 0; r < ratingElements.length; r++) {
+        var match = (ratingElements[r].getAttribute('aria-label') || '').match(/(\\d+)/);
+        if (match) {
+            rating = match[1];
+            break;
+        }
+    }
+    if (rating === 'N/A') {
+        var stars = card.querySelectorAll('img[src*="star_"]');
+        if (stars.length) {
+            rating = String(Array.prototype.filter.call(stars, function (s) {
+                return s.getAttribute('src').indexOf('star_fill') !== -1;
+            }).length);
+        }
+    }
+
+    var text = '';
+    for (var t = 0; t < textSelectors.length && !text; t++) {
+        var parts = [];
+        var textElements = card.querySelectorAll(textSelectors[t]);
+        for (var p = 0; p < textElements.length; p++) {
+            if (textElements[p].innerText) {
+                parts.push(textElements[p].innerText);
+            }
+        }
+        text = parts.join(' ');
+    }
+    if (!text) {
+        // Last resort: skip the first lines which might be name and rating
+        var lines = card.innerText.split('\\n');
+        text = lines.length > 2 ? lines.slice(2).join(' ') : '';
+    }
+
+    reviews.push({
+        Name: firstText(card, nameSelectors, 'Unknown'),
+        Rating: rating,
+        Date: firstText(card, dateSelectors, 'N/A'),
+        Review: text
+    });
+}
+return reviews;
+"""
+
+# Requests the lean profile blocks at the network level: we only read DOM text and the URL
+LEAN_BLOCKED_URLS = [
+    # Images and map tiles
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*",
+    "*googleusercontent.com/*", "*/maps/vt*", "*/kh/v=*", "*streetviewpixels*", "*/maps/photometa/*",
+    # Fonts
+    "*.woff*", "*.ttf*", "*.otf*", "*fonts.gstatic.com/*", "*fonts.googleapis.com/*",
+    # Media
+    "*.mp4*", "*.webm*", "*.mp3*",
+    # Analytics and logging
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*/gen_204*", "*/log204*", "*/maps/preview/log*",
+]
+
+
+def setup_driver(headless=False, lean=False, profile_dir=None):
+    """
+    Set up and return a Chrome webdriver with appropriate options.
+
+    The lean profile blocks images, fonts, media and analytics, returns from
+    `driver.get` at DOMContentLoaded and sets the language cookie through CDP
+    instead of loading google.com first. `profile_dir` keeps the browser
+    profile (cache, cookies) on disk between drivers; it must not be shared by
+    two running drivers.
+    """
     options = Options()
-    # Uncomment the line below if you want to run in headless mode
-    # options.add_argument("--headless")
+    if headless:
+        options.add_argument("--headless=new")
     options.add_argument("--window-size=1920,1080")
     options.add_argument("--disable-notifications")
     options.add_argument("--lang=en-US")  # Force English language
     options.add_argument("--accept-lang=en-US,en;q=0.9")
-    options.add_experimental_option('prefs', {'intl.accept_languages': 'en,en_US'})
+    prefs = {'intl.accept_languages': 'en,en_US'}
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={os.path.abspath(profile_dir)}")
+    if lean:
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_argument("--mute-audio")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-component-update")
+        options.add_argument("--disable-default-apps")
+        options.add_argument("--disable-sync")
+        options.add_argument("--no-first-run")
+        options.add_argument("--disable-dev-shm-usage")
+        prefs.update({
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.media_stream': 2,
+            'profile.default_content_setting_values.notifications': 2,
+            'profile.default_content_setting_values.geolocation': 2,
+        })
+    options.add_experimental_option('prefs', prefs)
 
     # Initialize the Chrome driver
     driver = webdriver.Chrome(options=options)
-    driver.get("https://www.google.com")
-    driver.add_cookie({"name": "PREF", "value": "hl=en"})
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+        driver.execute_cdp_cmd(
+            "Network.setCookie",
+            {"name": "PREF", "value": "hl=en", "domain": ".google.com", "path": "/", "secure": True},
+        )
+    else:
+        driver.get("https://www.google.com")
+        driver.add_cookie({"name": "PREF", "value": "hl=en"})
     return driver
 
+def make_driver_factory(headless=False, lean=False, profile_dir=None):
+    """Return a `driver_factory(worker_id)` giving each worker slot its own reusable profile directory."""
+    def driver_factory(worker_id):
+        worker_profile = os.path.join(profile_dir, f"worker-{worker_id}") if profile_dir else None
+        return setup_driver(headless=headless, lean=lean, profile_dir=worker_profile)
+    return driver_factory
+
 def extract_coordinates(driver):
     """Extract latitude and longitude from the Google Maps page."""
     try:
@@ -51,6 +234,7 @@ def extract_coordinates(driver):
             return coordinates
         
         # Method 2: Extract from page metadata
+        metrics.incr("fallback_coordinates")
         try:
             # Look for JSON-LD script tags that might contain coordinates
             script_elements = driver.find_elements(By.TAG_NAME, "script")
@@ -83,6 +267,7 @@ def extract_coordinates(driver):
             ]
             
             for selector in share_button_selectors:
+                metrics.incr("selectors_tried")
                 try:
                     share_buttons = driver.find_elements(By.CSS_SELECTOR, selector)
                     if share_buttons:
@@ -90,13 +275,13 @@ def extract_coordinates(driver):
                             if button.is_displayed():
                                 print("Found share button, clicking...")
                                 driver.execute_script("arguments[0].click();", button)
-                                time.sleep(2)
                                 
                                 # Try to find URL input in share dialog
                                 url_input_selectors = [
                                     'input[aria-label*="Copy link"]',
                                     'input.vrsrZe'
                                 ]
+                                wait_for(driver, "share_dialog", any_element_present(url_input_selectors), timeout=5)
                                 
                                 for input_selector in url_input_selectors:
                                     try:
@@ -117,7 +302,6 @@ def extract_coordinates(driver):
                                                     close_buttons = driver.find_elements(By.CSS_SELECTOR, 'button[aria-label="Close"]')
                                                     if close_buttons:
                                                         driver.execute_script("arguments[0].click();", close_buttons[0])
-                                                        time.sleep(1)
                                                 except:
                                                     pass
                                                 
@@ -154,8 +338,6 @@ def find_first_business_and_click(driver):
     """Find and click on the first business result."""
     try:
         print("Looking for the first business result...")
-        # Wait for search results to load
-        time.sleep(5)
         
         # Try multiple selectors for business listings
         business_selectors = [
@@ -164,8 +346,12 @@ def find_first_business_and_click(driver):
             'div.V0h1Ob-haAclf',
             'div.Nv2PK'
         ]
+
+        # Wait for search results (or a place page the search redirected to) to load
+        wait_for(driver, "results_panel", any_element_present(business_selectors + PLACE_TITLE_SELECTORS), timeout=10)
         
         for selector in business_selectors:
+            metrics.incr("selectors_tried")
             try:
                 businesses = driver.find_elements(By.CSS_SELECTOR, selector)
                 if businesses:
@@ -173,7 +359,12 @@ def find_first_business_and_click(driver):
                     # Click on the first result
                     businesses[0].click()
                     print("Clicked on the first business")
-                    time.sleep(3)
+                    wait_for(
+                        driver,
+                        "place_panel",
+                        EC.all_of(EC.url_contains("/maps/place/"), any_element_present(PLACE_TITLE_SELECTORS)),
+                        timeout=10,
+                    )
                     return True
             except Exception as e:
                 print(f"Error with selector {selector}: {e}")
@@ -190,29 +381,19 @@ def click_reviews_tab(driver):
     """Find and click on the reviews tab."""
     try:
         print("Attempting to click on reviews tab...")
-        time.sleep(5)
         
         # First try to find reviews tab by text content
         try:
-            # Try using JavaScript to find and click the reviews tab by text content
-            js_script = """
-            var elements = document.querySelectorAll('button, div[role="tab"]');
-            for (var i = 0; i < elements.length; i++) {
-                if (elements[i].textContent.toLowerCase().includes('review')  || 
-                    elements[i].textContent.includes('クチコミ')){
-                    elements[i].click();
-                    return true;
-                }
-            }
-            return false;
-            """
-            clicked = driver.execute_script(js_script)
-            if clicked:
+            # Wait for the tab to render, then click it using JavaScript
+            tab = wait_for(driver, "reviews_tab", script_returns_true(FIND_REVIEWS_TAB_JS), timeout=10)
+            if tab:
+                driver.execute_script("arguments[0].click();", tab)
                 print("Successfully clicked reviews tab using JavaScript")
-                time.sleep(3)
+                wait_for(driver, "reviews_loaded", any_element_present([REVIEW_CARD_SELECTOR]), timeout=10)
                 return True
         except Exception as e:
             print(f"JavaScript approach failed: {e}")
+        metrics.incr("fallback_reviews_tab")
         
         # If JavaScript approach failed, try more specific methods
         review_tab_selectors = [
@@ -225,6 +406,7 @@ def click_reviews_tab(driver):
         ]
         
         for selector in review_tab_selectors:
+            metrics.incr("selectors_tried")
             try:
                 elements = driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
@@ -234,7 +416,7 @@ def click_reviews_tab(driver):
                             print(f"Found reviews tab with selector: {selector}")
                             driver.execute_script("arguments[0].click();", element)
                             print("Clicked on reviews tab")
-                            time.sleep(3)
+                            wait_for(driver, "reviews_loaded", any_element_present([REVIEW_CARD_SELECTOR]), timeout=10)
                             return True
             except Exception as e:
                 print(f"Error with selector {selector}: {e}")
@@ -247,8 +429,71 @@ def click_reviews_tab(driver):
         print(f"Error clicking reviews tab: {e}")
         return False
 
-def scroll_reviews(driver, scrolls=10, scroll_pause=1.5):
-    """Scroll down the reviews section to load more reviews."""
+def sort_reviews_by_newest(driver):
+    """Open the review sort menu and pick "Newest". Returns True if the reviews were re-sorted."""
+    try:
+        buttons = wait_for(driver, "sort_button", any_element_present(REVIEW_SORT_BUTTON_SELECTORS), timeout=5)
+        if not buttons:
+            print("Could not find the review sort button")
+            return False
+        driver.execute_script("arguments[0].click();", buttons[0])
+
+        if not wait_for(driver, "sort_menu", element_count_above(REVIEW_SORT_OPTION_SELECTOR, NEWEST_SORT_OPTION),
+                        timeout=5):
+            print("Review sort menu did not open")
+            return False
+        option = driver.find_elements(By.CSS_SELECTOR, REVIEW_SORT_OPTION_SELECTOR)[NEWEST_SORT_OPTION]
+        driver.execute_script("arguments[0].click();", option)
+
+        # The list is replaced by the re-sorted one
+        wait_for(driver, "reviews_sorted", any_element_present([REVIEW_CARD_SELECTOR]), timeout=10)
+        print("Sorted reviews by newest")
+        return True
+    except Exception as e:
+        print(f"Error while sorting reviews: {e}")
+        return False
+
+def _reached_known_review(driver, known_keys):
+    """True if one of the loaded review cards is already in `known_keys`."""
+    try:
+        loaded = _extract_reviews_in_page(driver)
+    except Exception:
+        return False
+    return any(review_key(review["Name"], review["Review"]) in known_keys for review in loaded)
+
+def review_target(place_info: dict, max_reviews=None):
+    """
+    Number of reviews worth loading for a place: its review count, capped at
+    `max_reviews`. Falls back to `max_reviews` when the count is unknown.
+    """
+    total = None
+    if re.fullmatch(r'[\d,]+', place_info.get("total_reviews") or ""):
+        total = int(place_info["total_reviews"].replace(",", ""))
+    else:
+        # The rating often reads like "4.6\n(42,115)"
+        match = re.search(r'\(([\d,]+)\)', place_info.get("rating") or "")
+        if match:
+            total = int(match.group(1).replace(",", ""))
+    if total is None:
+        return max_reviews
+    return min(total, max_reviews) if max_reviews else total
+
+def scroll_reviews(driver, target=None, max_scrolls=None, stall_limit=2, scroll_pause=3, stop_at=None):
+    """
+    Scroll down the reviews section until `target` review cards are loaded.
+
+    After each scroll waits until more review cards are loaded, for at most `scroll_pause` seconds
+    (less once the usual load time is known, see `wait_for`). Stops when the target is reached,
+    when `stall_limit` scrolls in a row load nothing, or after `max_scrolls` (by default enough
+    for the target at a few reviews per scroll). With `stop_at` (a set of `review_key`s) scrolling
+    also stops as soon as a known review is loaded, which with reviews sorted by newest means
+    everything newer is loaded already.
+
+    Returns `{"target", "loaded", "scrolls", "stopped"}`, which is also recorded in `scroll_stats`.
+    """
+    if max_scrolls is None:
+        max_scrolls = target // 3 + 5 if target else 50
+    loaded, scrolls, stopped = 0, 0, "max_scrolls"
     try:
         print("Starting to scroll through reviews...")
         
@@ -264,12 +509,13 @@ def scroll_reviews(driver, scrolls=10, scroll_pause=1.5):
         
         scroll_container = None
         for selector in scroll_container_selectors:
+            metrics.incr("selectors_tried")
             try:
                 elements = driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
                     for element in elements:
                         # Check if this element contains review elements
-                        child_reviews = element.find_elements(By.CSS_SELECTOR, 'div.jftiEf, div[data-review-id]')
+                        child_reviews = element.find_elements(By.CSS_SELECTOR, REVIEW_CARD_SELECTOR)
                         if child_reviews:
                             scroll_container = element
                             print(f"Found scroll container with selector: {selector}")
@@ -284,9 +530,20 @@ def scroll_reviews(driver, scrolls=10, scroll_pause=1.5):
             print("Could not find scroll container, trying to use body element")
             scroll_container = driver.find_element(By.TAG_NAME, 'body')
         
+        loaded = len(driver.find_elements(By.CSS_SELECTOR, REVIEW_CARD_SELECTOR))
+        stalled = 0
+
         # Scroll using multiple methods
-        for i in range(scrolls):
-            print(f"Scrolling {i+1}/{scrolls}...")
+        while scrolls < max_scrolls:
+            if target is not None and loaded >= target:
+                stopped = "target"
+                break
+            if stop_at and _reached_known_review(driver, stop_at):
+                print(f"Reached an already stored review after {scrolls} scrolls")
+                stopped = "known_review"
+                break
+            scrolls += 1
+            print(f"Scrolling {scrolls}/{max_scrolls} ({loaded}/{target if target is not None else '?'} reviews)...")
             
             # Method 1: JavaScript scroll
             try:
@@ -312,10 +569,25 @@ def scroll_reviews(driver, scrolls=10, scroll_pause=1.5):
             except:
                 pass
             
-            time.sleep(scroll_pause)
+            # Wait for the review count to grow instead of sleeping a fixed time
+            count = wait_for(driver, "review_scroll", element_count_above(REVIEW_CARD_SELECTOR, loaded), timeout=scroll_pause)
+            if count:
+                loaded = count
+                stalled = 0
+            else:
+                stalled += 1
+                if stalled >= stall_limit:
+                    stopped = "stalled"
+                    break
             
     except Exception as e:
         print(f"Error while scrolling: {e}")
+        stopped = "error"
+
+    result = {"target": target, "loaded": loaded, "scrolls": scrolls, "stopped": stopped}
+    scroll_stats.record(**result)
+    print(f"Loaded {loaded} reviews (target {target}) in {scrolls} scrolls, stopped: {stopped}")
+    return result
 
 def expand_all_reviews(driver):
     """Find and click all 'More' buttons to expand review text."""
@@ -332,6 +604,7 @@ def expand_all_reviews(driver):
         
         total_clicked = 0
         for selector in more_button_selectors:
+            metrics.incr("selectors_tried")
             try:
                 more_buttons = driver.find_elements(By.CSS_SELECTOR, selector)
                 if more_buttons:
@@ -353,140 +626,63 @@ def expand_all_reviews(driver):
     except Exception as e:
         print(f"Error expanding reviews: {e}")
 
-def extract_place_info(driver):
-    """Extract basic information about the place."""
-    place_info = {
-        "name": "Unknown",
-        "address": "Unknown",
-        "phone": "Unknown",
-        "website": "Unknown",
-        "rating": "Unknown",
-        "total_reviews": "Unknown",
-        "categories": "Unknown"
-    }
+def extract_place_info(driver, batch=True):
+    """
+    Extract basic information about the place.
+
+    With `batch` all fields are read in a single in-page script call; the
+    per-selector WebDriver lookups are used if that fails.
+    """
+    if batch:
+        try:
+            place_info = _extract_place_info_in_page(driver)
+            print(f"Extracted place information in page: {place_info['name']}")
+            return place_info
+        except Exception as e:
+            print(f"In-page place info extraction failed, falling back to WebDriver lookups: {e}")
+            metrics.incr("fallback_place_info")
+    return _extract_place_info_by_element(driver)
+
+def _empty_place_info():
+    return {field: "Unknown" for field in PLACE_INFO_SELECTORS}
+
+def _clean_total_reviews(text):
+    # Try to extract just the number
+    match = re.search(r'(\d+(?:,\d+)*)', text)
+    return match.group(1) if match else text
+
+def _extract_place_info_in_page(driver):
+    """Read every place field with one execute_script round trip."""
+    values = driver.execute_script(EXTRACT_PLACE_INFO_JS, PLACE_INFO_SELECTORS)
+    place_info = _empty_place_info()
+    for field, value in values.items():
+        if value is not None:
+            place_info[field] = _clean_total_reviews(value) if field == "total_reviews" else value
+    return place_info
+
+def _extract_place_info_by_element(driver):
+    """Extract place information with one WebDriver lookup per selector."""
+    place_info = _empty_place_info()
     
     try:
         print("Extracting place information...")
         
-        # Extract name
-        name_selectors = [
-            'h1.DUwDvf',
-            'h1.fontHeadlineLarge',
-            'div.P5Bobd'
-        ]
-        
-        for selector in name_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    place_info["name"] = elements[0].text
-                    print(f"Found place name: {place_info['name']}")
-                    break
-            except:
-                continue
-        
-        # Extract address
-        address_selectors = [
-            'button[data-item-id="address"]',
-            'span.desktop-more-info-widget-place-address'
-        ]
-        
-        for selector in address_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    place_info["address"] = elements[0].text
-                    print(f"Found address: {place_info['address']}")
-                    break
-            except:
-                continue
-        
-        # Extract phone number
-        phone_selectors = [
-            'button[data-item-id*="phone"]',
-            'span.QSFF4-text'
-        ]
-        
-        for selector in phone_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    place_info["phone"] = elements[0].text
-                    print(f"Found phone: {place_info['phone']}")
-                    break
-            except:
-                continue
-        
-        # Extract website
-        website_selectors = [
-            'a[data-item-id*="authority"]',
-            'a[jsaction*="website"]'
-        ]
-        
-        for selector in website_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    place_info["website"] = elements[0].get_attribute("href")
-                    print(f"Found website: {place_info['website']}")
-                    break
-            except:
-                continue
-        
-        # Extract rating
-        rating_selectors = [
-            'div.F7nice',
-            'span.ceNzKf',
-            'span.rW3L9c'
-        ]
-        
-        for selector in rating_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    place_info["rating"] = elements[0].text
-                    print(f"Found rating: {place_info['rating']}")
-                    break
-            except:
-                continue
-
-        # Extract total reviews
-        reviews_count_selectors = [
-            'span.F7nice',
-            'span.r-i7DoTkIFmMnw',
-            'span.DkEaL'
-        ]
-        
-        for selector in reviews_count_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    # Try to extract just the number
-                    text = elements[0].text
-                    match = re.search(r'(\d+(?:,\d+)*)', text)
-                    if match:
-                        place_info["total_reviews"] = match.group(1)
-                    else:
-                        place_info["total_reviews"] = text
-                    print(f"Found total reviews: {place_info['total_reviews']}")
-                    break
-            except:
-                continue
-        
-        # Extract categories
-        category_selectors = [
-            'button.DkEaL'
-        ]
-        
-        for selector in category_selectors:
-            try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    place_info["categories"] = elements[0].text
-                    print(f"Found categories: {place_info['categories']}")
-                    break
-            except:
-                continue
+        for field, selectors in PLACE_INFO_SELECTORS.items():
+            for selector in selectors:
+                metrics.incr("selectors_tried")
+                try:
+                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
+                    if elements:
+                        if field == "website":
+                            place_info[field] = elements[0].get_attribute("href")
+                        elif field == "total_reviews":
+                            place_info[field] = _clean_total_reviews(elements[0].text)
+                        else:
+                            place_info[field] = elements[0].text
+                        print(f"Found {field}: {place_info[field]}")
+                        break
+                except:
+                    continue
                 
         return place_info
         
@@ -494,22 +690,43 @@ def extract_place_info(driver):
         print(f"Error extracting place info: {e}")
         return place_info
 
-def extract_reviews(driver):
-    """Extract reviews from the Google Maps page."""
+def extract_reviews(driver, batch=True):
+    """
+    Extract reviews from the Google Maps page.
+
+    With `batch` every review field is read in a single in-page script call;
+    the per-element WebDriver lookups are used if that fails.
+    """
+    if batch:
+        try:
+            reviews = _extract_reviews_in_page(driver)
+            print(f"Extracted {len(reviews)} reviews in page")
+            return reviews
+        except Exception as e:
+            print(f"In-page review extraction failed, falling back to WebDriver lookups: {e}")
+            metrics.incr("fallback_reviews")
+    return _extract_reviews_by_element(driver)
+
+def _extract_reviews_in_page(driver):
+    """Read all loaded reviews with one execute_script round trip."""
+    return driver.execute_script(
+        EXTRACT_REVIEWS_JS,
+        REVIEW_ELEMENT_SELECTORS,
+        REVIEW_NAME_SELECTORS,
+        REVIEW_TEXT_SELECTORS,
+        REVIEW_DATE_SELECTORS,
+    )
+
+def _extract_reviews_by_element(driver):
+    """Extract reviews with WebDriver lookups for every selector of every review."""
     reviews = []
     
     try:
         print("Extracting reviews...")
         
-        # Potential selectors for review elements
-        review_element_selectors = [
-            'div[data-review-id]',
-            'div.jftiEf',
-            'div.gws-localreviews__google-review'
-        ]
-        
         review_elements = []
-        for selector in review_element_selectors:
+        for selector in REVIEW_ELEMENT_SELECTORS:
+            metrics.incr("selectors_tried")
             try:
                 elements = driver.find_elements(By.CSS_SELECTOR, selector)
                 if elements:
@@ -530,14 +747,8 @@ def extract_reviews(driver):
                 
                 # Extract reviewer name - try different selectors
                 name = "Unknown"
-                name_selectors = [
-                    'div.d4r55',
-                    'div.TSUbDb',
-                    'span.x3AX1-LfntMc-header-title-title',
-                    'a.DHIhE',
-                    'div.Tfgpc'
-                ]
-                for selector in name_selectors:
+                for selector in REVIEW_NAME_SELECTORS:
+                    metrics.incr("selectors_tried")
                     try:
                         name_elements = review.find_elements(By.CSS_SELECTOR, selector)
                         if name_elements:
@@ -574,15 +785,8 @@ def extract_reviews(driver):
                 
                 # Extract review text - try multiple selectors
                 review_text = ""
-                text_selectors = [
-                    'span[class*="fontBodyMedium"]',
-                    'span.wiI7pd',
-                    'div.MyEned',
-                    'span.review-full-text',
-                    'div.Jtu6Td'
-                ]
-                
-                for selector in text_selectors:
+                for selector in REVIEW_TEXT_SELECTORS:
+                    metrics.incr("selectors_tried")
                     try:
                         text_elements = review.find_elements(By.CSS_SELECTOR, selector)
                         if text_elements:
@@ -606,13 +810,8 @@ def extract_reviews(driver):
                 
                 # Extract review date
                 date = "N/A"
-                date_selectors = [
-                    'span.rsqaWe',
-                    'span.dehysf',
-                    'span.xRkPPb'
-                ]
-                
-                for selector in date_selectors:
+                for selector in REVIEW_DATE_SELECTORS:
+                    metrics.incr("selectors_tried")
                     try:
                         date_elements = review.find_elements(By.CSS_SELECTOR, selector)
                         if date_elements:
@@ -632,6 +831,7 @@ def extract_reviews(driver):
                 
             except StaleElementReferenceException:
                 print("Stale element encountered, skipping this review")
+                metrics.incr("stale_elements")
                 continue
             except Exception as e:
                 print(f"Error extracting a review: {e}")
@@ -642,87 +842,208 @@ def extract_reviews(driver):
     
     return reviews
 
-def scrap_page(driver, url: str):
-    
-    try:
-        # Navigate to the URL
+def open_place_page(driver, url: str, resolution_cache=None):
+    """
+    Open the place page for a Maps search URL.
+
+    With `resolution_cache` a search resolved before is opened directly at its
+    place URL; otherwise the search page is loaded, the first result clicked
+    (the caller caches the place URL it led to). Returns True if a place page is open.
+    """
+    resolved = resolution_cache.lookup(url) if resolution_cache is not None else None
+    if resolved:
+        with metrics.stage("page_load"):
+            driver.get(resolved["place_url"])
+            loaded = wait_for(driver, "place_panel_direct", any_element_present(PLACE_TITLE_SELECTORS), timeout=10)
+        if loaded:
+            print("Loaded cached place page")
+            metrics.incr("resolution_cache_hits")
+            return True
+        # The place moved or is gone, resolve the search again
+        print("Cached place page did not load, searching again")
+        metrics.incr("resolution_cache_stale")
+        resolution_cache.invalidate(url)
+
+    # Navigate to the URL
+    with metrics.stage("page_load"):
         driver.get(url)
-        print("Loaded Google Maps page")
-        time.sleep(5)
-        
-        # Find and click on the first business result
-        if not find_first_business_and_click(driver):
-            print("Could not find business listing, but continuing anyway")
+    print("Loaded Google Maps page")
+
+    # Find and click on the first business result (waits for the results panel)
+    with metrics.stage("business_click"):
+        clicked = find_first_business_and_click(driver)
+    if not clicked:
+        print("Could not find business listing, but continuing anyway")
+        metrics.incr("business_not_found")
+        return False
+    return True
+
+def scrap_page(driver, url: str, snapshot_dir=None, sink=None, review_index=None, incremental=False,
+               max_reviews=100, resolution_cache=None, place_cache=None, on_written=None):
+    """
+    Scrape place information and reviews for a Maps search URL and write them to
+    `sink` (see `scrapper.sinks`; by default CSV files in `outputs/`).
+
+    With `snapshot_dir` the final page source is also saved there, compressed,
+    so extraction can be re-run offline with `scrapper.offline_parser`.
+    With `review_index` (a `ReviewIndex`) only reviews not stored before are
+    written; `incremental` also sorts reviews by newest and stops scrolling at
+    the first stored one. Reviews are scrolled until the place's review count,
+    at most `max_reviews` (0 for no limit), are loaded. Returns
+    `(reviews, place)`, or `(None, None)` when no reviews were found.
+    With `resolution_cache` (a `ResolutionCache`) searches resolved on an
+    earlier visit go straight to the place page. With `place_cache` (a
+    `PlaceCache`) a query or place scraped recently is not scraped again.
+
+    The sink may buffer the place; the review index and place cache are only
+    updated, and `on_written()` only called, once it is actually written, so a
+    crash never leaves a place recorded as scraped that is not in the output.
+    `on_written` is not called when `(None, None)` is returned. A failed
+    `sink` flush does not fail the page: the place stays buffered for the next.
+
+    The time of every stage and the events counted on the way are recorded
+    in `scrapper.metrics.metrics`, one record per page.
+    """
+    with metrics.page(url):
+        return _scrap_page(driver, url, snapshot_dir, sink, review_index, incremental, max_reviews,
+                           resolution_cache, place_cache, on_written)
+
+def _scrap_page(driver, url, snapshot_dir, sink, review_index, incremental, max_reviews, resolution_cache,
+                place_cache, on_written):
+    query_key = normalize_query(url)
+    if place_cache is not None:
+        cached = place_cache.get(query_key)
+        if cached is not None:
+            print(f"Query already scraped as place {cached['place_id']}, skipping")
+            metrics.set_status("cached")
+            if not cached["place"]:
+                return (None, None)
+            if on_written is not None:
+                on_written()
+            return ([], cached["place"])
+    try:
+        # Go to the place page, directly if the search was resolved before
+        open_place_page(driver, url, resolution_cache)
         
         # Extract coordinates
-        coordinates = extract_coordinates(driver)
+        with metrics.stage("coordinates"):
+            coordinates = extract_coordinates(driver)
+        if resolution_cache is not None:
+            resolution_cache.store(url, driver.current_url, coordinates)
         
         # Extract place information
-        place_info = extract_place_info(driver)
+        with metrics.stage("place_info"):
+            place_info = extract_place_info(driver)
+        place = place_record(place_info, coordinates)
+        key = place_id(place, url)
+        if place_cache is not None:
+            # Another query led to the same place
+            cached = place_cache.get(key)
+            if cached is not None:
+                place_cache.put(query_key, cached)
+                print(f"Place {key} already scraped for another query, skipping")
+                metrics.set_status("cached")
+                if not cached["place"]:
+                    return (None, None)
+                if on_written is not None:
+                    on_written()
+                return ([], cached["place"])
+        known_keys = review_index.known(key) if review_index is not None else set()
         
         # Click on reviews tab
-        if not click_reviews_tab(driver):
+        with metrics.stage("reviews_tab"):
+            clicked = click_reviews_tab(driver)
+        if not clicked:
             print("Could not click reviews tab, but continuing anyway")
+            metrics.incr("reviews_tab_not_found")
         
-        # Scroll through reviews
-        scroll_reviews(driver, scrolls=8)
+        # Scroll through reviews; on a refresh only until the newest stored review
+        target = review_target(place_info, max_reviews)
+        if incremental and known_keys:
+            with metrics.stage("sort"):
+                sorted_by_newest = sort_reviews_by_newest(driver)
+        else:
+            sorted_by_newest = False
+        with metrics.stage("scroll"):
+            if sorted_by_newest:
+                scrolled = scroll_reviews(driver, target=target, stop_at=known_keys)
+            else:
+                scrolled = scroll_reviews(driver, target=target)
+        metrics.incr("scrolls", scrolled["scrolls"])
         
         # Expand all reviews
-        expand_all_reviews(driver)
+        with metrics.stage("expand"):
+            expand_all_reviews(driver)
         
         # Extract reviews
-        reviews = extract_reviews(driver)
+        with metrics.stage("extract_reviews"):
+            reviews = extract_reviews(driver)
+        metrics.incr("reviews_found", len(reviews))
+
+        # Keep the final page so extraction can be re-run without the browser
+        if snapshot_dir:
+            with metrics.stage("snapshot"):
+                save_snapshot(os.path.join(snapshot_dir, snapshot_name(url)), driver.page_source, url,
+                              driver.current_url)
         
-        # Save to CSV
-        if reviews:
-            review_df = pd.DataFrame(reviews)
-            
-            # Add place information to each review
-            review_df['Place_Name'] = place_info["name"]
-            review_df['Address'] = place_info["address"]
-            review_df['Phone'] = place_info["phone"]
-            review_df['Website'] = place_info["website"]
-            review_df['Place_Rating'] = place_info["rating"]
-            review_df['Total_Reviews'] = place_info["total_reviews"]
-            review_df['Categories'] = place_info["categories"]
-            review_df['Latitude'] = coordinates["latitude"]
-            review_df['Longitude'] = coordinates["longitude"]
-            
-            # Save to CSV
-            review_df.to_csv(f'outputs/{place_info["name"]}_info.csv', index=False, encoding='utf-8-sig')
-            print(f"Successfully scraped {len(reviews)} reviews and saved to comrez_akabane_reviews.csv")
-            
-            # Also save place info separately
-            place_data = {
-                "Name": place_info["name"],
-                "Address": place_info["address"],
-                "Phone": place_info["phone"],
-                "Website": place_info["website"],
-                "Rating": place_info["rating"],
-                "Total_Reviews": place_info["total_reviews"],
-                "Categories": place_info["categories"],
-                "Latitude": coordinates["latitude"],
-                "Longitude": coordinates["longitude"]
-            }
-            
-            place_df = pd.DataFrame([place_data])
-            place_df.to_csv(f'outputs/{place_info["name"]}_reviews.csv', index=False, encoding='utf-8-sig')
-            print("Place information saved to comrez_akabane_place_info.csv")
-            
-        else:
+        if not reviews and not known_keys:
             print("No reviews found.")
+            metrics.set_status("no_reviews")
+            if place_cache is not None:
+                place_cache.put(query_key, {"place_id": key, "place": None, "reviews": 0})
+            return (None, None)
+
+        # Only the reviews not stored by an earlier run are written
+        review_keys = [review_key(review["Name"], review["Review"]) for review in reviews]
+        new_reviews = [review for review, k in zip(reviews, review_keys) if k not in known_keys]
+
+        metrics.incr("reviews_new", len(new_reviews))
+
+        def stored():
+            # Runs once the sink has written the place, possibly from another worker's flush
+            if review_index is not None:
+                review_index.add(key, review_keys)
+            if place_cache is not None:
+                result = {"place_id": key, "place": place, "reviews": len(reviews)}
+                place_cache.put(query_key, result)
+                place_cache.put(key, result)
+            if on_written is not None:
+                on_written()
+
+        with metrics.stage("write"):
+            if sink is None:
+                with CsvSink("outputs", flush_every=1) as csv_sink:
+                    csv_sink.write(place, new_reviews, source_url=url, on_written=stored)
+            else:
+                try:
+                    sink.write(place, new_reviews, source_url=url, on_written=stored)
+                except Exception as e:
+                    # The place is buffered and the next flush writes it, then marks the URL done;
+                    # failing the page would scrape it again into a second buffered copy
+                    print(f"Could not write the output, retrying with the next batch: {e}")
+                    metrics.incr("write_errors")
+        print(f"Successfully scraped {len(new_reviews)} new of {len(reviews)} reviews of {place_info['name']} "
+              f"(place {key})")
+        return (new_reviews, place)
             
     except Exception as e:
         print(f"An error occurred: {e}")
-    
-    finally:
-        # Close the browser
-        if review_df:
-            return (review_df, place_df)
-        else: 
-            return (None, None)
-        # Uncomment the line below when ready to close the browser automatically
-        # driver.quit()
+        # Let the caller record the failure so the URL can be retried
+        raise
+
+def place_record(place_info: dict, coordinates: dict) -> dict:
+    """Place information and coordinates as one row with the CSV column names."""
+    return {
+        "Name": place_info["name"],
+        "Address": place_info["address"],
+        "Phone": place_info["phone"],
+        "Website": place_info["website"],
+        "Rating": place_info["rating"],
+        "Total_Reviews": place_info["total_reviews"],
+        "Categories": place_info["categories"],
+        "Latitude": coordinates["latitude"],
+        "Longitude": coordinates["longitude"]
+    }
 
 def get_urls_from_file(folder_path: str) -> list:
     """Read URLs from a file and return them as a list."""
@@ -749,27 +1070,99 @@ def get_urls_from_file(folder_path: str) -> list:
                 file.write(url + "\n")
     return urls
 
-def main():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape place information and reviews from Google Maps")
+    parser.add_argument("--locations", default="scraped_locations", help="folder with the top 100 CSV files")
+    parser.add_argument("--workers", type=int, default=1, help="number of parallel browser workers")
+    parser.add_argument("--recycle-after", type=int, default=50,
+                        help="restart a worker's browser after this many pages (0 to disable)")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=None,
+                        help="run Chrome in headless mode (default: on for the lean profile and for several workers)")
+    parser.add_argument("--profile", choices=["full", "lean"], default="full",
+                        help="'lean' blocks images, fonts, media and analytics to save bandwidth and memory")
+    parser.add_argument("--profile-dir", default=None,
+                        help="keep browser profiles (cache, cookies) here between drivers and runs")
+    parser.add_argument("--frontier", default="scrape_frontier.db",
+                        help="SQLite file recording the state of every URL, used to resume interrupted runs")
+    parser.add_argument("--max-attempts", type=int, default=3, help="attempts per URL before giving up on it")
+    parser.add_argument("--snapshot-dir", default=None,
+                        help="save the compressed final page source of every place here for offline parsing")
+    parser.add_argument("--output", choices=SINK_KINDS, default="csv",
+                        help="'csv' writes two files per place, 'jsonl' and 'parquet' append batches of places")
+    parser.add_argument("--output-dir", default=None,
+                        help="where to write the output (default: outputs, or dataset for parquet)")
+    parser.add_argument("--flush-every", type=int, default=20,
+                        help="places buffered before they are written; a killed run loses at most this many")
+    parser.add_argument("--metrics-file", default=None,
+                        help="append the stage timings and counters of every page here as JSON lines")
+    parser.add_argument("--prometheus-file", default=None,
+                        help="write the run's stage percentiles and counters here in the Prometheus text format")
+    parser.add_argument("--resolution-cache", default="scrape_resolution.db",
+                        help="SQLite file mapping search URLs to the place pages they resolved to")
+    parser.add_argument("--place-cache", default="scrape_places.db",
+                        help="SQLite file with recently scraped places, so duplicate queries are scraped once")
+    parser.add_argument("--place-cache-ttl", type=float, default=12,
+                        help="hours a scraped place is reused for duplicate queries before it is scraped again")
+    parser.add_argument("--max-reviews", type=int, default=100,
+                        help="reviews to load per place, fewer if the place has fewer (0 for all)")
+    parser.add_argument("--review-index", default="scrape_reviews.db",
+                        help="SQLite file with the keys of the stored reviews; only new reviews are written")
+    parser.add_argument("--incremental", action="store_true",
+                        help="refresh places scraped before: sort reviews by newest and stop at the first stored one")
+    parser.add_argument("--refresh-after", type=float, default=12,
+                        help="with --incremental, re-visit places scraped more than this many hours ago")
+    return parser.parse_args()
 
-    driver = setup_driver()
+def main():
+    args = parse_args()
 
     # URL of the Google Maps page    
 
-    urls = get_urls_from_file("scraped_locations")
+    urls = get_urls_from_file(args.locations)
+
+    # Completed URLs are skipped and failed ones retried with backoff
+    frontier = Frontier(args.frontier, max_attempts=args.max_attempts)
+    frontier.add_urls(urls)
+    if args.incremental:
+        requeued = frontier.requeue_done(older_than=args.refresh_after * 3600)
+        print(f"Refreshing {requeued} places scraped more than {args.refresh_after:g} hours ago")
+    print(f"Frontier: {frontier.counts()}")
+    metrics.configure(jsonl_path=args.metrics_file)
+    review_index = ReviewIndex(args.review_index)
+    resolution_cache = ResolutionCache(args.resolution_cache)
+    place_cache = PlaceCache(args.place_cache, ttl_hours=args.place_cache_ttl)
+    sink = make_sink(args.output, args.output_dir, args.flush_every)
 
     try:
-        for url in urls:
-            print("-----------------------------------------------------------------------------------")
-            print(f"Scraping URL: {url}")
-            try:
-                _, _ = scrap_page(driver, url)
-            except Exception as e:
-                print(f"scrape_page function errored {url}: {e}")
-                continue
-    except Exception as e:
-        print(f"An error occurred while scraping: {e}")
+        lean = args.profile == "lean"
+        headless = args.headless if args.headless is not None else (lean or args.workers > 1)
+        run_worker_pool(
+            frontier,
+            driver_factory=make_driver_factory(headless=headless, lean=lean, profile_dir=args.profile_dir),
+            scrape=partial(scrap_page, snapshot_dir=args.snapshot_dir, sink=sink,
+                           review_index=review_index, incremental=args.incremental,
+                           max_reviews=args.max_reviews, resolution_cache=resolution_cache,
+                           place_cache=place_cache),
+            workers=args.workers,
+            recycle_after=args.recycle_after,
+        )
+        for url, attempts, error in frontier.failures():
+            print(f"Failed after {attempts} attempts: {url}: {error}")
     finally:
-        driver.quit()
+        sink.close()
+        print(f"Wrote {sink.places_written} places and {sink.reviews_written} reviews to {sink.output_dir}")
+        place_cache.print_summary()
+        place_cache.purge_expired()
+        place_cache.close()
+        resolution_cache.print_summary()
+        resolution_cache.close()
+        review_index.close()
+        frontier.close()
+        wait_stats.print_summary()
+        scroll_stats.print_summary()
+        metrics.print_summary()
+        if args.prometheus_file:
+            metrics.write_prometheus(args.prometheus_file)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def percentile(samples, pct):
+    """Nearest-rank `pct` percentile of `samples`, or None if there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Metrics:
+    """
+    Per-stage timings and event counters of the scraper.
+
+    `page(url)` opens a record for one page on the current thread; `stage(name)`
+    times a block and `incr(name)` counts an event, both into that record
+    (if any) and into the run totals. With `jsonl_path` every finished page is
+    appended there as one JSON line. Safe to share between worker threads.
+    """
+
+    def __init__(self, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stage_samples = defaultdict(list)
+        self._counters = defaultdict(int)
+        self._pages = 0
+
+    def configure(self, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+
+    def _current(self):
+        return getattr(self._local, "page", None)
+
+    @contextmanager
+    def page(self, url):
+        """Collect the stages and counters of scraping `url` into one record."""
+        record = {"url": url, "started_at": time.time(), "stages": {}, "counters": defaultdict(int)}
+        self._local.page = record
+        started = time.perf_counter()
+        status = "error"
+        try:
+            yield record
+            status = record.get("status", "ok")
+        finally:
+            self._local.page = None
+            record["status"] = status
+            record["seconds"] = round(time.perf_counter() - started, 4)
+            record["counters"] = dict(record["counters"])
+            with self._lock:
+                self._pages += 1
+                self._stage_samples["total"].append(record["seconds"])
+                if self.jsonl_path:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed block as stage `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            record = self._current()
+            if record is not None:
+                record["stages"][name] = round(record["stages"].get(name, 0.0) + seconds, 4)
+            with self._lock:
+                self._stage_samples[name].append(seconds)
+
+    def incr(self, name, count=1):
+        """Count `count` occurrences of event `name`."""
+        record = self._current()
+        if record is not None:
+            record["counters"][name] += count
+        with self._lock:
+            self._counters[name] += count
+
+    def set_status(self, status):
+        """Status of the current page record ("ok" by default, "error" if it raised)."""
+        record = self._current()
+        if record is not None:
+            record["status"] = status
+
+    def summary(self):
+        """`{"pages", "stages": {name: {count, total, p50, p95, p99}}, "counters"}` for the run so far."""
+        with self._lock:
+            samples = {name: list(values) for name, values in self._stage_samples.items()}
+            counters = dict(self._counters)
+            pages = self._pages
+        stages = {}
+        for name, values in samples.items():
+            stages[name] = {
+                "count": len(values),
+                "total": sum(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+        return {"pages": pages, "stages": stages, "counters": counters}
+
+    def print_summary(self):
+        """Print p50/p95/p99 of every stage, the stage with the most total time first."""
+        summary = self.summary()
+        if not summary["stages"]:
+            return
+        print(f"Stage timings over {summary['pages']} pages:")
+        for name, stage in sorted(summary["stages"].items(), key=lambda item: -item[1]["total"]):
+            print(
+                f"  {name}: total={stage['total']:.1f}s count={stage['count']} "
+                f"p50={stage['p50']:.2f}s p95={stage['p95']:.2f}s p99={stage['p99']:.2f}s"
+            )
+        if summary["counters"]:
+            print("Counters: " + " ".join(f"{name}={value}" for name, value in sorted(summary["counters"].items())))
+
+    def write_prometheus(self, path):
+        """Write the run totals in the Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        summary = self.summary()
+        lines = [
+            "# HELP scraper_stage_seconds Time spent in each scrap_page stage.",
+            "# TYPE scraper_stage_seconds summary",
+        ]
+        for name, stage in sorted(summary["stages"].items()):
+            for quantile in ("p50", "p95", "p99"):
+                lines.append(
+                    f'scraper_stage_seconds{{stage="{name}",quantile="0.{quantile[1:]}"}} {stage[quantile]:.6f}'
+                )
+            lines.append(f'scraper_stage_seconds_sum{{stage="{name}"}} {stage["total"]:.6f}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+        lines += [
+            "# HELP scraper_events_total Events counted while scraping.",
+            "# TYPE scraper_events_total counter",
+        ]
+        for name, value in sorted(summary["counters"].items()):
+            lines.append(f'scraper_events_total{{event="{name}"}} {value}')
+        lines += [
+            "# HELP scraper_pages_total Pages scraped.",
+            "# TYPE scraper_pages_total counter",
+            f"scraper_pages_total {summary['pages']}",
+        ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
@@ -0,0 +1,244 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from scrapper.page_selectors import (
+    PLACE_INFO_SELECTORS,
+    REVIEW_ELEMENT_SELECTORS,
+    REVIEW_NAME_SELECTORS,
+    REVIEW_TEXT_SELECTORS,
+    REVIEW_DATE_SELECTORS,
+)
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+SNAPSHOT_SUFFIX = ".html.gz"
+
+# First lines of a snapshot, before the page source
+SNAPSHOT_HEADER = "<!-- source-url: {source_url} -->\n<!-- scraped-url: {scraped_url} -->\n"
+HEADER_PATTERN = re.compile(r'<!-- (source-url|scraped-url): (.*?) -->')
+
+URL_COORDINATES_PATTERN = re.compile(r'@(-?\d+\.\d+),(-?\d+\.\d+)')
+SOURCE_COORDINATES_PATTERN = re.compile(r'"latitude":(-?\d+\.\d+),"longitude":(-?\d+\.\d+)')
+
+PLACE_FIELDS = ["Snapshot", "Source_URL", "Name", "Address", "Phone", "Website", "Rating",
+                "Total_Reviews", "Categories", "Latitude", "Longitude"]
+REVIEW_FIELDS = ["Snapshot", "Name", "Rating", "Date", "Review"]
+
+
+def snapshot_name(url):
+    """Stable snapshot file name for a scraped URL."""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + SNAPSHOT_SUFFIX
+
+
+def save_snapshot(path, page_source, source_url, scraped_url):
+    """Write the page source gzip-compressed, prefixed with the URLs it was scraped from."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(SNAPSHOT_HEADER.format(source_url=source_url, scraped_url=scraped_url))
+        f.write(page_source)
+
+
+def read_snapshot(path):
+    """Return `(html, headers)` for a snapshot, plain or gzip-compressed."""
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        html = f.read()
+    headers = dict(HEADER_PATTERN.findall(html[:4096]))
+    return html, headers
+
+
+def _text(element):
+    return element.get_text("\n", strip=True)
+
+
+def extract_place_info(soup):
+    """Offline counterpart of `map_scraping.extract_place_info`."""
+    place_info = {field: "Unknown" for field in PLACE_INFO_SELECTORS}
+    for field, selectors in PLACE_INFO_SELECTORS.items():
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element is None:
+                continue
+            if field == "website":
+                place_info[field] = element.get("href", "Unknown")
+            elif field == "total_reviews":
+                text = _text(element)
+                match = re.search(r'(\d+(?:,\d+)*)', text)
+                place_info[field] = match.group(1) if match else text
+            else:
+                place_info[field] = _text(element)
+            break
+    return place_info
+
+
+def extract_coordinates(soup, html, scraped_url=None):
+    """Offline counterpart of `map_scraping.extract_coordinates`, without the share dialog."""
+    match = URL_COORDINATES_PATTERN.search(scraped_url or "")
+    if match:
+        return {"latitude": match.group(1), "longitude": match.group(2)}
+
+    for script in soup.find_all("script"):
+        content = script.string or ""
+        if "latitude" in content and "longitude" in content:
+            json_match = re.search(r'({[^{}]*"latitude"[^{}]*})', content)
+            if not json_match:
+                continue
+            try:
+                data = json.loads(json_match.group(1))
+            except ValueError:
+                continue
+            if "latitude" in data and "longitude" in data:
+                return {"latitude": str(data["latitude"]), "longitude": str(data["longitude"])}
+
+    match = SOURCE_COORDINATES_PATTERN.search(html)
+    if match:
+        return {"latitude": match.group(1), "longitude": match.group(2)}
+    return {"latitude": None, "longitude": None}
+
+
+def _first_text(root, selectors, fallback):
+    for selector in selectors:
+        element = root.select_one(selector)
+        if element is not None:
+            text = _text(element)
+            if text:
+                return text
+    return fallback
+
+
+def extract_reviews(soup):
+    """Offline counterpart of `map_scraping.extract_reviews`, using the same selector fallback chains."""
+    cards = []
+    for selector in REVIEW_ELEMENT_SELECTORS:
+        cards = soup.select(selector)
+        if cards:
+            break
+
+    reviews = []
+    for card in cards:
+        rating = "N/A"
+        for element in card.select('span[role="img"]'):
+            match = re.search(r'(\d+)', element.get("aria-label", ""))
+            if match:
+                rating = match.group(1)
+                break
+        if rating == "N/A":
+            stars = card.select('img[src*="star_"]')
+            if stars:
+                rating = str(len([s for s in stars if "star_fill" in s.get("src", "")]))
+
+        review_text = ""
+        for selector in REVIEW_TEXT_SELECTORS:
+            review_text = " ".join(t for t in (_text(e) for e in card.select(selector)) if t)
+            if review_text:
+                break
+        if not review_text:
+            # Last resort: skip the first lines which might be name and rating
+            lines = _text(card).split("\n")
+            review_text = " ".join(lines[2:]) if len(lines) > 2 else ""
+
+        reviews.append({
+            "Name": _first_text(card, REVIEW_NAME_SELECTORS, "Unknown"),
+            "Rating": rating,
+            "Date": _first_text(card, REVIEW_DATE_SELECTORS, "N/A"),
+            "Review": review_text,
+        })
+    return reviews
+
+
+def parse_snapshot(path):
+    """Parse one snapshot file into `(place, reviews)` records."""
+    html, headers = read_snapshot(path)
+    soup = BeautifulSoup(html, HTML_PARSER)
+    place_info = extract_place_info(soup)
+    coordinates = extract_coordinates(soup, html, headers.get("scraped-url"))
+    snapshot = os.path.basename(path)
+    place = {
+        "Snapshot": snapshot,
+        "Source_URL": headers.get("source-url", ""),
+        "Name": place_info["name"],
+        "Address": place_info["address"],
+        "Phone": place_info["phone"],
+        "Website": place_info["website"],
+        "Rating": place_info["rating"],
+        "Total_Reviews": place_info["total_reviews"],
+        "Categories": place_info["categories"],
+        "Latitude": coordinates["latitude"],
+        "Longitude": coordinates["longitude"],
+    }
+    reviews = [dict(review, Snapshot=snapshot) for review in extract_reviews(soup)]
+    return place, reviews
+
+
+def _parse_snapshot_safe(path):
+    try:
+        return path, parse_snapshot(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def list_snapshots(snapshot_dir):
+    return sorted(
+        os.path.join(snapshot_dir, f) for f in os.listdir(snapshot_dir)
+        if f.endswith(SNAPSHOT_SUFFIX) or f.endswith(".html")
+    )
+
+
+def parse_snapshot_dir(snapshot_dir, output_dir="offline_outputs", workers=None):
+    """
+    Re-extract place info, coordinates and reviews from every snapshot in
+    `snapshot_dir` with a process pool, writing `places.csv` and `reviews.csv`
+    to `output_dir`. Returns the number of places and reviews written.
+    """
+    paths = list_snapshots(snapshot_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    places_path = os.path.join(output_dir, "places.csv")
+    reviews_path = os.path.join(output_dir, "reviews.csv")
+
+    place_count, review_count = 0, 0
+    with open(places_path, "w", newline="", encoding="utf-8-sig") as places_file, \
+            open(reviews_path, "w", newline="", encoding="utf-8-sig") as reviews_file:
+        place_writer = csv.DictWriter(places_file, fieldnames=PLACE_FIELDS)
+        review_writer = csv.DictWriter(reviews_file, fieldnames=REVIEW_FIELDS)
+        place_writer.writeheader()
+        review_writer.writeheader()
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(paths) // ((workers or os.cpu_count() or 1) * 4))
+            for path, result, error in executor.map(_parse_snapshot_safe, paths, chunksize=chunksize):
+                if error:
+                    print(f"Error parsing {path}: {error}")
+                    continue
+                place, reviews = result
+                place_writer.writerow(place)
+                review_writer.writerows(reviews)
+                place_count += 1
+                review_count += len(reviews)
+
+    print(f"Parsed {place_count} places and {review_count} reviews from {len(paths)} snapshots into {output_dir}")
+    return place_count, review_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract places and reviews from saved Google Maps snapshots")
+    parser.add_argument("snapshot_dir", nargs="?", default="snapshots")
+    parser.add_argument("--output-dir", default="offline_outputs")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per CPU)")
+    args = parser.parse_args()
+    parse_snapshot_dir(args.snapshot_dir, args.output_dir, args.workers)
+
+
+if __name__ == "__main__":
+    main()
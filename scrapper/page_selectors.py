@@ -0,0 +1,53 @@
+"""CSS selectors for Google Maps pages, shared by the live scraper and the offline parser."""
+
+# Place title on a place page, used to tell that the place panel has loaded
+PLACE_TITLE_SELECTORS = ['h1.DUwDvf', 'h1.fontHeadlineLarge']
+
+# Loaded review cards in the reviews tab
+REVIEW_CARD_SELECTOR = 'div.jftiEf, div[data-review-id]'
+
+# Button opening the review sort menu, and its options (most relevant, newest, highest, lowest)
+REVIEW_SORT_BUTTON_SELECTORS = [
+    'button[aria-label*="Sort"]',
+    'button[data-value="Sort"]',
+    'button[aria-label*="並べ替え"]',
+]
+REVIEW_SORT_OPTION_SELECTOR = 'div[role="menuitemradio"]'
+NEWEST_SORT_OPTION = 1
+
+# Selectors tried in order for each place field
+PLACE_INFO_SELECTORS = {
+    "name": ['h1.DUwDvf', 'h1.fontHeadlineLarge', 'div.P5Bobd'],
+    "address": ['button[data-item-id="address"]', 'span.desktop-more-info-widget-place-address'],
+    "phone": ['button[data-item-id*="phone"]', 'span.QSFF4-text'],
+    "website": ['a[data-item-id*="authority"]', 'a[jsaction*="website"]'],
+    "rating": ['div.F7nice', 'span.ceNzKf', 'span.rW3L9c'],
+    "total_reviews": ['span.F7nice', 'span.r-i7DoTkIFmMnw', 'span.DkEaL'],
+    "categories": ['button.DkEaL'],
+}
+
+# Selectors tried in order for review cards and each review field
+REVIEW_ELEMENT_SELECTORS = [
+    'div[data-review-id]',
+    'div.jftiEf',
+    'div.gws-localreviews__google-review'
+]
+REVIEW_NAME_SELECTORS = [
+    'div.d4r55',
+    'div.TSUbDb',
+    'span.x3AX1-LfntMc-header-title-title',
+    'a.DHIhE',
+    'div.Tfgpc'
+]
+REVIEW_TEXT_SELECTORS = [
+    'span[class*="fontBodyMedium"]',
+    'span.wiI7pd',
+    'div.MyEned',
+    'span.review-full-text',
+    'div.Jtu6Td'
+]
+REVIEW_DATE_SELECTORS = [
+    'span.rsqaWe',
+    'span.dehysf',
+    'span.xRkPPb'
+]
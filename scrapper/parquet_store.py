@@ -0,0 +1,185 @@
+import argparse
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scraped_data import PLACE_CSV_COLUMNS, REVIEW_CSV_COLUMNS, csv_header
+from scraped_data.normalize import normalize_places, normalize_reviews, read_csv_files
+from scrapper.sinks import Sink, place_id, review_rows, write_atomic
+
+# Partition of rows without a prefecture or scrape date
+UNKNOWN_PARTITION = "unknown"
+
+# Typed columns of the two datasets; `prefecture` and `scrape_date` are the partition keys
+PLACE_SCHEMA = pa.schema([
+    ("place_id", pa.string()),
+    ("name", pa.string()),
+    ("address", pa.string()),
+    ("postal_code", pa.string()),
+    ("municipality", pa.string()),
+    ("phone", pa.string()),
+    ("website", pa.string()),
+    ("rating", pa.float32()),
+    ("total_reviews", pa.int32()),
+    ("categories", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("source_url", pa.string()),
+    ("scraped_at", pa.timestamp("s", tz="UTC")),
+    ("prefecture", pa.string()),
+    ("scrape_date", pa.string()),
+])
+REVIEW_SCHEMA = pa.schema([
+    ("place_id", pa.string()),
+    ("place_name", pa.string()),
+    ("latitude", pa.float64()),
+    ("longitude", pa.float64()),
+    ("reviewer", pa.string()),
+    ("rating", pa.int8()),
+    ("date", pa.string()),
+    ("reviewed_on", pa.date32()),
+    ("date_precision", pa.string()),
+    ("text", pa.string()),
+    ("scraped_at", pa.timestamp("s", tz="UTC")),
+    ("prefecture", pa.string()),
+    ("scrape_date", pa.string()),
+])
+PARTITION_COLUMNS = ["prefecture", "scrape_date"]
+PARTITIONING = ds.partitioning(pa.schema([("prefecture", pa.string()), ("scrape_date", pa.string())]),
+                               flavor="hive")
+
+
+def _place_ids(names, latitudes, longitudes, source_urls=None):
+    source_urls = [None] * len(names) if source_urls is None else source_urls
+    return [
+        place_id({"Name": name, "Latitude": latitude, "Longitude": longitude}, url)
+        for name, latitude, longitude, url in zip(names, latitudes, longitudes, source_urls)
+    ]
+
+
+def _partitioned(frame, schema):
+    frame["prefecture"] = frame["prefecture"].fillna(UNKNOWN_PARTITION)
+    frame["scrape_date"] = frame["scraped_at"].dt.strftime("%Y-%m-%d").fillna(UNKNOWN_PARTITION)
+    return frame[schema.names]
+
+
+def places_frame(frame, scraped_at=None, source_urls=None):
+    """
+    Typed place rows, conforming to `PLACE_SCHEMA`, from a frame with the CSV
+    place columns; `scraped_at` defaults to its `Scraped_At` column.
+    """
+    out = normalize_places(frame, scraped_at)
+    out["place_id"] = _place_ids(frame["Name"], frame["Latitude"], frame["Longitude"], source_urls)
+    out["source_url"] = source_urls
+    return _partitioned(out, PLACE_SCHEMA)
+
+
+def reviews_frame(frame, scraped_at=None):
+    """
+    Typed review rows, conforming to `REVIEW_SCHEMA`, from a frame with the
+    CSV review columns; `scraped_at` defaults to its `Scraped_At` column.
+    """
+    out = normalize_reviews(frame, scraped_at)
+    out["place_id"] = _place_ids(frame["Place_Name"], frame["Latitude"], frame["Longitude"])
+    return _partitioned(out, REVIEW_SCHEMA)
+
+
+def write_partitioned(frame, root, schema):
+    """
+    Append `frame` to the dataset at `root`, one new file per prefecture/scrape
+    date, each written to a temporary name and renamed into place.
+    """
+    if frame.empty:
+        return 0
+    file_schema = pa.schema([field for field in schema if field.name not in PARTITION_COLUMNS])
+    part_name = f"part-{uuid.uuid4().hex}.parquet"
+    for (prefecture, scrape_date), rows in frame.groupby(PARTITION_COLUMNS, sort=False):
+        table = pa.Table.from_pandas(rows.drop(columns=PARTITION_COLUMNS), schema=file_schema,
+                                     preserve_index=False)
+        partition_dir = os.path.join(root, f"prefecture={prefecture}", f"scrape_date={scrape_date}")
+        os.makedirs(partition_dir, exist_ok=True)
+        write_atomic(os.path.join(partition_dir, part_name), lambda f: pq.write_table(table, f), mode="wb")
+    return len(frame)
+
+
+def read_dataset(root, schema, filter=None, columns=None):
+    """Read a whole dataset (or the rows matching a `pyarrow.dataset` filter) into one DataFrame."""
+    dataset = ds.dataset(root, schema=schema, format="parquet", partitioning=PARTITIONING)
+    return dataset.to_table(filter=filter, columns=columns).to_pandas()
+
+
+def read_places(dataset_dir="dataset", filter=None, columns=None):
+    return read_dataset(os.path.join(dataset_dir, "places"), PLACE_SCHEMA, filter, columns)
+
+
+def read_reviews(dataset_dir="dataset", filter=None, columns=None):
+    return read_dataset(os.path.join(dataset_dir, "reviews"), REVIEW_SCHEMA, filter, columns)
+
+
+class ParquetSink(Sink):
+    """
+    Appends scraped places and reviews to the partitioned Parquet datasets
+    `<output_dir>/places` and `<output_dir>/reviews`, a few files per batch
+    rather than two per place.
+    """
+
+    def _write_batch(self, batch):
+        places = pd.DataFrame([place for _, place, _, _ in batch], columns=csv_header(PLACE_CSV_COLUMNS))
+        place_rows = places_frame(places, source_urls=[url for _, _, _, url in batch])
+        # Reviews are filed under their place's prefecture even when they carry no address
+        prefectures = dict(zip(place_rows["place_id"], place_rows["prefecture"]))
+
+        reviews = pd.DataFrame(
+            [row for _, place, place_reviews, _ in batch for row in review_rows(place, place_reviews)],
+            columns=csv_header(REVIEW_CSV_COLUMNS),
+        )
+        review_frame = reviews_frame(reviews)
+        review_frame["place_id"] = [key for key, _, place_reviews, _ in batch for _ in place_reviews]
+        review_frame["prefecture"] = review_frame["place_id"].map(prefectures)
+
+        write_partitioned(place_rows, os.path.join(self.output_dir, "places"), PLACE_SCHEMA)
+        write_partitioned(review_frame, os.path.join(self.output_dir, "reviews"), REVIEW_SCHEMA)
+
+
+def read_csv_tree(paths, columns):
+    """All rows of the CSVs in `paths` whose header is `columns`, with their `Scraped_At` (see `read_csv_files`)."""
+    files = []
+    for path in paths:
+        names = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+        files.extend(name for name in names if name.endswith(".csv"))
+    return read_csv_files(files, columns)
+
+
+def convert_csv_trees(paths, dataset_dir="dataset"):
+    """
+    One-shot conversion of per-place CSV trees (`outputs/`, `scrapped_locations/`)
+    into the Parquet datasets. Files are told apart by header. Rows of older
+    scrapes, without a `Scraped_At`, have no scrape time or review dates and are
+    filed under `scrape_date=unknown`. Returns the number of place and review rows written.
+    """
+    places = read_csv_tree(paths, PLACE_CSV_COLUMNS)
+    reviews = read_csv_tree(paths, REVIEW_CSV_COLUMNS)
+
+    place_rows = places_frame(places)
+    review_rows = reviews_frame(reviews)
+    place_count = write_partitioned(place_rows, os.path.join(dataset_dir, "places"), PLACE_SCHEMA)
+    review_count = write_partitioned(review_rows, os.path.join(dataset_dir, "reviews"), REVIEW_SCHEMA)
+    print(f"Wrote {place_count} places and {review_count} reviews to {dataset_dir}")
+    return place_count, review_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the per-place CSV files into partitioned Parquet datasets")
+    parser.add_argument("paths", nargs="*", default=["outputs", "scrapped_locations"],
+                        help="CSV files or directories of CSV files")
+    parser.add_argument("--dataset-dir", default="dataset")
+    args = parser.parse_args()
+    convert_csv_trees(args.paths, args.dataset_dir)
+
+
+if __name__ == "__main__":
+    main()
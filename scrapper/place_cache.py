@@ -0,0 +1,125 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from urllib.parse import unquote_plus, urlparse
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize_query(url):
+    """
+    Cache key of a Maps search URL: its query, NFKC-normalized, case-folded and
+    with punctuation and runs of spaces collapsed, so that "Tokyo Tower",
+    "tokyo+tower" and "ＴＯＫＹＯ　ＴＯＷＥＲ" are the same query.
+    """
+    path = urlparse(url).path
+    query = path.split("/maps/search/", 1)[1] if "/maps/search/" in path else url
+    query = unicodedata.normalize("NFKC", unquote_plus(query.strip("/"))).casefold()
+    return "query:" + _SEPARATORS.sub(" ", query).strip()
+
+
+class PlaceCache:
+    """
+    Results of recently scraped places, so duplicate queries are not scraped again.
+
+    Entries live in an in-memory LRU of `capacity` entries, backed by SQLite
+    so they survive between runs. Entries older than `ttl_hours` are ignored
+    (in memory and on disk) and the place is scraped again. Keys are
+    normalized queries (see `normalize_query`) or place IDs, values are
+    JSON-serialisable dicts. Safe to share between worker threads.
+    """
+
+    def __init__(self, path="scrape_places.db", capacity=1024, ttl_hours=12):
+        self.path = path
+        self.capacity = capacity
+        self.ttl = ttl_hours * 3600
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS place_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                cached_at REAL NOT NULL
+            )
+            """
+        )
+
+    def _remember(self, key, value, cached_at):
+        self._memory[key] = (value, cached_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        """The cached value for `key`, or None if it is missing or expired."""
+        oldest = time.time() - self.ttl
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] >= oldest:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+            row = self._conn.execute(
+                "SELECT value, cached_at FROM place_cache WHERE key = ? AND cached_at >= ?", (key, oldest)
+            ).fetchone()
+            if row is None:
+                self._memory.pop(key, None)
+                self.misses += 1
+                return None
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self.disk_hits += 1
+            return value
+
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO place_cache (key, value, cached_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now),
+            )
+
+    def purge_expired(self):
+        """Delete expired entries from disk; returns how many were deleted."""
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM place_cache WHERE cached_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "in_memory": len(self._memory),
+            }
+
+    def print_summary(self):
+        stats = self.stats()
+        print(
+            f"Place cache: memory_hits={stats['memory_hits']} disk_hits={stats['disk_hits']} "
+            f"misses={stats['misses']} hit_rate={stats['hit_rate']:.1%} evictions={stats['evictions']}"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
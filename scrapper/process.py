@@ -1,7 +1,14 @@
+import argparse
 import csv
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
 
 def extract_data(html_content):
     """Extract Top 100 places data from HTML content"""
@@ -63,7 +70,95 @@ def extract_data(html_content):
     
     return prefecture, results
 
-def save_to_csv(prefecture, data, output_dir="output"):
+def _text(element):
+    """Equivalent of BeautifulSoup's `.text` for an lxml element."""
+    return element.text_content()
+
+def _extract_data_lxml(html_content):
+    """`extract_data` on an lxml tree, using XPath instead of repeated tree walks"""
+    root = lxml.html.fromstring(html_content)
+    results = {}
+    
+    for fieldset in root.iter('fieldset'):
+        legend = fieldset.find('.//legend')
+        if legend is None:
+            continue
+        category_spans = legend.xpath("(.//span[contains(@style, 'color:#22AA22')])[1]")
+        if not category_spans:
+            continue
+        category_name = _text(category_spans[0]).strip()
+        
+        count_match = re.search(r'\((\d+)\)', _text(legend))
+        count = int(count_match.group(1)) if count_match else 0
+        
+        places = []
+        for row in fieldset.iter('tr'):
+            cells = row.findall('.//td')
+            if len(cells) >= 1:
+                place_name = _text(cells[0]).strip()
+                if ',' in place_name:
+                    places.extend((item.strip(), "") for item in place_name.split(','))
+                else:
+                    location = _text(cells[1]).strip() if len(cells) > 1 else ""
+                    places.append((place_name, location))
+        
+        results[category_name] = {'count': count, 'places': places}
+    
+    prefecture = ""
+    title_tag = root.find('.//title')
+    if title_tag is not None:
+        match = re.search(r"(\w+)'s best 100", _text(title_tag).strip())
+        if match:
+            prefecture = match.group(1)
+    
+    return prefecture, results
+
+def _extract_data_strained(html_content):
+    """`extract_data` parsing only the <fieldset> and <title> tags"""
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=SoupStrainer(['fieldset', 'title']))
+    results = {}
+    
+    for fieldset in soup.find_all('fieldset'):
+        legend = fieldset.find('legend')
+        if not legend:
+            continue
+        category_span = legend.select_one('span[style*="color:#22AA22"]')
+        if not category_span:
+            continue
+        category_name = category_span.text.strip()
+        
+        count_match = re.search(r'\((\d+)\)', legend.text)
+        count = int(count_match.group(1)) if count_match else 0
+        
+        places = []
+        for row in fieldset.find_all('tr'):
+            cells = row.find_all('td')
+            if len(cells) >= 1:
+                place_name = cells[0].text.strip()
+                if ',' in place_name:
+                    places.extend((item.strip(), "") for item in place_name.split(','))
+                else:
+                    location = cells[1].text.strip() if len(cells) > 1 else ""
+                    places.append((place_name, location))
+        
+        results[category_name] = {'count': count, 'places': places}
+    
+    prefecture = ""
+    title_tag = soup.find('title')
+    if title_tag:
+        match = re.search(r"(\w+)'s best 100", title_tag.text.strip())
+        if match:
+            prefecture = match.group(1)
+    
+    return prefecture, results
+
+def extract_data_fast(html_content):
+    """Faster `extract_data` with the same output: lxml when installed, otherwise a strained BeautifulSoup parse"""
+    if lxml is not None:
+        return _extract_data_lxml(html_content)
+    return _extract_data_strained(html_content)
+
+def save_to_csv(prefecture, data, output_dir="output", quiet=False):
     """Save the extracted data to CSV file"""
     # Create output directory if it doesn't exist
     if not os.path.exists(output_dir):
@@ -88,7 +183,8 @@ def save_to_csv(prefecture, data, output_dir="output"):
                     'Location': location
                 })
     
-    print(f"Data saved to {filename}")
+    if not quiet:
+        print(f"Data saved to {filename}")
 
 def print_results(prefecture, data):
     """Print the extracted data in a readable format"""
@@ -102,34 +198,71 @@ def print_results(prefecture, data):
             else:
                 print(f"  - {place}")
 
-def process_html_file(filepath, output_dir="output"):
+def process_html_file(filepath, output_dir="output", quiet=False, fast=True):
     """Process a single HTML file"""
+    prefecture, data = _extract_file(filepath, fast)
+    if not quiet:
+        print_results(prefecture, data)
+    save_to_csv(prefecture, data, output_dir, quiet)
+
+def _extract_file(filepath, fast=True):
     with open(filepath, 'r', encoding='utf-8') as file:
         html_content = file.read()
     
-    prefecture, data = extract_data(html_content)
-    print_results(prefecture, data)
-    save_to_csv(prefecture, data, output_dir)
+    return (extract_data_fast if fast else extract_data)(html_content)
 
-def process_directory(directory_path, output_dir="output"):
-    """Process all HTML files in a directory"""
-    html_files = [f for f in os.listdir(directory_path) if f.endswith('.html')]
+def _process_file_worker(args):
+    filepath, output_dir, fast = args
+    prefecture, data = _extract_file(filepath, fast)
+    save_to_csv(prefecture, data, output_dir, quiet=True)
+    return filepath, prefecture, data
+
+def process_directory(directory_path, output_dir="output", workers=None, quiet=False, fast=True):
+    """
+    Process all HTML files in a directory
+
+    Files are parsed in a pool of `workers` processes (default: one per CPU,
+    1 to stay in this process). With `quiet` the extracted places are not printed.
+    """
+    html_files = sorted(f for f in os.listdir(directory_path) if f.endswith('.html'))
+    filepaths = [os.path.join(directory_path, html_file) for html_file in html_files]
     
-    for html_file in html_files:
-        filepath = os.path.join(directory_path, html_file)
-        print(f"Processing {filepath}...")
-        process_html_file(filepath, output_dir)
+    if workers == 1 or len(filepaths) <= 1:
+        for filepath in filepaths:
+            if not quiet:
+                print(f"Processing {filepath}...")
+            process_html_file(filepath, output_dir, quiet, fast)
+        return
+    
+    # Create the output directory once, before the workers race to do it
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(filepath, output_dir, fast) for filepath in filepaths]
+    chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for filepath, prefecture, data in executor.map(_process_file_worker, jobs, chunksize=chunksize):
+            if not quiet:
+                print(f"Processing {filepath}...")
+                print_results(prefecture, data)
 
 def main():
+    parser = argparse.ArgumentParser(description="Extract the top 100 places from the downloaded prefecture pages")
+    parser.add_argument("input_path", nargs="?", default="./raw_html/", help="HTML file or directory")
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per CPU)")
+    parser.add_argument("--quiet", action="store_true", help="do not print the extracted places")
+    parser.add_argument("--slow", action="store_true", help="use the original full html.parser extraction")
+    args = parser.parse_args()
+
     # Set input directory or file
-    input_path = "./raw_html/"  # Current directory, change as needed
-    output_dir = "output"
+    input_path = args.input_path
+    output_dir = args.output_dir
+    fast = not args.slow
     
     # Check if input_path is a directory or file
     if os.path.isdir(input_path):
-        process_directory(input_path, output_dir)
+        process_directory(input_path, output_dir, args.workers, args.quiet, fast)
     elif os.path.isfile(input_path) and input_path.endswith('.html'):
-        process_html_file(input_path, output_dir)
+        process_html_file(input_path, output_dir, args.quiet, fast)
     else:
         print("Please provide a valid HTML file or directory containing HTML files")
         
@@ -141,7 +274,7 @@ def main():
                 print(f"- {file}")
             file_to_process = html_files[0]  # Process the first file
             print(f"\nProcessing {file_to_process}...")
-            process_html_file(file_to_process, output_dir)
+            process_html_file(file_to_process, output_dir, args.quiet, fast)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
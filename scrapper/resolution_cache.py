@@ -0,0 +1,93 @@
+import re
+import sqlite3
+import threading
+import time
+
+# Feature ID ("0x6018...:0x1a2b...") and place ID ("ChIJ...") in the data part of a place URL
+FEATURE_ID_PATTERN = re.compile(r'!1s(0x[0-9a-f]+:0x[0-9a-f]+)')
+PLACE_ID_PATTERN = re.compile(r'!19s(ChIJ[\w-]+)')
+
+
+def place_ref(place_url):
+    """Google's ID of the place in a `/maps/place/` URL (place ID or feature ID), or None."""
+    match = PLACE_ID_PATTERN.search(place_url) or FEATURE_ID_PATTERN.search(place_url)
+    return match.group(1) if match else None
+
+
+def canonical_place_url(url):
+    """The place URL without its query string (`?entry=ttu` and the like)."""
+    return url.split("?", 1)[0]
+
+
+class ResolutionCache:
+    """
+    Maps search URLs resolved to the place page they led to, kept in SQLite.
+
+    `scrap_page` stores the place URL, place ID and coordinates after clicking
+    the first search result; later runs navigate to the place page directly.
+    Entries older than `max_age_days` are resolved again.
+    """
+
+    def __init__(self, path="scrape_resolution.db", max_age_days=90):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS resolution (
+                query_url TEXT PRIMARY KEY,
+                place_url TEXT NOT NULL,
+                place_ref TEXT,
+                latitude TEXT,
+                longitude TEXT,
+                resolved_at REAL NOT NULL
+            )
+            """
+        )
+
+    def lookup(self, query_url):
+        """The cached resolution of a search URL as a dict, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT place_url, place_ref, latitude, longitude FROM resolution "
+                "WHERE query_url = ? AND resolved_at >= ?",
+                (query_url, time.time() - self.max_age),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return {"place_url": row[0], "place_ref": row[1], "latitude": row[2], "longitude": row[3]}
+
+    def store(self, query_url, place_url, coordinates=None):
+        """Record that `query_url` resolved to `place_url`; ignored unless it is a place page."""
+        if "/maps/place/" not in place_url:
+            return False
+        coordinates = coordinates or {}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resolution "
+                "(query_url, place_url, place_ref, latitude, longitude, resolved_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (query_url, canonical_place_url(place_url), place_ref(place_url),
+                 coordinates.get("latitude"), coordinates.get("longitude"), time.time()),
+            )
+        return True
+
+    def invalidate(self, query_url):
+        """Forget a resolution whose place page no longer loads."""
+        with self._lock:
+            self._conn.execute("DELETE FROM resolution WHERE query_url = ?", (query_url,))
+
+    def print_summary(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM resolution").fetchone()[0]
+        print(f"Place URL cache: hits={self.hits} misses={self.misses} entries={entries}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,110 @@
+import argparse
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+from scraped_data import REVIEW_CSV_COLUMNS, matches_header, review_key
+from scrapper.sinks import place_id
+
+
+class ReviewIndex:
+    """
+    Keys of the reviews already stored for every place, kept in SQLite.
+
+    Incremental runs use it to stop scrolling at the first known review and
+    to write only the reviews that are new.
+    """
+
+    def __init__(self, path="scrape_reviews.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen_review (
+                place_id TEXT NOT NULL,
+                review_key TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                PRIMARY KEY (place_id, review_key)
+            ) WITHOUT ROWID
+            """
+        )
+
+    def known(self, place_id):
+        """Set of the review keys stored for a place."""
+        with self._lock:
+            rows = self._conn.execute("SELECT review_key FROM seen_review WHERE place_id = ?", (place_id,))
+            return {row[0] for row in rows}
+
+    def add(self, place_id, keys):
+        """Record review keys for a place; returns how many were new."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            added = self._conn.executemany(
+                "INSERT OR IGNORE INTO seen_review (place_id, review_key, first_seen) VALUES (?, ?, ?)",
+                [(place_id, key, now) for key in keys],
+            ).rowcount
+            self._conn.execute("COMMIT")
+        return added
+
+    def counts(self):
+        """Number of places and reviews in the index."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(DISTINCT place_id), COUNT(*) FROM seen_review").fetchone()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def seed_from_csv(index, paths):
+    """
+    Add the reviews of earlier full scrapes (review CSV files in `paths`) to the
+    index, so the first incremental run does not fetch them again.
+    """
+    added = 0
+    for path in paths:
+        files = [os.path.join(path, f) for f in sorted(os.listdir(path))] if os.path.isdir(path) else [path]
+        for file_path in files:
+            if not file_path.endswith(".csv"):
+                continue
+            with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not matches_header(header, REVIEW_CSV_COLUMNS):
+                    continue
+                keys = {}
+                for row in reader:
+                    if len(row) != len(header):
+                        continue
+                    review = dict(zip(header, row))
+                    place = {"Name": review["Place_Name"], "Latitude": review["Latitude"],
+                             "Longitude": review["Longitude"]}
+                    keys.setdefault(place_id(place), set()).add(review_key(review["Name"], review["Review"]))
+            for key, review_keys in keys.items():
+                added += index.add(key, review_keys)
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the review index from the CSV files of earlier scrapes")
+    parser.add_argument("paths", nargs="*", default=["outputs", "scrapped_locations"],
+                        help="CSV files or directories of CSV files")
+    parser.add_argument("--index", default="scrape_reviews.db")
+    args = parser.parse_args()
+    index = ReviewIndex(args.index)
+    try:
+        added = seed_from_csv(index, args.paths)
+        places, reviews = index.counts()
+        print(f"Added {added} reviews; the index holds {reviews} reviews of {places} places")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
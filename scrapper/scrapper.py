@@ -1,23 +1,16 @@
+import argparse
+import json
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
-from ..utils import Logger
-
-logger = Logger()
-
-
-def download_webpage(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an error for bad status codes (e.g., 404)
-        return response.text
-    except requests.exceptions.RequestException as e:
-        return f"Error fetching the page: {e}"
 
-# Example usage
-
-save_dir = "raw_html"
-os.makedirs(save_dir, exist_ok=True)
 
 japan_prefectures = [
     "Hokkaido",
@@ -32,14 +25,174 @@ japan_prefectures = [
 
 base_url = "https://j100s.com/en/{pref}.html"
 
+# Status codes worth retrying; anything else 4xx/5xx fails immediately
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Per-directory record of ETag/Last-Modified for conditional GETs
+CACHE_FILE = ".http_cache.json"
+
+
+class DownloadError(Exception):
+    """Raised when a page could not be downloaded after all retries."""
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least `min_interval` seconds apart."""
+
+    def __init__(self, min_interval=0.5):
+        self.min_interval = min_interval
+        self._next_allowed = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def make_session(pool_size=8):
+    """Return a `requests.Session` whose connection pool fits `pool_size` concurrent downloads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = "travel-info-scraper/0.1"
+    return session
+
+
+def download_webpage(session, url, validators=None, rate_limiter=None, retries=3, backoff=1.0, timeout=15):
+    """
+    Download `url`, sending `validators` ({"etag", "last_modified"}) as a conditional GET.
+
+    Returns `(html, validators)`, where `html` is None if the server answered
+    304 Not Modified. Retries connection errors and `RETRY_STATUSES` with
+    exponential backoff and raises `DownloadError` when they are exhausted.
+    """
+    headers = {}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
 
-for pref in tqdm(japan_prefectures):
-    url = base_url.replace("{pref}", pref)
+    for attempt in range(retries + 1):
+        if rate_limiter:
+            rate_limiter.wait(url)
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304:
+                return None, validators
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()  # Raise an error for bad status codes (e.g., 404)
+                if "charset" not in response.headers.get("Content-Type", "").lower():
+                    # requests would assume ISO-8859-1, detect the real encoding instead
+                    response.encoding = response.apparent_encoding
+                return response.text, {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+            error = f"HTTP {response.status_code}"
+        except requests.exceptions.HTTPError as e:
+            raise DownloadError(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+    raise DownloadError(f"giving up after {retries + 1} attempts: {error}")
+
+
+def _load_json(path, default):
     try:
-        html_content = download_webpage(url)
-    except Exception as e:
-        logger.error(f"download failed: {url}")
-        continue
-    with open(f"{save_dir}/{pref}.html", "w", encoding='utf-8') as f:
-        logger.info(f"writing {url} to {save_dir}/{pref}.html")
-        f.write(html_content)
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _write_atomic(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def download_prefectures(prefectures=None, url_template=base_url, save_dir="raw_html",
+                         max_workers=8, min_interval=0.5, retries=3, backoff=1.0, force=False):
+    """
+    Download the page of every prefecture into `save_dir/<pref>.html` concurrently.
+
+    Pages whose ETag/Last-Modified did not change since the last run are not
+    downloaded again (unless `force`). Failed pages are not written to
+    `save_dir`; they are recorded in `<save_dir>_failures.json` instead.
+    Returns a dict with the downloaded, unchanged and failed prefectures.
+    """
+    prefectures = prefectures or japan_prefectures
+    os.makedirs(save_dir, exist_ok=True)
+    cache_path = os.path.join(save_dir, CACHE_FILE)
+    cache = {} if force else _load_json(cache_path, {})
+    failures_path = f"{save_dir}_failures.json"
+
+    session = make_session(pool_size=max_workers)
+    rate_limiter = HostRateLimiter(min_interval)
+    result = {"downloaded": [], "unchanged": [], "failed": {}}
+
+    def fetch(pref):
+        url = url_template.replace("{pref}", pref)
+        page_path = os.path.join(save_dir, f"{pref}.html")
+        validators = cache.get(url) if os.path.exists(page_path) else None
+        html, new_validators = download_webpage(session, url, validators, rate_limiter, retries, backoff)
+        if html is not None:
+            _write_atomic(page_path, html)
+        return pref, url, html is not None, new_validators
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, pref): pref for pref in prefectures}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            pref = futures[future]
+            try:
+                _, url, changed, validators = future.result()
+            except Exception as e:
+                tqdm.write(f"download failed: {pref}: {e}")
+                result["failed"][pref] = str(e)
+                continue
+            if validators:
+                cache[url] = validators
+            result["downloaded" if changed else "unchanged"].append(pref)
+
+    session.close()
+    _write_atomic(cache_path, json.dumps(cache, indent=2))
+    if result["failed"]:
+        _write_atomic(failures_path, json.dumps(result["failed"], indent=2, ensure_ascii=False))
+    elif os.path.exists(failures_path):
+        os.remove(failures_path)
+
+    print(f"downloaded={len(result['downloaded'])} unchanged={len(result['unchanged'])} failed={len(result['failed'])}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the j100s top 100 page of every prefecture")
+    parser.add_argument("--base-url", default=base_url, help="URL template, {pref} is replaced by the prefecture")
+    parser.add_argument("--save-dir", default="raw_html")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent downloads")
+    parser.add_argument("--min-interval", type=float, default=0.5, help="seconds between requests to one host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--force", action="store_true", help="ignore ETag/Last-Modified and download everything")
+    args = parser.parse_args()
+    download_prefectures(
+        url_template=args.base_url,
+        save_dir=args.save_dir,
+        max_workers=args.workers,
+        min_interval=args.min_interval,
+        retries=args.retries,
+        force=args.force,
+    )
+
+
+if __name__ == "__main__":
+    main()
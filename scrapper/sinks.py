@@ -0,0 +1,225 @@
+import abc
+import csv
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from scraped_data import PLACE_CSV_COLUMNS, REVIEW_CSV_COLUMNS, SCRAPED_AT_COLUMN, csv_header
+
+SINK_KINDS = ["csv", "jsonl", "parquet"]
+
+
+def _coordinate(value):
+    try:
+        return f"{round(float(value), 5):.5f}"
+    except (TypeError, ValueError):
+        return ""
+
+
+def place_id(place, source_url=None):
+    """
+    Stable ID of a place record in the scraper's outputs: md5 of the stripped,
+    lower-cased name and the coordinates rounded to 5 decimals (~1 m). Places
+    without a name are keyed by the URL they were scraped from instead.
+
+    This is not the database's `Place.place_key`: the loader drops nameless
+    places and lower-cases names in SQL, so the two only agree for named
+    places with ASCII names. Do not join on one expecting the other.
+    """
+    name = (place.get("Name") or "").strip()
+    if name in ("", "Unknown"):
+        name = source_url or ""
+    key = f"{name.lower()}|{_coordinate(place.get('Latitude'))}|{_coordinate(place.get('Longitude'))}"
+    return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+
+def review_rows(place, reviews):
+    """Reviews with the place columns appended, as written to the review CSV files."""
+    place_columns = {
+        "Place_Name": place["Name"],
+        "Address": place["Address"],
+        "Phone": place["Phone"],
+        "Website": place["Website"],
+        "Place_Rating": place["Rating"],
+        "Total_Reviews": place["Total_Reviews"],
+        "Categories": place["Categories"],
+        "Latitude": place["Latitude"],
+        "Longitude": place["Longitude"],
+        SCRAPED_AT_COLUMN: place.get(SCRAPED_AT_COLUMN),
+    }
+    return [dict(review, **place_columns) for review in reviews]
+
+
+def write_atomic(path, write, mode="w", **open_kwargs):
+    """Call `write(file)` on a temporary file next to `path`, then rename it over `path`."""
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp_path, mode, **open_kwargs) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class Sink(abc.ABC):
+    """
+    Destination of scraped places and their reviews.
+
+    `write()` buffers records; every `flush_every` places the batch is handed to
+    `_write_batch()`, which subclasses implement. A place counts as stored only
+    once it is written: the `on_written` callback given with it runs then, and
+    if writing fails what is not written yet stays buffered for the next flush.
+    Safe to share between worker threads. Use as a context manager, or call
+    `close()`, to write what is left.
+    """
+
+    def __init__(self, output_dir, flush_every=20):
+        self.output_dir = output_dir
+        self.flush_every = flush_every
+        self.places_written = 0
+        self.reviews_written = 0
+        self._batch = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, place, reviews, source_url=None, on_written=None):
+        """
+        Buffer one place (a dict with `PLACE_CSV_COLUMNS`) and its reviews (dicts
+        with Name, Rating, Date and Review); `on_written()` is called once they
+        are written. The place is stamped with the time as `Scraped_At` unless
+        it has one. Returns the place ID. An error raised is the flush's: the
+        place is buffered by then and written by a later flush.
+        """
+        key = place_id(place, source_url)
+        if not place.get(SCRAPED_AT_COLUMN):
+            # Stamped now rather than when the batch is written, which may be much later
+            place = dict(place, **{SCRAPED_AT_COLUMN: time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())})
+        with self._lock:
+            self._batch.append((key, place, list(reviews), source_url))
+            self._callbacks.append(on_written)
+            if len(self._batch) >= self.flush_every:
+                self._flush_locked()
+        return key
+
+    def _flush_locked(self):
+        if not self._batch:
+            return
+        self._write_batch(list(self._batch))
+        # Only drop entries once they are written, so a failed write is retried by the next flush
+        self._written(len(self._batch))
+
+    def _written(self, count):
+        """
+        Drop the first `count` buffered places, now written, and run their callbacks.
+        Sinks writing a batch place by place call this as they go, so a failure
+        later in the batch does not write the earlier places again on retry.
+        """
+        batch, callbacks = self._batch[:count], self._callbacks[:count]
+        del self._batch[:count], self._callbacks[:count]
+        self.places_written += len(batch)
+        self.reviews_written += sum(len(reviews) for _, _, reviews, _ in batch)
+        for callback in callbacks:
+            if callback is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error after writing a place: {e}")
+
+    @abc.abstractmethod
+    def _write_batch(self, batch):
+        """Write `[(place_id, place, reviews, source_url), ...]`, the oldest buffered places first."""
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvSink(Sink):
+    """
+    Writes `<place_id>_place.csv` and `<place_id>_reviews.csv` per place, with
+    the same columns as the CSV files of earlier scrapes plus `Scraped_At`.
+    The place file is replaced on every visit; new reviews are appended to the
+    reviews file.
+    """
+
+    def _write_batch(self, batch):
+        for key, place, reviews, _ in batch:
+            write_atomic(os.path.join(self.output_dir, f"{key}_place.csv"),
+                         lambda f: self._write_csv(f, PLACE_CSV_COLUMNS, [place]),
+                         newline="", encoding="utf-8-sig")
+            reviews_path = os.path.join(self.output_dir, f"{key}_reviews.csv")
+            if reviews or not os.path.exists(reviews_path):
+                write_atomic(reviews_path,
+                             lambda f: self._write_csv(f, REVIEW_CSV_COLUMNS, review_rows(place, reviews),
+                                                       reviews_path),
+                             newline="", encoding="utf-8-sig")
+            # Reviews are appended, so a place must not be written twice
+            self._written(1)
+
+    @staticmethod
+    def _write_csv(f, columns, rows, existing_path=None):
+        writer = csv.DictWriter(f, fieldnames=csv_header(columns), extrasaction="ignore")
+        if existing_path and os.path.exists(existing_path):
+            # Copy what is already there (header included) so the rename appends atomically
+            with open(existing_path, "r", encoding="utf-8-sig", newline="") as existing:
+                if next(csv.reader([existing.readline()]), None) == writer.fieldnames:
+                    existing.seek(0)
+                    shutil.copyfileobj(existing, f)
+                else:
+                    # A file of an older scrape: its rows get an empty Scraped_At
+                    writer.writeheader()
+                    csv.writer(f).writerows(row + [""] for row in csv.reader(existing))
+        else:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+class JsonlSink(Sink):
+    """
+    Writes every batch as new `places-*.jsonl` and `reviews-*.jsonl` files, one
+    JSON record per line, each carrying its `place_id` and `Scraped_At`.
+    """
+
+    def _write_batch(self, batch):
+        batch_name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        places = [dict(place, place_id=key, source_url=url) for key, place, _, url in batch]
+        reviews = [dict(review, place_id=key, **{SCRAPED_AT_COLUMN: place[SCRAPED_AT_COLUMN]})
+                   for key, place, place_reviews, _ in batch for review in place_reviews]
+        write_atomic(os.path.join(self.output_dir, f"places-{batch_name}.jsonl"),
+                     lambda f: self._write_lines(f, places), encoding="utf-8")
+        write_atomic(os.path.join(self.output_dir, f"reviews-{batch_name}.jsonl"),
+                     lambda f: self._write_lines(f, reviews), encoding="utf-8")
+
+    @staticmethod
+    def _write_lines(f, records):
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+
+
+def make_sink(kind="csv", output_dir=None, flush_every=20):
+    """Return a sink of `kind` ("csv", "jsonl" or "parquet") writing to `output_dir`."""
+    if kind == "csv":
+        return CsvSink(output_dir or "outputs", flush_every)
+    if kind == "jsonl":
+        return JsonlSink(output_dir or "outputs", flush_every)
+    if kind == "parquet":
+        # pyarrow is only needed for this sink
+        from scrapper.parquet_store import ParquetSink
+        return ParquetSink(output_dir or "dataset", flush_every)
+    raise ValueError(f"unknown sink {kind!r}, expected one of {', '.join(SINK_KINDS)}")
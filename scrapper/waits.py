@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import defaultdict, deque
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+
+from scrapper.metrics import metrics
+
+
+class WaitStats:
+    """Thread-safe record of how long each named wait step took."""
+
+    def __init__(self, history=50):
+        self._lock = threading.Lock()
+        self._recent = defaultdict(lambda: deque(maxlen=history))
+        self._totals = defaultdict(lambda: {"count": 0, "seconds": 0.0, "timeouts": 0})
+
+    def record(self, step: str, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if not timed_out:
+                self._recent[step].append(seconds)
+            total = self._totals[step]
+            total["count"] += 1
+            total["seconds"] += seconds
+            total["timeouts"] += int(timed_out)
+
+    def percentile(self, step: str, pct: float):
+        """Return the `pct` percentile of recent successful waits for `step`, or None."""
+        with self._lock:
+            samples = sorted(self._recent.get(step, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def adaptive_timeout(self, step: str, default: float, min_timeout: float = 1.0, min_samples: int = 5):
+        """
+        Timeout for the next wait on `step`: twice the observed p95 plus a second,
+        clamped to `[min_timeout, default]`. Uses `default` until enough samples exist.
+        """
+        with self._lock:
+            enough = len(self._recent.get(step, ())) >= min_samples
+        if not enough:
+            return default
+        return max(min_timeout, min(default, 2 * self.percentile(step, 95) + 1.0))
+
+    def summary(self):
+        with self._lock:
+            return {step: dict(total) for step, total in self._totals.items()}
+
+    def print_summary(self):
+        """Print where the wait time went, slowest step first."""
+        totals = self.summary()
+        if not totals:
+            return
+        print("Wait time by step:")
+        for step, total in sorted(totals.items(), key=lambda item: -item[1]["seconds"]):
+            mean = total["seconds"] / total["count"] if total["count"] else 0.0
+            p95 = self.percentile(step, 95)
+            p95_text = f"{p95:.2f}s" if p95 is not None else "n/a"
+            print(
+                f"  {step}: total={total['seconds']:.1f}s count={total['count']} "
+                f"mean={mean:.2f}s p95={p95_text} timeouts={total['timeouts']}"
+            )
+
+
+class ScrollStats:
+    """Thread-safe record of the review target and the reviews actually loaded for every place."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._places = []
+
+    def record(self, target, loaded: int, scrolls: int, stopped: str):
+        with self._lock:
+            self._places.append({"target": target, "loaded": loaded, "scrolls": scrolls, "stopped": stopped})
+
+    def summary(self):
+        with self._lock:
+            places = list(self._places)
+        if not places:
+            return {}
+        stopped = defaultdict(int)
+        for place in places:
+            stopped[place["stopped"]] += 1
+        targets = [place["target"] for place in places if place["target"] is not None]
+        return {
+            "places": len(places),
+            "target_reviews": sum(targets),
+            "loaded_reviews": sum(place["loaded"] for place in places),
+            "scrolls": sum(place["scrolls"] for place in places),
+            "stopped": dict(stopped),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print(
+            f"Review scrolling: places={summary['places']} scrolls={summary['scrolls']} "
+            f"loaded={summary['loaded_reviews']} target={summary['target_reviews']} "
+            f"stopped={summary['stopped']}"
+        )
+
+
+wait_stats = WaitStats()
+scroll_stats = ScrollStats()
+
+
+def wait_for(driver, step: str, condition, timeout: float = 10, poll: float = 0.1):
+    """
+    Wait until `condition(driver)` is truthy and return its value, or None on timeout.
+
+    The timeout adapts to how long `step` has taken on previous pages and the
+    time spent is recorded in `wait_stats`.
+    """
+    limit = wait_stats.adaptive_timeout(step, timeout)
+    started = time.monotonic()
+    try:
+        result = WebDriverWait(
+            driver, limit, poll_frequency=poll, ignored_exceptions=(StaleElementReferenceException,)
+        ).until(condition)
+        wait_stats.record(step, time.monotonic() - started)
+        return result
+    except TimeoutException:
+        wait_stats.record(step, time.monotonic() - started, timed_out=True)
+        metrics.incr("wait_timeouts")
+        return None
+
+
+def any_element_present(selectors):
+    """Condition: the elements matching the first selector that matches anything."""
+    def _condition(driver):
+        for selector in selectors:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                return elements
+        return False
+    return _condition
+
+
+def element_count_above(selector: str, count: int):
+    """Condition: the number of elements matching `selector` once it exceeds `count`."""
+    def _condition(driver):
+        current = len(driver.find_elements(By.CSS_SELECTOR, selector))
+        return current if current > count else False
+    return _condition
+
+
+def script_returns_true(script: str):
+    """Condition: `script` evaluated in the page returns a truthy value."""
+    def _condition(driver):
+        return driver.execute_script(script)
+    return _condition
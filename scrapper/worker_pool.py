@@ -0,0 +1,190 @@
+import threading
+import time
+from functools import partial
+
+
+class WorkerStats:
+    """Counters collected by a single worker thread."""
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.pages = 0
+        self.scraped = 0
+        self.empty = 0
+        self.errors = 0
+        self.recycles = 0
+        self.busy_seconds = 0.0
+
+
+class ProgressReport:
+    """Thread-safe progress tracker shared by all workers."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def page_finished(self, worker_id: int, url: str, status: str, remaining: int):
+        with self._lock:
+            self.done += 1
+            elapsed = time.monotonic() - self.started_at
+            rate = self.done / elapsed * 60 if elapsed else 0.0
+            print(f"[worker {worker_id}] [{self.done} pages, {remaining} left] {status}: {url} ({rate:.1f} pages/min)")
+
+
+class PoolActivity:
+    """How many workers are scraping a page, with a condition signalled whenever one finishes."""
+
+    def __init__(self):
+        self.busy = 0
+        self.changed = threading.Condition()
+
+    def page_finished(self):
+        with self.changed:
+            self.busy -= 1
+            self.changed.notify_all()
+
+    def wake_all(self):
+        with self.changed:
+            self.changed.notify_all()
+
+
+def _next_url(frontier, stop, activity):
+    """
+    Claim the next URL. While there is none, wait for backed-off retries and
+    for the pages other workers are scraping, which may fail into a retry.
+    None means the run is over: nothing is pending, being scraped or awaiting retry.
+    """
+    with activity.changed:
+        while not stop.is_set():
+            url = frontier.claim()
+            if url is not None:
+                activity.busy += 1
+                return url
+            retry_in = frontier.next_retry_in()
+            if retry_in is None and not activity.busy:
+                return None
+            activity.changed.wait(5 if retry_in is None else min(retry_in, 5))
+    return None
+
+
+def _worker(worker_id, frontier, stop, activity, driver_factory, scrape, recycle_after, progress, stats):
+    """Claim URLs from the frontier until it is exhausted, recycling the driver every `recycle_after` pages."""
+    driver = None
+    pages_on_driver = 0
+    try:
+        while True:
+            url = _next_url(frontier, stop, activity)
+            if url is None:
+                break
+
+            if driver is not None and recycle_after and pages_on_driver >= recycle_after:
+                print(f"[worker {worker_id}] recycling driver after {pages_on_driver} pages")
+                _quit(worker_id, driver)
+                driver = None
+                stats.recycles += 1
+
+            started = time.monotonic()
+            try:
+                if driver is None:
+                    driver = driver_factory(worker_id)
+                    pages_on_driver = 0
+                # A scraped URL is done once its place is written, which a buffering sink may defer
+                reviews, _ = scrape(driver, url, on_written=partial(frontier.mark_done, url, "scraped"))
+                status = "scraped" if reviews is not None else "empty"
+                if status == "empty":
+                    frontier.mark_done(url, status)
+            except Exception as e:
+                print(f"[worker {worker_id}] scrape_page function errored {url}: {e}")
+                status = "error"
+                frontier.mark_failed(url, f"{type(e).__name__}: {e}")
+                # The browser may be wedged, start the next page with a fresh one
+                if driver is not None:
+                    _quit(worker_id, driver)
+                    driver = None
+                    stats.recycles += 1
+            finally:
+                activity.page_finished()
+                pages_on_driver += 1
+                stats.pages += 1
+                stats.busy_seconds += time.monotonic() - started
+
+            if status == "scraped":
+                stats.scraped += 1
+            elif status == "empty":
+                stats.empty += 1
+            else:
+                stats.errors += 1
+            progress.page_finished(worker_id, url, status, frontier.remaining())
+    finally:
+        if driver is not None:
+            _quit(worker_id, driver)
+
+
+def _quit(worker_id, driver):
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"[worker {worker_id}] error closing driver: {e}")
+
+
+def print_summary(all_stats, progress):
+    """Print a merged summary of all workers."""
+    elapsed = time.monotonic() - progress.started_at
+    pages = sum(s.pages for s in all_stats)
+    print("===================================================================================")
+    print(f"Processed {pages} pages for {progress.total} queued URLs with {len(all_stats)} workers in {elapsed:.1f}s")
+    for s in all_stats:
+        per_page = s.busy_seconds / s.pages if s.pages else 0.0
+        print(
+            f"  worker {s.worker_id}: pages={s.pages} scraped={s.scraped} empty={s.empty} "
+            f"errors={s.errors} recycles={s.recycles} avg={per_page:.1f}s/page"
+        )
+    print(
+        f"  total: scraped={sum(s.scraped for s in all_stats)} empty={sum(s.empty for s in all_stats)} "
+        f"errors={sum(s.errors for s in all_stats)} throughput={pages / elapsed * 60 if elapsed else 0.0:.1f} pages/min"
+    )
+
+
+def run_worker_pool(frontier, driver_factory, scrape, workers=4, recycle_after=50):
+    """
+    Scrape the URLs in `frontier` with `workers` independent drivers claiming from it.
+
+    `driver_factory(worker_id)` must return a new webdriver and `scrape(driver, url, on_written)`
+    must return a `(reviews, place)` tuple, `(None, None)` for a page without reviews, and raise
+    on failure; it calls `on_written()` once a scraped place is stored, which marks the URL
+    done. Workers without a URL to claim wait until no other worker is scraping and no retry
+    is pending before they exit. Each worker quits and recreates its driver after `recycle_after` pages (0 disables
+    recycling).
+    Returns the per-worker stats.
+    """
+    stop = threading.Event()
+    activity = PoolActivity()
+    progress = ProgressReport(total=frontier.remaining())
+    all_stats = [WorkerStats(i) for i in range(max(1, workers))]
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(s.worker_id, frontier, stop, activity, driver_factory, scrape, recycle_after, progress, s),
+            name=f"scrape-worker-{s.worker_id}",
+            daemon=True,
+        )
+        for s in all_stats
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        print("Interrupted, waiting for workers to finish their current page...")
+        stop.set()
+        activity.wake_all()
+        for thread in threads:
+            thread.join()
+
+    print_summary(all_stats, progress)
+    print(f"Frontier: {frontier.counts()}")
+    return all_stats
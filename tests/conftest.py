@@ -0,0 +1,42 @@
+import os
+import sys
+import uuid
+
+import psycopg2
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+# The scraper runs from the repository root and the app from app/ (see benchmarks/bench_csv.py)
+for path in (ROOT, os.path.join(ROOT, "app")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """
+    A new, empty database on the PostgreSQL server the app is configured for
+    (DB_HOST, DB_PORT, ...), dropped afterwards; the test is skipped without a server.
+    """
+    from travel_app.db_api import db_operations
+
+    try:
+        admin = psycopg2.connect(host=db_operations.DB_HOST, port=db_operations.DB_PORT, dbname="postgres",
+                                 user=db_operations.DB_USER, password=db_operations.DB_PASSWORD, connect_timeout=3)
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"no PostgreSQL server: {e}")
+    admin.autocommit = True
+    name = f"travel_test_{uuid.uuid4().hex[:8]}"
+    with admin.cursor() as cursor:
+        cursor.execute(f'CREATE DATABASE "{name}"')
+    db_operations.close_pool()
+    monkeypatch.setattr(db_operations, "DB_NAME", name)
+    try:
+        yield name
+    finally:
+        db_operations.close_pool()
+        with admin.cursor() as cursor:
+            cursor.execute(f'DROP DATABASE "{name}"')
+        admin.close()
@@ -0,0 +1,85 @@
+import pandas as pd
+
+from travel_app.processing.dedup import deduplicate, place_canonical, review_canonical
+from scraped_data.normalize import PLACE_COLUMNS, REVIEW_COLUMNS
+
+
+def _places(rows):
+    frame = pd.DataFrame(rows, columns=["name", "address", "latitude", "longitude", "total_reviews"])
+    for column in PLACE_COLUMNS:
+        if column not in frame:
+            frame[column] = None
+    return frame[PLACE_COLUMNS].astype({"name": "string", "address": "string", "latitude": "Float64",
+                                        "longitude": "Float64", "total_reviews": "Int32"})
+
+
+# Same name and address scraped twice, the second time with coordinates hundreds of km off
+FAR_APART = [
+    ("日本橋かに福 コレド室町店", "〒103-0022 東京都中央区日本橋室町２丁目２−１ コレド室町1 3F", 35.6851761, 139.773735,
+     39.0984243, 140.0750625),
+    ("田川文化センター", "〒826-0032 福岡県田川市平松町３−３６", 34.6595698, 135.3043211, 33.6340491, 125.928806),
+    ("白川郷", "〒501-5627 岐阜県大野郡白川村荻町", 35.97297, 138.3531734, 36.2577967, 134.4672327),
+]
+
+
+def test_places_far_apart_are_not_merged():
+    rows = []
+    for name, address, lat1, lon1, lat2, lon2 in FAR_APART:
+        rows += [(name, address, lat1, lon1, 100), (name, address, lat2, lon2, 100)]
+    canonical = place_canonical(_places(rows))
+    assert (canonical == canonical.index).all()
+
+
+def test_same_place_with_drifting_coordinates_is_merged():
+    places = _places([
+        ("白川郷", "〒501-5627 岐阜県大野郡白川村荻町", 36.2577967, 136.9063000, 37234),
+        ("白川郷", "〒501-5627 岐阜県大野郡白川村荻町", 36.2580000, 136.9070000, 100),
+        ("白川郷", "〒501-5627 岐阜県大野郡白川村荻町 ", 36.2578000, 136.9064000, 50),
+        ("白川郷", "〒501-5627 岐阜県大野郡白川村荻町", None, None, 10),
+    ])
+    assert place_canonical(places).tolist() == [0, 0, 0, 3]
+
+
+def test_chain_stores_are_not_merged():
+    places = _places([
+        ("スターバックス コーヒー 渋谷店", "東京都渋谷区道玄坂２丁目", 35.6580, 139.6980, 10),
+        ("スターバックス コーヒー 新宿店", "東京都新宿区新宿３丁目", 35.6910, 139.7040, 10),
+    ])
+    assert place_canonical(places).tolist() == [0, 1]
+
+
+def _reviews(rows):
+    frame = pd.DataFrame(rows, columns=["place_name", "reviewer", "text"])
+    frame["latitude"], frame["longitude"] = 35.0, 139.0
+    for column in REVIEW_COLUMNS:
+        if column not in frame:
+            frame[column] = None
+    return frame[REVIEW_COLUMNS].astype({"place_name": "string", "reviewer": "string", "text": "string",
+                                         "latitude": "Float64", "longitude": "Float64"})
+
+
+def test_review_canonical_keeps_the_longest_near_duplicate():
+    text = "紅葉の季節に訪れました。池に映る景色がとても綺麗で、また来たいと思います。"
+    reviews = _reviews([
+        ("庭園", "A", text[:-6] + " …"),
+        ("庭園", "A", text),
+        ("庭園", "A", text),
+        ("庭園", "B", text),  # another reviewer
+        ("別の庭園", "A", text),  # another place
+        ("庭園", "A", "駐車場が狭いです。"),
+    ])
+    assert review_canonical(reviews).tolist() == [1, 1, 1, 3, 4, 5]
+
+
+def test_deduplicate_rekeys_reviews_to_the_canonical_place():
+    places = _places([
+        ("千秋公園", "秋田県秋田市千秋公園１", 39.7222, 140.1237, 2898),
+        ("千秋公園", "秋田県秋田市千秋公園１", 39.7230, 140.1240, 10),
+    ])
+    reviews = _reviews([("千秋公園", "A", "桜が綺麗")])
+    reviews["latitude"], reviews["longitude"] = 39.7230, 140.1240
+    reviews = reviews.astype({"latitude": "Float64", "longitude": "Float64"})
+    places, reviews, mapping = deduplicate(places, reviews)
+    assert len(mapping) == 1
+    assert reviews[["latitude", "longitude"]].iloc[0].tolist() == [39.7222, 140.1237]
+    assert places["latitude"].tolist() == [39.7222, 39.7222]
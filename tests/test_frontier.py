@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from scrapper.frontier import DONE, FAILED, IN_FLIGHT, PENDING, Frontier
+
+URLS = ["https://maps/a", "https://maps/b", "https://maps/c"]
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = Frontier(str(tmp_path / "frontier.db"), max_attempts=2, backoff_base=60)
+    frontier.add_urls(URLS)
+    yield frontier
+    frontier.close()
+
+
+def test_claims_in_order_and_counts_states(frontier):
+    frontier.add_urls(["https://maps/a", "https://maps/d"])  # known URLs keep their place
+    assert frontier.claim() == "https://maps/a"
+    assert frontier.claim() == "https://maps/b"
+    frontier.mark_done("https://maps/a")
+    assert frontier.counts() == {DONE: 1, IN_FLIGHT: 1, PENDING: 2}
+    assert frontier.remaining() == 2
+    assert [frontier.claim(), frontier.claim(), frontier.claim()] == ["https://maps/c", "https://maps/d", None]
+
+
+def test_failed_url_waits_for_its_backoff(frontier, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    for url in URLS:
+        assert frontier.claim() == url
+    frontier.mark_failed("https://maps/b", "TimeoutException: no place panel")
+
+    assert frontier.claim() is None
+    assert frontier.next_retry_in() == pytest.approx(60)
+    assert frontier.failures() == [("https://maps/b", 1, "TimeoutException: no place panel")]
+
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    assert frontier.claim() == "https://maps/b"
+    frontier.mark_failed("https://maps/b", "TimeoutException")
+    # The second attempt was the last one: no retry left, and nothing remains to do
+    assert frontier.next_retry_in() is None
+    monkeypatch.setattr(time, "time", lambda: now + 10_000)
+    assert frontier.claim() is None
+    assert frontier.remaining() == 0
+    assert frontier.counts()[FAILED] == 1
+
+
+def test_backoff_doubles_per_attempt(tmp_path, monkeypatch):
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    frontier = Frontier(str(tmp_path / "frontier.db"), max_attempts=5, backoff_base=10)
+    frontier.add_urls(["https://maps/a"])
+    delays = []
+    for attempt in range(3):
+        assert frontier.claim() == "https://maps/a"
+        frontier.mark_failed("https://maps/a", "error")
+        delays.append(frontier.next_retry_in())
+        now += delays[-1]
+    assert delays == [10, 20, 40]
+    frontier.close()
+
+
+def test_in_flight_urls_are_recovered_when_reopened(tmp_path):
+    path = str(tmp_path / "frontier.db")
+    frontier = Frontier(path)
+    frontier.add_urls(URLS)
+    frontier.claim()
+    frontier.close()
+
+    frontier = Frontier(path)
+    assert frontier.counts() == {PENDING: 3}
+    assert frontier.claim() == "https://maps/a"
+    frontier.close()
+
+
+def test_requeue_done(frontier):
+    url = frontier.claim()
+    frontier.mark_done(url, "scraped")
+    assert frontier.requeue_done(older_than=3600) == 0
+    assert frontier.requeue_done() == 1
+    assert frontier.counts() == {PENDING: 3}
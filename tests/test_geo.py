@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from travel_app.processing.geo import GeoIndex, haversine_km
+
+# (IATA code, latitude, longitude) of a few airports, and one without coordinates
+AIRPORTS = [
+    ("HND", 35.5494, 139.7798),
+    ("NRT", 35.7769, 140.3929),
+    ("KIX", 34.4263, 135.2440),
+    ("ITM", 34.7833, 135.4381),
+    ("CTS", 42.7758, 141.6925),
+    ("XXX", None, None),
+]
+TOKYO_STATION = (35.6812, 139.7671)
+
+
+@pytest.fixture
+def airports():
+    return GeoIndex.from_rows(AIRPORTS)
+
+
+def test_haversine_km():
+    assert haversine_km(*TOKYO_STATION, *TOKYO_STATION) == 0
+    # Tokyo to Osaka is about 400 km
+    assert haversine_km(35.6812, 139.7671, 34.7025, 135.4959) == pytest.approx(403, abs=1)
+    assert haversine_km(0, 179.5, 0, -179.5) == pytest.approx(111.2, abs=0.1)
+
+
+def test_nearest_and_within(airports):
+    assert len(airports) == 5
+    ids, km = airports.nearest(*TOKYO_STATION, k=2)
+    assert ids.tolist() == ["HND", "NRT"]
+    assert km == pytest.approx([haversine_km(*TOKYO_STATION, lat, lon) for _, lat, lon in AIRPORTS[:2]])
+
+    ids, km = airports.within(*TOKYO_STATION, radius_km=60)
+    assert ids.tolist() == ["HND", "NRT"] and np.all(np.diff(km) >= 0)
+    assert airports.within(*TOKYO_STATION, radius_km=10)[0].tolist() == []
+    assert airports.nearest(*TOKYO_STATION, k=1, max_km=10)[0].tolist() == []
+
+
+def test_batches_match_single_queries(airports):
+    latitudes, longitudes = [35.6812, 34.7025, 43.0687], [139.7671, 135.4959, 141.3508]
+    ids, km = airports.nearest_batch(latitudes, longitudes, k=1)
+    assert ids[:, 0].tolist() == ["HND", "ITM", "CTS"]
+    ids, km = airports.nearest_batch(latitudes, longitudes, k=1, max_km=20)
+    assert ids[:, 0].tolist() == ["HND", "ITM", None] and np.isinf(km[2, 0])
+    assert airports.count_within_batch(latitudes, longitudes, radius_km=60).tolist() == [2, 2, 1]
+    assert [sorted(found) for found in airports.within_batch(latitudes, longitudes, radius_km=60)] == [
+        ["HND", "NRT"], ["ITM", "KIX"], ["CTS"]]
+
+
+def test_within_box_and_the_antimeridian():
+    index = GeoIndex([-40.0, -40.0, -40.0, 35.0], [175.0, -178.0, 0.0, 175.0], ids=["a", "b", "c", "d"])
+    assert index.within_box(south=-50, west=170, north=-30, east=-170).tolist() == ["a", "b"]
+    assert index.within_box(south=-50, west=-10, north=40, east=10).tolist() == ["c"]
+    # Across the antimeridian the nearest point is on the other side of it
+    assert index.nearest(-40.0, 179.0)[0].tolist() == ["b"]
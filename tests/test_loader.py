@@ -0,0 +1,42 @@
+import csv
+
+from scraped_data import PLACE_CSV_COLUMNS, REVIEW_CSV_COLUMNS, csv_header
+from travel_app.db_api.create_database import create_database
+from travel_app.db_api.db_operations import fetch_all
+from travel_app.db_api.loader import load_csv_files
+
+# The same park scraped twice, the second time with its coordinates drifted by ~100 m
+PLACE = ["千秋公園", "秋田県秋田市千秋公園１", "", "", "4.2", "2898", "公園", "39.7222", "140.1237"]
+DRIFTED = PLACE[:7] + ["39.7230", "140.1240"]
+
+
+def _write_csv(path, columns, rows):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(csv_header(columns))
+        writer.writerows(rows)
+
+
+def _scrape(directory, date, scraped_at, reviews):
+    _write_csv(directory / "a_place.csv", PLACE_CSV_COLUMNS, [PLACE + [scraped_at]])
+    _write_csv(directory / "b_place.csv", PLACE_CSV_COLUMNS, [DRIFTED + [scraped_at]])
+    _write_csv(directory / "b_reviews.csv", REVIEW_CSV_COLUMNS,
+               [[reviewer, "5", date, text] + DRIFTED + [scraped_at] for reviewer, text in reviews])
+
+
+def test_rescrape_with_newer_relative_dates_adds_no_duplicates(tmp_path, database):
+    create_database()
+    _scrape(tmp_path, "1 週間前", "2024-05-01T12:00:00Z", [("山田", "桜が綺麗"), ("佐藤", "広い")])
+    # One file per chunk: duplicate places are still collapsed across chunks
+    counts = load_csv_files([str(tmp_path)], chunk_files=1)
+    assert (counts["duplicate_places"], counts["places_upserted"], counts["reviews_inserted"]) == (1, 1, 2)
+
+    _scrape(tmp_path, "1 か月前", "2024-06-01T12:00:00Z", [("山田", "桜が綺麗"), ("佐藤", "広い"), ("鈴木", "寒い")])
+    assert load_csv_files([str(tmp_path)], chunk_files=1)["reviews_inserted"] == 1
+    rows = fetch_all("SELECT p.latitude, r.reviewer, r.review_date, r.reviewed_on::TEXT FROM Review r "
+                     "JOIN Place p ON p.ID = r.place_id ORDER BY r.ID")
+    assert [(float(latitude), reviewer, date, reviewed_on) for latitude, reviewer, date, reviewed_on in rows] == [
+        (39.7222, "山田", "1 週間前", "2024-04-24"),
+        (39.7222, "佐藤", "1 週間前", "2024-04-24"),
+        (39.7222, "鈴木", "1 か月前", "2024-05-02"),
+    ]
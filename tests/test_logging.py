@@ -0,0 +1,55 @@
+import io
+import json
+
+import pytest
+
+from travel_app.utils import logging as travel_logging
+
+
+@pytest.fixture
+def output():
+    stream = io.StringIO()
+    travel_logging.configure(json_output=True, stream=stream)
+    yield lambda: [json.loads(line) for line in _flushed(stream).splitlines()]
+    travel_logging.configure()
+
+
+def _flushed(stream):
+    travel_logging.shutdown()
+    return stream.getvalue()
+
+
+def test_arguments_are_merged_when_logged(output):
+    logger = travel_logging.Logger("Test")
+    rows = [1]
+    logger.info("rows %s", rows)
+    rows.append(2)
+    assert [entry["message"] for entry in output()] == ["rows [1]"]
+
+
+def test_configure_applies_to_existing_loggers(output):
+    # `logger` was created on import, before the fixture switched the output to JSON
+    travel_logging.logger.info("written as %s", "json")
+    entry, = output()
+    assert (entry["logger"], entry["message"]) == ("TravelApp", "written as json")
+
+
+def test_level_and_sampling(output):
+    logger = travel_logging.Logger("Test", level="INFO")
+    logger.debug("hidden")
+    for i in range(5):
+        logger.info("every other %d", i, sample_every=2)
+    entries = output()
+    assert [entry["message"] for entry in entries] == ["every other 0", "every other 2", "every other 4"]
+    assert entries[0]["sample_every"] == 2
+
+
+def test_exception_is_its_own_field(output):
+    logger = travel_logging.Logger("Test")
+    try:
+        raise ZeroDivisionError("division by zero")
+    except ZeroDivisionError:
+        logger.error("failed %d", 1, exc_info=True)
+    entry, = output()
+    assert entry["message"] == "failed 1"
+    assert "ZeroDivisionError" in entry["exception"]
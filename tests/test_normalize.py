@@ -0,0 +1,89 @@
+import csv
+
+import pandas as pd
+
+from scraped_data import PLACE_CSV_COLUMNS, REVIEW_CSV_COLUMNS, csv_header
+from scraped_data.normalize import (normalize_places, normalize_reviews, place_rating, postal_codes, prefectures,
+                                    read_csv_files, review_count, review_dates, review_rating)
+
+SCRAPED_AT = pd.Timestamp("2024-05-01 12:00", tz="UTC")
+
+
+def _strings(values):
+    return pd.Series(values, dtype="string")
+
+
+def test_relative_review_dates():
+    dates = _strings(["3 か月前", "Google\nより（1 年前）", "a month ago", "2 weeks ago", "5 日前", "N/A", None, "昨日"])
+    reviewed_on, precision = review_dates(dates, SCRAPED_AT)
+    assert [None if pd.isna(day) else day.strftime("%Y-%m-%d") for day in reviewed_on] == [
+        "2024-01-31", "2023-05-02", "2024-04-01", "2024-04-17", "2024-04-26", None, None, None]
+    assert precision.tolist() == ["month", "year", "month", "week", "day", pd.NA, pd.NA, pd.NA]
+
+
+def test_review_dates_per_row_scrape_time():
+    scraped_at = pd.Series(pd.to_datetime(["2024-05-01", "2024-06-01"], utc=True))
+    reviewed_on, _ = review_dates(_strings(["1 週間前", "1 週間前"]), scraped_at)
+    assert reviewed_on.dt.strftime("%Y-%m-%d").tolist() == ["2024-04-24", "2024-05-25"]
+
+
+def test_ratings_and_review_counts():
+    assert place_rating(_strings(["4.6\n(42,115)", "5.0", "Unknown", None])).tolist() == [4.6, 5.0, pd.NA, pd.NA]
+    assert review_rating(_strings(["5", "星 4 つ", "N/A", "0"])).tolist() == [5, 4, pd.NA, pd.NA]
+    # Total_Reviews often holds other text; the count in the rating is used then
+    counts = review_count(_strings(["1,234", "Unknown", "レストラン", None]),
+                          _strings(["4.6\n(42,115)", "4.0\n(12)", "3.1", "4.6\n(1,001)"]))
+    assert counts.tolist() == [1234, 12, pd.NA, 1001]
+
+
+def test_address_parts():
+    addresses = _strings(["\n〒102-0093 東京都千代田区平河町２丁目５−５", "1-1 Kinkakujicho, Kita Ward, Kyoto, 603-8361, Japan",
+                          "〒１０２－００９３ 東京都", None])
+    assert postal_codes(addresses).tolist() == ["102-0093", "603-8361", "102-0093", pd.NA]
+    assert prefectures(addresses).tolist() == ["tokyo", "kyoto", "tokyo", pd.NA]
+
+
+def test_normalize_places_and_reviews():
+    place = ["金閣寺", "\n〒603-8361 京都府京都市北区金閣寺町１", "\n075-461-0013", "Unknown", "4.5\n(52,311)", "Unknown",
+             "〒603-8361 京都府京都市北区金閣寺町１", "35.0393888", "135.7270497"]
+    places = normalize_places(pd.DataFrame([place], columns=PLACE_CSV_COLUMNS, dtype="string"), SCRAPED_AT)
+    row = places.iloc[0]
+    assert (row["address"], row["postal_code"], row["prefecture"], row["municipality"]) == (
+        "〒603-8361 京都府京都市北区金閣寺町１", "603-8361", "kyoto", "京都市")
+    assert (row["phone"], row["rating"], row["total_reviews"], row["latitude"]) == (
+        "075-461-0013", 4.5, 52311, 35.0393888)
+    # Placeholders and an address scraped as the category are dropped
+    assert pd.isna(row["website"]) and pd.isna(row["categories"])
+
+    # Review rows repeat the place columns, in the same order
+    review = ["山田 太郎", "5", "2 か月前", "綺麗でした。"] + place
+    reviews = normalize_reviews(pd.DataFrame([review], columns=REVIEW_CSV_COLUMNS, dtype="string"), SCRAPED_AT)
+    row = reviews.iloc[0]
+    assert (row["reviewer"], row["rating"], row["date_precision"], row["place_name"], row["place_rating"]) == (
+        "山田 太郎", 5, "month", "金閣寺", 4.5)
+    assert row["reviewed_on"].strftime("%Y-%m-%d") == "2024-03-01"
+
+
+def _write_csv(path, header, rows):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def test_review_dates_come_from_the_scrape_time_of_each_row(tmp_path):
+    place = ["金閣寺", "", "", "", "4.5", "", "", "35.0393888", "135.7270497"]
+    _write_csv(tmp_path / "new_reviews.csv", csv_header(REVIEW_CSV_COLUMNS), [
+        ["山田", "5", "1 週間前", "綺麗"] + place + ["2024-05-01T12:00:00Z"],
+        ["佐藤", "4", "1 週間前", "広い"] + place + ["2024-06-01T12:00:00Z"],
+    ])
+    # Files of older scrapes have no scrape time: their relative dates cannot be resolved
+    _write_csv(tmp_path / "old_reviews.csv", REVIEW_CSV_COLUMNS, [["鈴木", "3", "1 週間前", "普通"] + place])
+    _write_csv(tmp_path / "place.csv", csv_header(PLACE_CSV_COLUMNS), [place + ["2024-05-01T12:00:00Z"]])
+
+    frame = read_csv_files(sorted(tmp_path.iterdir()), REVIEW_CSV_COLUMNS)
+    reviews = normalize_reviews(frame)
+    assert reviews["reviewer"].tolist() == ["山田", "佐藤", "鈴木"]
+    assert [None if pd.isna(day) else day.strftime("%Y-%m-%d") for day in reviews["reviewed_on"]] == [
+        "2024-04-24", "2024-05-25", None]
+    assert reviews["scraped_at"].isna().tolist() == [False, False, True]
@@ -0,0 +1,71 @@
+import csv
+import gzip
+import os
+import shutil
+
+from bs4 import BeautifulSoup
+
+from conftest import FIXTURES
+from scrapper.offline_parser import (HTML_PARSER, extract_coordinates, parse_snapshot, parse_snapshot_dir,
+                                     read_snapshot, save_snapshot)
+
+SNAPSHOT = os.path.join(FIXTURES, "snapshots", "kinkakuji.html")
+
+PLACE = {
+    "Snapshot": "kinkakuji.html",
+    "Source_URL": "https://www.google.com/maps/search/%E9%87%91%E9%96%A3%E5%AF%BA",
+    "Name": "金閣寺",
+    "Address": "〒603-8361 京都府京都市北区金閣寺町１",
+    "Phone": "075-461-0013",
+    "Website": "https://www.shokoku-ji.jp/kinkakuji/",
+    # As the live scraper reads it: the score and the review count below it
+    "Rating": "4.5\n(52,311)",
+    "Total_Reviews": "Unknown",
+    "Categories": "仏教寺院",
+    "Latitude": "35.0393888",
+    "Longitude": "135.7270497",
+}
+
+REVIEWS = [
+    {"Name": "山田 太郎", "Rating": "5", "Date": "2 か月前",
+     "Review": "池に映る金色の舎利殿がとても綺麗でした。朝一番に行くと空いています。"},
+    {"Name": "Emily Clarke", "Rating": "4", "Date": "1 年前",
+     "Review": "Beautiful temple, but very crowded in the afternoon."},
+    {"Name": "佐藤 花子", "Rating": "3", "Date": "3 週間前", "Review": "人が多くて写真を撮るのが大変でした。"},
+]
+
+
+def test_parse_snapshot():
+    place, reviews = parse_snapshot(SNAPSHOT)
+    assert place == PLACE
+    assert reviews == [dict(review, Snapshot="kinkakuji.html") for review in REVIEWS]
+
+
+def test_coordinates_from_the_page_without_the_scraped_url():
+    html, _ = read_snapshot(SNAPSHOT)
+    soup = BeautifulSoup(html, HTML_PARSER)
+    assert extract_coordinates(soup, html) == {"latitude": "35.0393888", "longitude": "135.7270497"}
+
+
+def test_saved_snapshot_round_trips(tmp_path):
+    html, headers = read_snapshot(SNAPSHOT)
+    body = html.split("-->\n", 2)[2]
+    path = str(tmp_path / "place.html.gz")
+    save_snapshot(path, body, headers["source-url"], headers["scraped-url"])
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert f.read() == html
+    place, reviews = parse_snapshot(path)
+    assert {**place, "Snapshot": "kinkakuji.html"} == PLACE
+    assert len(reviews) == len(REVIEWS)
+
+
+def test_parse_snapshot_dir(tmp_path):
+    snapshots = tmp_path / "snapshots"
+    snapshots.mkdir()
+    shutil.copy(SNAPSHOT, snapshots)
+    (snapshots / "broken.html.gz").write_bytes(b"not gzip")
+    output_dir = tmp_path / "offline_outputs"
+
+    assert parse_snapshot_dir(str(snapshots), str(output_dir), workers=1) == (1, 3)
+    with open(output_dir / "reviews.csv", encoding="utf-8-sig", newline="") as f:
+        assert [row["Name"] for row in csv.DictReader(f)] == [review["Name"] for review in REVIEWS]
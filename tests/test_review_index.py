@@ -0,0 +1,41 @@
+import csv
+
+from scraped_data import REVIEW_CSV_COLUMNS, REVIEW_KEY_CHARS
+from scrapper.review_index import ReviewIndex, review_key, seed_from_csv
+from scrapper.sinks import place_id
+
+TEXT = "池に映る金色の舎利殿がとても綺麗でした。朝一番に行くと空いていて、ゆっくり写真を撮ることができました。"
+
+
+def test_review_key_survives_truncation_and_whitespace():
+    key = review_key("山田 太郎", TEXT)
+    # Maps cuts long reviews off with "…" until "More" is clicked
+    assert review_key("山田  太郎", TEXT[:REVIEW_KEY_CHARS + 5] + "…") == key
+    assert review_key(" 山田 太郎\n", "  " + TEXT + "\n") == key
+    assert review_key("山田 太郎", TEXT[:REVIEW_KEY_CHARS] + "...") == key
+
+
+def test_review_key_tells_reviewers_and_texts_apart():
+    key = review_key("山田 太郎", TEXT)
+    assert review_key("佐藤 花子", TEXT) != key
+    assert review_key("山田 太郎", "人が多かった。") != key
+    assert review_key(None, None) == review_key("", "")
+
+
+def test_seed_from_csv(tmp_path):
+    rows = [
+        ["山田 太郎", "5", "2 か月前", TEXT, "金閣寺", "京都府", "", "", "4.5", "", "", "35.0393888", "135.7270497"],
+        ["山田 太郎", "5", "3 か月前", TEXT, "金閣寺", "京都府", "", "", "4.5", "", "", "35.0393888", "135.7270497"],
+        ["佐藤 花子", "3", "1 年前", "人が多かった。", "金閣寺", "京都府", "", "", "4.5", "", "", "35.0393888",
+         "135.7270497"],
+    ]
+    with open(tmp_path / "kinkakuji_reviews.csv", "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(REVIEW_CSV_COLUMNS)
+        writer.writerows(rows)
+    index = ReviewIndex(str(tmp_path / "reviews.db"))
+    assert seed_from_csv(index, [str(tmp_path)]) == 2
+    key = place_id({"Name": "金閣寺", "Latitude": "35.0393888", "Longitude": "135.7270497"})
+    assert index.known(key) == {review_key("山田 太郎", TEXT), review_key("佐藤 花子", "人が多かった。")}
+    assert index.add(key, [review_key("山田 太郎", TEXT)]) == 0
+    index.close()
@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrapper import scrapper
+
+LAST_MODIFIED = "Wed, 01 May 2024 00:00:00 GMT"
+
+
+class PrefectureHandler(BaseHTTPRequestHandler):
+    """
+    Tokyo: 200 with an ETag, 304 when it is sent back. Osaka: 503 on the first
+    request, then 200 with Last-Modified and no charset. Kyoto: 404. Nara: always 503.
+    """
+
+    requests = Counter()
+    headers_seen = {}
+
+    def do_GET(self):
+        pref = self.path.strip("/").removesuffix(".html")
+        self.requests[pref] += 1
+        self.headers_seen[pref] = dict(self.headers)
+        if pref == "Tokyo":
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self._send(304)
+            return self._send(200, "<h1>東京</h1>", {"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+        if pref == "Osaka":
+            if self.requests[pref] == 1:
+                return self._send(503)
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self._send(304)
+            return self._send(200, "<h1>大阪の人気スポット</h1>", {"Last-Modified": LAST_MODIFIED, "Content-Type": "text/html"})
+        return self._send(503 if pref == "Nara" else 404)
+
+    def _send(self, status, body="", headers=None):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    PrefectureHandler.requests = Counter()
+    PrefectureHandler.headers_seen = {}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PrefectureHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/{{pref}}.html"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _download(url_template, save_dir, prefectures):
+    return scrapper.download_prefectures(prefectures, url_template, str(save_dir), max_workers=4,
+                                         min_interval=0, retries=2, backoff=0.01)
+
+
+def test_download_retries_revalidates_and_records_failures(server, tmp_path):
+    save_dir = tmp_path / "raw_html"
+    result = _download(server, save_dir, ["Tokyo", "Osaka", "Kyoto", "Nara"])
+
+    assert sorted(result["downloaded"]) == ["Osaka", "Tokyo"]
+    assert sorted(result["failed"]) == ["Kyoto", "Nara"]
+    # 503 is retried until it succeeds or the retries run out, 404 is not retried
+    assert PrefectureHandler.requests == {"Tokyo": 1, "Osaka": 2, "Kyoto": 1, "Nara": 3}
+    assert (save_dir / "Osaka.html").read_text(encoding="utf-8") == "<h1>大阪の人気スポット</h1>"
+    assert sorted(os.listdir(save_dir)) == [scrapper.CACHE_FILE, "Osaka.html", "Tokyo.html"]
+    failures = json.loads((tmp_path / "raw_html_failures.json").read_text(encoding="utf-8"))
+    assert sorted(failures) == ["Kyoto", "Nara"]
+
+    result = _download(server, save_dir, ["Tokyo", "Osaka"])
+    assert sorted(result["unchanged"]) == ["Osaka", "Tokyo"]
+    assert PrefectureHandler.headers_seen["Tokyo"]["If-None-Match"] == '"v1"'
+    assert PrefectureHandler.headers_seen["Osaka"]["If-Modified-Since"] == LAST_MODIFIED
+    assert (save_dir / "Tokyo.html").read_text(encoding="utf-8") == "<h1>東京</h1>"
+    assert not (tmp_path / "raw_html_failures.json").exists()
+
+
+def test_download_webpage_gives_up(server):
+    with pytest.raises(scrapper.DownloadError, match="3 attempts: HTTP 503"):
+        scrapper.download_webpage(scrapper.make_session(), server.replace("{pref}", "Nara"), retries=2, backoff=0.01)
+
+
+def test_base_url_option(server, tmp_path, monkeypatch):
+    save_dir = tmp_path / "raw_html"
+    monkeypatch.setattr(scrapper, "japan_prefectures", ["Tokyo"])
+    monkeypatch.setattr(sys, "argv", ["scrapper", "--base-url", server, "--save-dir", str(save_dir),
+                                      "--min-interval", "0"])
+    scrapper.main()
+    assert (save_dir / "Tokyo.html").read_text(encoding="utf-8") == "<h1>東京</h1>"
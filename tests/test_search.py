@@ -0,0 +1,68 @@
+import pytest
+
+from travel_app.search import ReviewSearchIndex, tokenize_document, to_match_query
+
+# (id, place_id, place_name, rating, reviewed_on, text)
+REVIEWS = [
+    (1, 10, "金閣寺", 5, "2024-03-01", "金閣寺は池に映る姿が綺麗でした。駐車場も広いです。"),
+    (2, 10, "金閣寺", 3, "2024-02-01", "人が多く、駐車場が狭いので電車で行くのがおすすめ。"),
+    (3, 20, "東京タワー", 4, "2023-12-01", "夜の東京タワーはライトアップがとても綺麗。展望台からの眺めも最高。"),
+    (4, 20, "東京タワー", 5, None, "Great view from the main deck, worth the wait"),
+    (5, 30, "道の駅 都農", 4, "2024-01-15", "駅から遠いが、駐車場は広い。広い広い広い駐車場。"),
+]
+
+
+def test_tokenize_document():
+    assert tokenize_document("東京タワー") == "東京 京タ タワ ワー ー"
+    # Full-width letters are folded, words outside Japanese script stay whole
+    assert tokenize_document("ＡＢＣホテル 2024年") == "ABC ホテ テル ル 2024 年"
+    assert tokenize_document("駅") == "駅"
+    assert tokenize_document(None) == ""
+
+
+def test_to_match_query():
+    assert to_match_query("駐車場 広い") == '"駐車 車場" AND "広い"'
+    assert to_match_query("駐車場 広い", any_term=True) == '"駐車 車場" OR "広い"'
+    assert to_match_query("駅") == '"駅" *'
+    assert to_match_query('Wi-Fi "free"') == '("Wi" AND "Fi") AND "free"'
+    assert to_match_query("  ！？ ") == ""
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = ReviewSearchIndex(str(tmp_path / "search.db"))
+    index.add(REVIEWS)
+    yield index
+    index.close()
+
+
+def _ids(hits):
+    return [hit["id"] for hit in hits]
+
+
+def test_substring_matches_and_bm25_ranking(index):
+    # Every term must appear; the review repeating them most ranks first
+    assert _ids(index.search("駐車場 広い")) == [5, 1]
+    assert _ids(index.search("駐車場 狭い", any_term=True))[0] == 2
+    assert sorted(_ids(index.search("綺麗"))) == [1, 3]
+    assert _ids(index.search("タワー")) == [3]
+    assert _ids(index.search("view")) == [4]
+    hits = index.search("駐車場")
+    assert [hit["score"] for hit in hits] == sorted(hit["score"] for hit in hits)
+
+
+def test_single_characters_match_anywhere(index):
+    assert _ids(index.search("駅")) == [5]
+    assert _ids(index.search("池")) == [1]
+
+
+def test_place_filter_limit_and_incremental_add(index):
+    assert sorted(_ids(index.search("駐車場", place_id=10))) == [1, 2]
+    assert len(index.search("駐車場", limit=1)) == 1
+    assert index.search("") == []
+    # Already indexed reviews are skipped
+    assert index.add(REVIEWS[:2] + [(6, 30, "道の駅 都農", 2, None, "駐車場が狭い")]) == 1
+    assert index.last_id() == 6
+    assert index.counts() == (3, 6)
+    hit = index.search("狭い", place_id=30)[0]
+    assert (hit["place_name"], hit["rating"], hit["reviewed_on"]) == ("道の駅 都農", 2, None)
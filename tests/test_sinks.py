@@ -0,0 +1,133 @@
+import csv
+import os
+import re
+
+import pytest
+
+from scraped_data import REVIEW_CSV_COLUMNS
+from scrapper.sinks import CsvSink, JsonlSink, place_id
+
+
+def _place(name, latitude="35.0", longitude="139.0"):
+    return {"Name": name, "Address": "東京都", "Phone": "", "Website": "", "Rating": "4.0",
+            "Total_Reviews": "10", "Categories": "", "Latitude": latitude, "Longitude": longitude}
+
+
+REVIEW = {"Name": "reviewer", "Rating": "5", "Date": "1 か月前", "Review": "良い"}
+
+
+class FlakySink(CsvSink):
+    """Fails the first `failures` writes."""
+
+    failures = 1
+
+    def _write_batch(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super()._write_batch(batch)
+
+
+def test_on_written_runs_only_after_the_batch_is_written(tmp_path):
+    written = []
+    with CsvSink(str(tmp_path), flush_every=2) as sink:
+        sink.write(_place("A"), [REVIEW], on_written=lambda: written.append("A"))
+        assert written == []
+        assert os.listdir(tmp_path) == []
+        sink.write(_place("B"), [REVIEW], on_written=lambda: written.append("B"))
+        assert written == ["A", "B"]
+    assert sink.places_written == 2
+    assert len(os.listdir(tmp_path)) == 4
+
+
+def test_failed_write_keeps_the_batch(tmp_path):
+    written = []
+    sink = FlakySink(str(tmp_path), flush_every=1)
+    with pytest.raises(OSError):
+        sink.write(_place("A"), [REVIEW], on_written=lambda: written.append("A"))
+    assert written == []
+    assert sink.places_written == 0
+
+    sink.close()
+    assert written == ["A"]
+    assert sink.places_written == 1
+    reviews = [name for name in os.listdir(tmp_path) if name.endswith("_reviews.csv")]
+    with open(tmp_path / reviews[0], encoding="utf-8-sig", newline="") as f:
+        assert [row["Review"] for row in csv.DictReader(f)] == ["良い"]
+
+
+def _reviews(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return [row["Review"] for row in csv.DictReader(f)]
+
+
+def test_failure_mid_batch_does_not_rewrite_the_written_places(tmp_path, monkeypatch):
+    written = []
+    sink = CsvSink(str(tmp_path), flush_every=2)
+    sink.write(_place("A"), [REVIEW], on_written=lambda: written.append("A"))
+
+    real_write_csv = CsvSink._write_csv
+
+    def failing_write_csv(f, columns, rows, existing_path=None):
+        if rows and rows[0].get("Name") == "B":
+            raise OSError("disk full")
+        real_write_csv(f, columns, rows, existing_path)
+
+    monkeypatch.setattr(CsvSink, "_write_csv", staticmethod(failing_write_csv))
+    with pytest.raises(OSError):
+        sink.write(_place("B"), [REVIEW], on_written=lambda: written.append("B"))
+    assert written == ["A"]
+    assert sink.places_written == 1
+
+    monkeypatch.setattr(CsvSink, "_write_csv", staticmethod(real_write_csv))
+    sink.close()
+    assert written == ["A", "B"]
+    assert sink.places_written == 2
+    assert _reviews(tmp_path / f"{place_id(_place('A'))}_reviews.csv") == ["良い"]
+    assert _reviews(tmp_path / f"{place_id(_place('B'))}_reviews.csv") == ["良い"]
+
+
+def test_rows_carry_their_scrape_time(tmp_path):
+    key = place_id(_place("A"))
+    # A reviews file of an older scrape, before rows carried their scrape time
+    with open(tmp_path / f"{key}_reviews.csv", "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(REVIEW_CSV_COLUMNS)
+        writer.writerow(["old", "4", "1 年前", "古い"] + [""] * 9)
+
+    with CsvSink(str(tmp_path), flush_every=1) as sink:
+        sink.write(dict(_place("A"), Scraped_At="2024-05-01T12:00:00Z"), [REVIEW])
+    with open(tmp_path / f"{key}_reviews.csv", encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [(row["Review"], row["Scraped_At"]) for row in rows] == [("古い", ""), ("良い", "2024-05-01T12:00:00Z")]
+
+    with CsvSink(str(tmp_path), flush_every=1) as sink:
+        sink.write(_place("A"), [])
+    with open(tmp_path / f"{key}_place.csv", encoding="utf-8-sig", newline="") as f:
+        assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\dZ", next(csv.DictReader(f))["Scraped_At"])
+
+
+def test_callback_error_does_not_skip_the_others(tmp_path):
+    written = []
+
+    def fail():
+        raise RuntimeError("index unavailable")
+
+    with JsonlSink(str(tmp_path), flush_every=2) as sink:
+        sink.write(_place("A"), [], on_written=fail)
+        sink.write(_place("B"), [], on_written=lambda: written.append("B"))
+    assert written == ["B"]
+
+
+def test_place_id_ignores_case_whitespace_and_coordinate_noise():
+    key = place_id(_place("Kinkaku-ji", "35.0393888", "139.7270497"))
+    assert len(key) == 32
+    assert place_id(_place(" KINKAKU-JI ", "35.039390", "139.727051")) == key
+    assert place_id(_place("Kinkaku-ji", "35.0394888", "139.7270497")) != key
+    assert place_id(_place("Ginkaku-ji", "35.0393888", "139.7270497")) != key
+
+
+def test_place_id_of_a_nameless_place_uses_its_url():
+    nameless = _place("Unknown", "", "")
+    assert place_id(nameless, "https://maps/a") == place_id(_place("https://maps/a", "", ""))
+    assert place_id(nameless, "https://maps/a") != place_id(nameless, "https://maps/b")
@@ -0,0 +1,54 @@
+import csv
+
+import pytest
+
+from scraped_data import PLACE_CSV_COLUMNS, csv_header
+from travel_app.db_api.create_database import create_database
+from travel_app.db_api.db_operations import fetch_all
+from travel_app.db_api.loader import load_csv_files
+from travel_app.db_api.spatial import (nearest_airport, nearest_places, places_within, refresh_place_nearest_airport,
+                                       spatial_enabled)
+
+KINKAKUJI = ["金閣寺", "京都府京都市北区金閣寺町１", "", "", "4.5", "52311", "寺院", "35.0394", "135.7292"]
+TOKYO_STATION = ["東京駅", "東京都千代田区丸の内１丁目", "", "", "4.2", "3000", "駅", "35.6812", "139.7671"]
+
+
+@pytest.fixture
+def spatial_database(database):
+    if not fetch_all("SELECT 1 FROM pg_available_extensions WHERE name = 'postgis'"):
+        pytest.skip("PostGIS is not installed on the database server")
+    create_database()
+    return database
+
+
+def _load(directory, places):
+    for i, place in enumerate(places):
+        with open(directory / f"{i}_place.csv", "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(csv_header(PLACE_CSV_COLUMNS))
+            writer.writerow(place + ["2024-05-01T12:00:00Z"])
+    return load_csv_files([str(directory)])
+
+
+def test_geography_columns_and_nearest_airports(tmp_path, spatial_database):
+    assert spatial_enabled()
+    indexes = {row[0] for row in fetch_all("SELECT indexname FROM pg_indexes WHERE indexdef LIKE '%USING gist%'")}
+    assert {"airport_geog_idx", "place_geog_idx"} <= indexes
+
+    # The loader refreshes the nearest airport of the places it inserts
+    assert _load(tmp_path, [KINKAKUJI, TOKYO_STATION])["nearest_airports_refreshed"] == 2
+    ids = dict((name, place_id) for place_id, name in fetch_all("SELECT ID, name FROM Place"))
+    _, _, prefix, distance_m = nearest_airport(ids["東京駅"])
+    assert prefix == "HND" and distance_m == pytest.approx(14_700, rel=0.02)
+    assert nearest_airport(ids["金閣寺"])[2] == "ITM"
+
+    # Only the places that changed are refreshed again, unless all of them are asked for
+    assert _load(tmp_path, [KINKAKUJI, TOKYO_STATION[:4] + ["4.3"] + TOKYO_STATION[5:]])[
+        "nearest_airports_refreshed"] == 1
+    assert refresh_place_nearest_airport() == 0
+    assert refresh_place_nearest_airport(full=True) == 2
+
+    assert [row[1] for row in nearest_places(35.0116, 135.7681, limit=2)] == ["金閣寺", "東京駅"]
+    hits = places_within(35.6812, 139.7671, radius_m=1000)
+    assert [(name, distance_m) for _, name, distance_m in hits] == [("東京駅", pytest.approx(0, abs=1))]
+    assert places_within(35.0116, 135.7681, radius_m=1000) == []
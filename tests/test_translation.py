@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from travel_app.translation import StubBackend, TranslationCache, TranslationError, Translator, content_key
+
+
+class FailingBackend(StubBackend):
+    """Fails every batch containing `bad`."""
+
+    def __init__(self, bad):
+        super().__init__()
+        self.bad = bad
+        self._lock = threading.Lock()
+
+    def translate(self, texts, source="auto", target="en"):
+        with self._lock:
+            if self.bad in texts:
+                raise TranslationError("HTTP 500")
+            return super().translate(texts, source, target)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = TranslationCache(str(tmp_path / "translations.db"))
+    yield cache
+    cache.close()
+
+
+def test_content_key_depends_on_the_language_pair():
+    assert content_key("東京", "ja", "en") == content_key("東京", "ja", "en")
+    assert content_key("東京", "ja", "en") != content_key("東京", "ja", "fr")
+    assert content_key("東京", "ja", "en") != content_key("東京", "auto", "en")
+
+
+def test_texts_are_deduplicated_and_sent_once(cache):
+    backend = StubBackend()
+    translator = Translator(backend, cache, max_workers=1)
+    assert translator.translate([" 東京 ", "大阪", "東京", "", None], "ja", "en") == [
+        "[en] 東京", "[en] 大阪", "[en] 東京", None, None]
+    assert backend.calls == [["東京", "大阪"]]
+
+    # A second run only pays for new text, and other language pairs are cached apart
+    assert translator.translate(["大阪", "京都"], "ja", "en") == ["[en] 大阪", "[en] 京都"]
+    assert translator.translate(["大阪"], "ja", "fr") == ["[fr] 大阪"]
+    assert backend.calls[1:] == [["京都"], ["大阪"]]
+    assert cache.count() == 4
+
+
+def test_batches_respect_size_and_characters(cache):
+    backend = StubBackend()
+    translator = Translator(backend, cache, batch_size=3, batch_chars=10, max_workers=2)
+    texts = ["a", "b", "c", "d", "0123456789", "e", "f"]
+    assert translator.translate(texts) == [f"[en] {text}" for text in texts]
+    assert sorted(backend.calls) == sorted([["a", "b", "c"], ["d"], ["0123456789"], ["e", "f"]])
+
+
+def test_failed_batch_is_left_for_the_next_run(cache):
+    translator = Translator(FailingBackend("bad"), cache, batch_size=2, max_workers=2)
+    assert translator.translate(["a", "b", "bad", "c"]) == ["[en] a", "[en] b", None, None]
+    assert cache.count() == 2
+
+    backend = StubBackend()
+    assert Translator(backend, cache).translate(["a", "b", "bad", "c"]) == ["[en] a", "[en] b", "[en] bad", "[en] c"]
+    assert backend.calls == [["bad", "c"]]
@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+from functools import partial
+
+from scrapper import map_scraping
+from scrapper.frontier import DONE, Frontier
+from scrapper.sinks import CsvSink
+from scrapper.worker_pool import PoolActivity, _next_url, run_worker_pool
+
+
+def _frontier(tmp_path, urls, **kwargs):
+    frontier = Frontier(str(tmp_path / "frontier.db"), **kwargs)
+    frontier.add_urls(urls)
+    return frontier
+
+
+def test_idle_worker_waits_for_a_page_in_flight(tmp_path):
+    frontier = _frontier(tmp_path, ["https://maps/a"], backoff_base=0)
+    stop, activity = threading.Event(), PoolActivity()
+    assert _next_url(frontier, stop, activity) == "https://maps/a"
+
+    claimed = []
+    idle = threading.Thread(target=lambda: claimed.append(_next_url(frontier, stop, activity)))
+    idle.start()
+    time.sleep(0.2)
+    assert idle.is_alive()
+
+    # The busy worker's page fails into a retry, which the idle worker picks up
+    frontier.mark_failed("https://maps/a", "TimeoutException")
+    activity.page_finished()
+    idle.join(timeout=2)
+    assert claimed == ["https://maps/a"]
+    frontier.close()
+
+
+def test_no_url_ends_the_run_once_nothing_is_in_flight(tmp_path):
+    frontier = _frontier(tmp_path, [])
+    assert _next_url(frontier, threading.Event(), PoolActivity()) is None
+    frontier.close()
+
+
+def test_pool_retries_a_failed_page_with_every_worker_staying(tmp_path):
+    urls = [f"https://maps/{i}" for i in range(4)]
+    frontier = _frontier(tmp_path, urls, backoff_base=0)
+    attempts = {}
+    lock = threading.Lock()
+
+    def scrape(driver, url, on_written):
+        with lock:
+            attempts[url] = attempts.get(url, 0) + 1
+            first = attempts[url] == 1
+        if url == urls[0] and first:
+            # The other workers run out of URLs meanwhile
+            time.sleep(0.3)
+            raise RuntimeError("page did not load")
+        on_written()
+        return [{"Review": "ok"}], {"Name": url}
+
+    stats = run_worker_pool(frontier, lambda worker_id: object(), scrape, workers=3, recycle_after=0)
+    assert attempts[urls[0]] == 2
+    assert sum(s.scraped for s in stats) == 4 and sum(s.errors for s in stats) == 1
+    assert frontier.remaining() == 0
+    frontier.close()
+
+
+class FlakySink(CsvSink):
+    """Fails its first flush."""
+
+    failures = 1
+
+    def _write_batch(self, batch):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        super()._write_batch(batch)
+
+
+def test_failed_flush_leaves_the_page_to_the_next_one(tmp_path, monkeypatch):
+    info = {"name": None, "address": "東京都", "phone": "", "website": "", "rating": "4.0\n(1)",
+            "total_reviews": "1", "categories": ""}
+    monkeypatch.setattr(map_scraping, "open_place_page", lambda driver, url, cache=None: True)
+    monkeypatch.setattr(map_scraping, "extract_coordinates", lambda driver: {"latitude": "35.0", "longitude": "139.0"})
+    monkeypatch.setattr(map_scraping, "extract_place_info", lambda driver: dict(info, name=driver.url))
+    monkeypatch.setattr(map_scraping, "click_reviews_tab", lambda driver: True)
+    monkeypatch.setattr(map_scraping, "scroll_reviews", lambda driver, target=None: {"scrolls": 1})
+    monkeypatch.setattr(map_scraping, "expand_all_reviews", lambda driver: None)
+    monkeypatch.setattr(map_scraping, "extract_reviews",
+                        lambda driver: [{"Name": "reviewer", "Rating": "5", "Date": "1 か月前", "Review": "良い"}])
+
+    class Driver:
+        url = None
+
+    def scrape(driver, url, on_written, sink):
+        driver.url = url
+        return map_scraping.scrap_page(driver, url, sink=sink, on_written=on_written)
+
+    urls = ["https://maps/a", "https://maps/b"]
+    frontier = _frontier(tmp_path, urls, backoff_base=0)
+    with FlakySink(str(tmp_path / "outputs"), flush_every=1) as sink:
+        stats = run_worker_pool(frontier, lambda worker_id: Driver(), partial(scrape, sink=sink), workers=1,
+                                recycle_after=0)
+    # The first place is written by the second page's flush, each exactly once
+    assert sum(s.scraped for s in stats) == 2 and sum(s.errors for s in stats) == 0
+    assert frontier.counts() == {DONE: 2}
+    assert sink.places_written == 2
+    assert len(os.listdir(tmp_path / "outputs")) == 4
+    frontier.close()